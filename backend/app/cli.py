@@ -0,0 +1,354 @@
+"""Command-line entry points (python -m app.cli --help)."""
+import argparse
+import json
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def import_resumes(args) -> int:
+    from app.services.bulk_import import BulkImporter
+    from app.services.pdf_parser import get_pdf_parser
+
+    importer = BulkImporter(
+        get_pdf_parser(),
+        concurrency=args.concurrency,
+        tokens_per_minute=args.tpm,
+        batch_size=args.batch_size,
+    )
+
+    def progress(report: dict):
+        print(
+            f"stored={report['stored']} failed={report['failed']} "
+            f"skipped={report['skipped']} duplicates={report['duplicates']}",
+            file=sys.stderr,
+        )
+
+    report = importer.run(args.source, import_id=args.import_id, progress=progress)
+    print(json.dumps(report, indent=2))
+    return 1 if report["failed"] else 0
+
+
+def migrate_raw_text(args) -> int:
+    from sqlalchemy import text
+    from app.database import Base, SessionLocal, engine
+    from app.services.resume_service import ResumeService
+
+    Base.metadata.create_all(bind=engine)  # resume_raw_texts
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            column_type = conn.execute(text(
+                "SELECT data_type FROM information_schema.columns "
+                "WHERE table_name = 'resume_profiles' AND column_name = 'content'"
+            )).scalar()
+            if column_type == "json":
+                print("Converting resume_profiles.content to JSONB", file=sys.stderr)
+                conn.execute(text(
+                    "ALTER TABLE resume_profiles ALTER COLUMN content TYPE JSONB USING content::jsonb"
+                ))
+
+    db = SessionLocal()
+    try:
+        moved = ResumeService(db).move_raw_text_out(batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(f"Moved raw text out of {moved} profiles")
+    return 0
+
+
+def migrate_profile_version(args) -> int:
+    from sqlalchemy import inspect, text
+    from app import models  # noqa: F401  (registers the tables)
+    from app.database import Base, engine
+
+    if not inspect(engine).has_table("resume_profiles"):
+        Base.metadata.create_all(bind=engine)
+        print("Created tables")
+        return 0
+    columns = {column["name"] for column in inspect(engine).get_columns("resume_profiles")}
+    if "version" in columns:
+        print("resume_profiles.version already exists")
+        return 0
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE resume_profiles ADD COLUMN version INTEGER NOT NULL DEFAULT 1"))
+    print("Added resume_profiles.version")
+    return 0
+
+
+def migrate_resume_history(args) -> int:
+    from sqlalchemy import inspect, text
+    from app import models  # noqa: F401  (registers the tables)
+    from app.database import Base, engine
+
+    if not inspect(engine).has_table("resume_versions"):
+        Base.metadata.create_all(bind=engine)
+        print("Created tables")
+        return 0
+
+    existing = {column["name"] for column in inspect(engine).get_columns("resume_versions")}
+    json_type = "JSONB" if engine.dialect.name == "postgresql" else "JSON"
+    added = {
+        "profile_id": "UUID" if engine.dialect.name == "postgresql" else "CHAR(32)",
+        "version_number": "INTEGER",
+        "is_snapshot": "BOOLEAN DEFAULT false",
+        "delta": json_type,
+    }
+    with engine.begin() as conn:
+        for name, column_type in added.items():
+            if name not in existing:
+                conn.execute(text(f"ALTER TABLE resume_versions ADD COLUMN {name} {column_type}"))
+                print(f"Added resume_versions.{name}")
+        if engine.dialect.name == "postgresql":
+            conn.execute(text(
+                "CREATE UNIQUE INDEX IF NOT EXISTS uq_resume_version_number "
+                "ON resume_versions (profile_id, version_number)"
+            ))
+    return 0
+
+
+def _migrate_jobs_table(args) -> bool:
+    """
+    Bring an existing jobs table up to the model: add every missing column,
+    then every missing index. Returns False if the tables had to be created.
+    """
+    from sqlalchemy import inspect, text
+    from app import models  # noqa: F401  (registers the tables)
+    from app.database import Base, engine
+
+    if not inspect(engine).has_table("jobs"):
+        Base.metadata.create_all(bind=engine)
+        print("Created tables")
+        return False
+    postgres = engine.dialect.name == "postgresql"
+    column_types = {
+        "normalized_skills": "JSONB" if postgres else "JSON",
+        "url_hash": "VARCHAR(64)",
+        "content_hash": "VARCHAR(64)",
+        "minhash": "BYTEA" if postgres else "BLOB",
+        "duplicate_of": "UUID REFERENCES jobs(job_id) ON DELETE SET NULL" if postgres else "CHAR(32)",
+    }
+    columns = {column["name"] for column in inspect(engine).get_columns("jobs")}
+    with engine.begin() as conn:
+        for column, column_type in column_types.items():
+            if column not in columns:
+                conn.execute(text(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}"))
+                print(f"Added jobs.{column}")
+    create_indexes(args)
+    return True
+
+
+def migrate_job_skills(args) -> int:
+    from app.database import SessionLocal
+    from app.services.skills import backfill_normalized_skills
+
+    if not _migrate_jobs_table(args):
+        return 0
+    db = SessionLocal()
+    try:
+        changed = backfill_normalized_skills(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(f"Normalized skills on {changed} jobs")
+    return 0
+
+
+def create_indexes(args) -> int:
+    """Create any index declared on the models but missing from existing tables."""
+    from sqlalchemy import inspect
+    from app import models  # noqa: F401  (registers the tables)
+    from app.database import Base, engine
+
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=engine)
+                print(f"Created {index.name}")
+    return 0
+
+
+def score_jobs(args) -> int:
+    import time
+    import uuid
+    from app.database import SessionLocal
+    from app.services.fit_scoring import load_candidate, score_all_jobs
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        candidate = load_candidate(db, uuid.UUID(args.profile_id), uuid.UUID(args.user_id) if args.user_id else None)
+        report = score_all_jobs(db, candidate, status=args.status)
+        report["seconds"] = round(time.perf_counter() - start, 2)
+    finally:
+        db.close()
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+def migrate_job_hashes(args) -> int:
+    from app.database import SessionLocal
+    from app.services.job_ingestion import backfill_url_hashes
+
+    if not _migrate_jobs_table(args):
+        return 0
+    db = SessionLocal()
+    try:
+        changed = backfill_url_hashes(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(f"Hashed URLs of {changed} jobs")
+    return 0
+
+
+def ingest_jobs(args) -> int:
+    from app.services.job_ingestion import JOB_INGEST_BATCH_SIZE, JobIngester
+
+    def progress(report: dict):
+        print(
+            f"received={report['received']} inserted={report['inserted']} updated={report['updated']} "
+            f"unchanged={report['unchanged']} duplicates={report['duplicates']} "
+            f"near_duplicates={report['near_duplicates']} "
+            f"invalid={report['invalid']} rows/s={report['rows_per_second']}",
+            file=sys.stderr,
+        )
+
+    ingester = JobIngester(batch_size=args.batch_size or JOB_INGEST_BATCH_SIZE)
+    if args.source == "-":
+        report = ingester.run(sys.stdin, progress=progress)
+    else:
+        with open(args.source, "rb") as f:
+            report = ingester.run(f, progress=progress)
+    print(json.dumps(report, indent=2))
+    return 1 if report["invalid"] else 0
+
+
+def dedupe_jobs(args) -> int:
+    from app.database import SessionLocal
+    from app.services.near_duplicates import cluster_all_jobs
+
+    if not _migrate_jobs_table(args):
+        return 0
+    db = SessionLocal()
+    try:
+        report = cluster_all_jobs(db, batch_size=args.batch_size, resign=args.resign)
+    finally:
+        db.close()
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+def _configure_guide_lm():
+    import dspy
+    from app.services.guide_service import GatewayLM
+    dspy.settings.configure(lm=GatewayLM())
+
+
+def compile_guide(args) -> int:
+    from app.services.guide_program import compare_programs, compile_program, load_examples, save_program
+    from app.services.guide_service import GuideAgent
+
+    _configure_guide_lm()
+    program, manifest = compile_program(load_examples(args.trainset), args.version, max_demos=args.max_demos)
+    if args.devset:
+        manifest["report"] = compare_programs(GuideAgent(), program, load_examples(args.devset))
+    save_program(program, manifest, args.out)
+    print(json.dumps(manifest, indent=2))
+    return 0
+
+
+def compare_guide(args) -> int:
+    from app.services.guide_program import compare_programs, load_examples, load_program
+    from app.services.guide_service import GuideAgent
+
+    _configure_guide_lm()
+    compiled, _ = load_program(args.program, pinned_version=args.version)
+    print(json.dumps(compare_programs(GuideAgent(), compiled, load_examples(args.devset)), indent=2))
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    bulk = commands.add_parser("import-resumes", help="Parse and store a directory or zip of PDF resumes")
+    bulk.add_argument("source", help="Directory (searched recursively) or zip archive of PDFs")
+    bulk.add_argument("--concurrency", type=int, help="Parallel parses (default BULK_IMPORT_CONCURRENCY or 4)")
+    bulk.add_argument("--tpm", type=int, help="LLM tokens-per-minute budget (default unlimited)")
+    bulk.add_argument("--batch-size", type=int, help="Profiles written per transaction (default 20)")
+    bulk.add_argument("--import-id", help="Checkpoint id to resume (default derived from the source)")
+    bulk.set_defaults(handler=import_resumes)
+
+    migrate = commands.add_parser(
+        "migrate-raw-text", help="Move _raw_text out of stored profiles and switch content to JSONB"
+    )
+    migrate.add_argument("--batch-size", type=int, default=200)
+    migrate.set_defaults(handler=migrate_raw_text)
+
+    version = commands.add_parser(
+        "migrate-profile-version", help="Add the optimistic-concurrency version column to resume_profiles"
+    )
+    version.set_defaults(handler=migrate_profile_version)
+
+    history = commands.add_parser(
+        "migrate-resume-history", help="Add the profile history columns to resume_versions"
+    )
+    history.set_defaults(handler=migrate_resume_history)
+
+    job_skills = commands.add_parser(
+        "migrate-job-skills", help="Add missing jobs columns and indexes, then backfill jobs.normalized_skills"
+    )
+    job_skills.add_argument("--batch-size", type=int, default=1000)
+    job_skills.set_defaults(handler=migrate_job_skills)
+
+    indexes = commands.add_parser("create-indexes", help="Create indexes missing from existing tables")
+    indexes.set_defaults(handler=create_indexes)
+
+    score = commands.add_parser("score-jobs", help="Recompute jobs.fit_score for a resume profile")
+    score.add_argument("profile_id")
+    score.add_argument("--user-id", help="Whose preferences apply (default the profile's owner)")
+    score.add_argument("--status", help="Only score jobs in this status")
+    score.set_defaults(handler=score_jobs)
+
+    job_hashes = commands.add_parser(
+        "migrate-job-hashes", help="Add missing jobs columns and indexes, then backfill jobs.url_hash"
+    )
+    job_hashes.add_argument("--batch-size", type=int, default=1000)
+    job_hashes.set_defaults(handler=migrate_job_hashes)
+
+    ingest = commands.add_parser("ingest-jobs", help="Upsert job postings from a JSONL file")
+    ingest.add_argument("source", help="JSONL file, one posting per line ('-' reads stdin)")
+    ingest.add_argument("--batch-size", type=int, default=None, help="Postings per INSERT batch (default JOB_INGEST_BATCH_SIZE)")
+    ingest.set_defaults(handler=ingest_jobs)
+
+    dedupe = commands.add_parser(
+        "dedupe-jobs", help="Add missing jobs columns and indexes, sign descriptions and rebuild near-duplicate clusters"
+    )
+    dedupe.add_argument("--batch-size", type=int, default=1000)
+    dedupe.add_argument("--resign", action="store_true", help="Re-sign every job (after changing NEAR_DUP_* settings)")
+    dedupe.set_defaults(handler=dedupe_jobs)
+
+    compile_cmd = commands.add_parser("compile-guide", help="Compile a compact GuideAgent from labelled bullets")
+    compile_cmd.add_argument("trainset", help="JSONL of {raw_text, domain, years_experience, missing_components}")
+    compile_cmd.add_argument("--out", required=True, help="Where to write the program (JSON)")
+    compile_cmd.add_argument("--version", required=True, help="Version recorded in the manifest, for pinning")
+    compile_cmd.add_argument("--max-demos", type=int, default=4)
+    compile_cmd.add_argument("--devset", help="Also report raw vs compiled tokens/latency on this JSONL")
+    compile_cmd.set_defaults(handler=compile_guide)
+
+    compare = commands.add_parser("compare-guide", help="Report tokens/latency of the raw vs a compiled GuideAgent")
+    compare.add_argument("devset", help="JSONL of labelled bullets")
+    compare.add_argument("--program", required=True)
+    compare.add_argument("--version", help="Require this program version")
+    compare.set_defaults(handler=compare_guide)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,141 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from collections import deque
+from typing import Callable
+import anyio
 import os
+import threading
+import time
 
 # Use environment variable or default to local postgres
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://localhost/job_agent")
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# Pool settings (per process; each uvicorn worker has its own pool)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # Seconds; -1 never recycles
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))  # 0 means no limit
+
+# Async mode: endpoints built on get_session_runner use an asyncpg engine
+DATABASE_ASYNC = os.getenv("DATABASE_ASYNC", "0") == "1"
+
+
+class PoolWaitStats:
+    """How long checkouts waited for a connection (a free one or a new one)."""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=window)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+            self._recent.append(seconds)
+
+    def stats(self) -> dict:
+        with self._lock:
+            recent = sorted(self._recent)
+            checkouts, timeouts = self.checkouts, self.timeouts
+            total_wait, max_wait = self.total_wait, self.max_wait
+
+        def percentile(fraction: float) -> float:
+            if not recent:
+                return 0.0
+            return round(recent[min(len(recent) - 1, int(fraction * len(recent)))] * 1000, 2)
+
+        return {
+            "checkouts": checkouts,
+            "timeouts": timeouts,
+            "wait_ms_total": round(total_wait * 1000, 2),
+            "wait_ms_max": round(max_wait * 1000, 2),
+            "wait_ms_p50": percentile(0.50),
+            "wait_ms_p95": percentile(0.95),
+            "wait_ms_p99": percentile(0.99),
+        }
+
+
+class _TimedCheckout:
+    """Pool mixin recording checkout wait into the class's `wait_stats`."""
+
+    wait_stats: PoolWaitStats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.wait_stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.wait_stats.record(time.perf_counter() - start)
+        return connection
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    wait_stats = PoolWaitStats()
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    wait_stats = PoolWaitStats()
+
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    """create_engine keyword arguments for `url` from the DB_* settings."""
+    backend = make_url(url).get_backend_name()
+    options = {"pool_pre_ping": DB_POOL_PRE_PING}
+    if backend == "sqlite":
+        return options  # SQLite picks its own pool; sizes and timeouts don't apply
+
+    options.update(
+        poolclass=TimedAsyncQueuePool if is_async else TimedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+    if DB_STATEMENT_TIMEOUT_MS and backend == "postgresql":
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+
+def async_database_url(url: str) -> str:
+    """ASYNC_DATABASE_URL, or DATABASE_URL switched to the asyncpg driver."""
+    if os.getenv("ASYNC_DATABASE_URL"):
+        return os.getenv("ASYNC_DATABASE_URL")
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "postgresql":
+        raise ValueError("DATABASE_ASYNC needs a PostgreSQL DATABASE_URL (or set ASYNC_DATABASE_URL)")
+    return parsed.set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = None
+AsyncSessionLocal = None
+if DATABASE_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    _async_url = async_database_url(SQLALCHEMY_DATABASE_URL)
+    async_engine = create_async_engine(_async_url, **engine_options(_async_url, is_async=True))
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False)
+
 Base = declarative_base()
 
 def get_db():
@@ -17,3 +144,55 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+class SessionRunner:
+    """
+    Runs sync ORM code, `fn(session, *args)`, from an async endpoint without
+    blocking the event loop. With DATABASE_ASYNC the function runs on the
+    asyncpg connection via AsyncSession.run_sync, so waiting on the database
+    holds no thread; otherwise it runs in the threadpool on a sync Session.
+    Build response data inside `fn`: attributes a commit expired can't be
+    lazy-loaded from the event loop afterwards.
+    """
+
+    def __init__(self, session, is_async: bool = False):
+        self.session = session
+        self.is_async = is_async
+
+    async def run(self, fn: Callable, *args):
+        if self.is_async:
+            return await self.session.run_sync(fn, *args)
+        return await anyio.to_thread.run_sync(fn, self.session, *args)
+
+
+async def get_session_runner():
+    if DATABASE_ASYNC:
+        async with AsyncSessionLocal() as session:
+            yield SessionRunner(session, is_async=True)
+        return
+    session = SessionLocal()
+    try:
+        yield SessionRunner(session)
+    finally:
+        await anyio.to_thread.run_sync(session.close)
+
+
+def pool_stats() -> dict:
+    """Checkout waits and occupancy for each engine's pool."""
+    stats = {}
+    for name, pool in (("sync", engine.pool), ("async", async_engine.pool if async_engine else None)):
+        if pool is None:
+            continue
+        entry = {"pool": type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            entry.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                overflow=max(0, pool.overflow()),
+                max_overflow=pool._max_overflow,
+            )
+        if isinstance(pool, _TimedCheckout):
+            entry.update(pool.wait_stats.stats())
+        stats[name] = entry
+    return stats
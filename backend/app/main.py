@@ -1,22 +1,35 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Depends
+from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, Body, Header, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, ValidationError
+from typing import BinaryIO, Optional, Union
+import json
 import uuid
 
-from app.database import engine, Base, get_db
-from app.models import ResumeProfile
 from dotenv import load_dotenv
 import os
 
-# Load environment variables from .env file
+# Load environment variables from .env file (before app modules read their settings)
 load_dotenv()
 
-# Create tables if they don't exist (basic auto-migration for now)
-Base.metadata.create_all(bind=engine)
+from app.database import SessionRunner, get_db, get_session_runner, pool_stats
+from app.models import ResumeProfile
+from app.startup import lifespan
+from app.uploads import (
+    MAX_BULK_UPLOAD_BYTES, MAX_UPLOAD_BYTES, UploadSizeLimitMiddleware, UploadTooLarge, spool_copy
+)
 
-app = FastAPI(title="Me Inc. Job Agent", version="1.0.0")
+# Schema creation (DB_CREATE_SCHEMA=1) and warm-up happen in the lifespan
+app = FastAPI(title="Me Inc. Job Agent", version="1.0.0", lifespan=lifespan)
+
+# Reject oversized request bodies while they stream in
+# (registered first so it sits inside CORS and 413s still carry CORS headers)
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    path_limits={"/api/resume/bulk-import": MAX_BULK_UPLOAD_BYTES, "/api/jobs/ingest": MAX_BULK_UPLOAD_BYTES},
+)
 
 # Enable CORS for frontend
 app.add_middleware(
@@ -30,6 +43,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
 
@@ -38,6 +52,7 @@ class ResumeResponse(BaseModel):
     profile_id: str
     profile_name: Optional[str]
     content: dict
+    version: Optional[int] = None
     
     class Config:
         from_attributes = True
@@ -55,41 +70,39 @@ def health_check():
     return {"status": "healthy", "service": "me-inc-job-agent"}
 
 
+@app.get("/ready")
+def readiness_check(request: Request, response: Response):
+    """503 until startup warm-up has finished; reports per-phase timings."""
+    state = getattr(request.app.state, "startup", None)
+    if state is None:
+        response.status_code = 503
+        return {"status": "starting", "phases": {}}
+    if not state.ready:
+        response.status_code = 503
+    return state.status()
+
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to Me Inc. Job Agent System"}
 
 
-# Resume Endpoints
-@app.post("/api/resume/upload", response_model=ResumeResponse)
-async def upload_resume(
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db)
-):
-    """
-    Upload a PDF resume, parse it with LLM, and store in database.
-    Returns the structured resume data.
-    """
-    # Validate file type
-    if not file.filename or not file.filename.lower().endswith('.pdf'):
-        raise HTTPException(
-            status_code=400, 
-            detail="Only PDF files are supported"
-        )
-    
-    # Read file contents
-    try:
-        pdf_bytes = await file.read()
-    except Exception as e:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Could not read file: {str(e)}"
-        )
-    
+class IngestionStatusResponse(BaseModel):
+    ingestion_id: str
+    filename: str
+    status: str
+    profile_id: Optional[str] = None
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
+
+
+def _load_pdf_parser():
+    """Get the PDF parser, translating setup problems into HTTP errors."""
     # Import parser here to avoid issues if dependencies aren't installed
     try:
         from app.services.pdf_parser import get_pdf_parser
-        pdf_parser = get_pdf_parser()
+        return get_pdf_parser()
     except ImportError as e:
         raise HTTPException(
             status_code=500,
@@ -100,10 +113,44 @@ async def upload_resume(
             status_code=500,
             detail=str(e)  # API key not set
         )
+
+
+def _pdf_upload_file(file: UploadFile) -> BinaryIO:
+    """
+    Validate the upload is a PDF within the size limit and return the
+    spooled file it was streamed into (never the whole body as bytes).
+    """
+    if not file.filename or not file.filename.lower().endswith('.pdf'):
+        raise HTTPException(
+            status_code=400, 
+            detail="Only PDF files are supported"
+        )
     
-    # Parse PDF with LLM (synchronous call)
+    if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Upload too large; the limit is {MAX_UPLOAD_BYTES} bytes"
+        )
+    
+    return file.file
+
+
+# Resume Endpoints
+@app.post("/api/resume/upload", response_model=ResumeResponse)
+async def upload_resume(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db)
+):
+    """
+    Upload a PDF resume, parse it with LLM, and store in database.
+    Returns the structured resume data.
+    """
+    pdf_file = _pdf_upload_file(file)
+    pdf_parser = _load_pdf_parser()
+    
+    # Parse PDF with LLM off the event loop (pypdf + OpenAI are blocking)
     try:
-        parsed_content = pdf_parser.parse_pdf(pdf_bytes)
+        parsed_content = await run_in_threadpool(pdf_parser.parse_pdf, pdf_file)
     except ValueError as e:
         raise HTTPException(
             status_code=422,
@@ -115,17 +162,130 @@ async def upload_resume(
             detail=f"Error parsing resume: {str(e)}"
         )
     
-    # Extract name for profile naming
-    profile_name = parsed_content.get("basics", {}).get("name", "Unnamed Profile")
+    from app.services.resume_service import ResumeService
+    profile = await run_in_threadpool(
+        ResumeService(db).create_parsed_profile, parsed_content
+    )
+    
+    return ResumeResponse(
+        profile_id=str(profile.profile_id),
+        profile_name=profile.profile_name,
+        content=profile.content
+    )
+
+
+def _sse(event: str, data) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/api/resume/upload/stream")
+async def upload_resume_stream(file: UploadFile = File(...)):
+    """
+    Streaming variant of /api/resume/upload (Server-Sent Events).
+
+    Emits `section` ({key, value}) and `item` ({key, index, value}) events as
+    each part of the parsed resume arrives from the LLM, then `done` with the
+    stored profile, or `error` ({detail}).
+    """
+    pdf_file = _pdf_upload_file(file)
+    pdf_parser = _load_pdf_parser()
+    
+    # The generator runs after this handler returns, so it needs its own copy
+    try:
+        spool = await run_in_threadpool(spool_copy, pdf_file)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
     
-    # Save to database
-    profile = ResumeProfile(
-        profile_name=profile_name,
-        content=parsed_content
+    def events():
+        from app.database import SessionLocal
+        from app.services.resume_service import ResumeService
+        try:
+            parsed_content = None
+            for event in pdf_parser.stream_pdf(spool):
+                if event[0] == "section":
+                    yield _sse("section", {"key": event[1], "value": event[2]})
+                elif event[0] == "item":
+                    yield _sse("item", {"key": event[1], "index": event[2], "value": event[3]})
+                elif event[0] == "parsed":
+                    parsed_content = event[1]
+            
+            db = SessionLocal()
+            try:
+                profile = ResumeService(db).create_parsed_profile(parsed_content)
+                yield _sse("done", {
+                    "profile_id": str(profile.profile_id),
+                    "profile_name": profile.profile_name,
+                    "content": profile.content
+                })
+            finally:
+                db.close()
+        except ValueError as e:
+            yield _sse("error", {"detail": f"Could not parse PDF: {str(e)}"})
+        except Exception as e:
+            yield _sse("error", {"detail": f"Error parsing resume: {str(e)}"})
+        finally:
+            spool.close()
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
-    db.add(profile)
-    db.commit()
-    db.refresh(profile)
+
+
+@app.post("/api/resume/ingest", response_model=IngestionStatusResponse, status_code=202)
+async def ingest_resume(file: UploadFile = File(...)):
+    """
+    Queue a PDF resume for background parsing.
+    Returns an ingestion id immediately; poll /api/resume/ingest/{ingestion_id}.
+    """
+    pdf_file = _pdf_upload_file(file)
+    _load_pdf_parser()  # Fail fast on missing dependencies / API key
+    
+    # The request's own spool is closed once we respond, so the queue gets a copy
+    try:
+        spool = await run_in_threadpool(spool_copy, pdf_file)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    
+    from app.services.ingestion_service import get_ingestion_queue, IngestionQueueFull
+    try:
+        job = get_ingestion_queue().submit(spool, file.filename)
+    except IngestionQueueFull as e:
+        spool.close()
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    return job.to_dict()
+
+
+@app.get("/api/resume/ingest/{ingestion_id}", response_model=IngestionStatusResponse)
+def get_ingestion_status(ingestion_id: str):
+    """Report progress of a queued upload (queued/extracting/parsing/stored/failed)."""
+    from app.services.ingestion_service import get_ingestion_queue
+    job = get_ingestion_queue().get(ingestion_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Ingestion not found")
+    return job.to_dict()
+
+
+@app.get("/api/resume/ingest/{ingestion_id}/result", response_model=ResumeResponse)
+def get_ingestion_result(ingestion_id: str, db: Session = Depends(get_db)):
+    """Return the stored profile once a queued upload has finished."""
+    from app.services.ingestion_service import get_ingestion_queue, STORED, FAILED
+    job = get_ingestion_queue().get(ingestion_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Ingestion not found")
+    if job.status == FAILED:
+        raise HTTPException(status_code=422, detail=f"Could not parse PDF: {job.error}")
+    if job.status != STORED:
+        raise HTTPException(status_code=409, detail=f"Ingestion is still {job.status}")
+    
+    profile = db.query(ResumeProfile).filter(
+        ResumeProfile.profile_id == uuid.UUID(job.profile_id)
+    ).first()
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
     
     return ResumeResponse(
         profile_id=str(profile.profile_id),
@@ -134,103 +294,536 @@ async def upload_resume(
     )
 
 
+@app.post("/api/resume/bulk-import", status_code=202)
+async def bulk_import_resumes(file: UploadFile = File(...)):
+    """
+    Import a zip of PDF resumes in the background.
+    Uploading the same zip again resumes it, skipping files already stored.
+    """
+    if not file.filename or not file.filename.lower().endswith(".zip"):
+        raise HTTPException(status_code=400, detail="Only zip archives are supported")
+    _load_pdf_parser()  # Fail fast on missing dependencies / API key
+
+    from app.services.bulk_import import BULK_IMPORT_DIR, default_import_id, start_background_import
+
+    def save_upload() -> tuple:
+        os.makedirs(BULK_IMPORT_DIR, exist_ok=True)
+        spool = spool_copy(file.file, MAX_BULK_UPLOAD_BYTES)
+        path = os.path.join(BULK_IMPORT_DIR, f"{uuid.uuid4()}.zip")
+        with spool, open(path, "wb") as out:
+            for chunk in iter(lambda: spool.read(1024 * 1024), b""):
+                out.write(chunk)
+        return path, default_import_id(path)
+
+    try:
+        path, import_id = await run_in_threadpool(save_upload)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    if not start_background_import(path, import_id, cleanup=True):
+        os.remove(path)
+        raise HTTPException(status_code=409, detail=f"Import {import_id} is already running")
+    return {"import_id": import_id, "status": "running"}
+
+
+@app.get("/api/resume/bulk-import/{import_id}")
+def get_bulk_import_status(import_id: str, db: Session = Depends(get_db)):
+    """Checkpoint counts for an import, plus live progress if it is running here."""
+    from app.services.bulk_import import import_status, running_import
+    status = import_status(db, import_id)
+    running = running_import(import_id)
+    if not running and not (status["stored"] or status["failed"]):
+        raise HTTPException(status_code=404, detail="Import not found")
+
+    status["running"] = bool(running and running["running"])
+    if running:
+        status["progress"] = running["report"]
+        status["error"] = running["error"]
+    return status
+
+
+@app.get("/api/resume/parse-cache/stats")
+def parse_cache_stats():
+    """Hit/miss counters and sizes for the resume parse cache."""
+    pdf_parser = _load_pdf_parser()
+    if not pdf_parser.cache:
+        return {"enabled": False}
+    return {"enabled": True, **pdf_parser.cache.stats()}
+
+
+@app.get("/api/llm/stats")
+def llm_stats():
+    """Request, retry and rate-limit counters for the shared LLM gateway."""
+    from app.services.llm_gateway import get_llm_gateway
+    try:
+        return get_llm_gateway().stats()
+    except (ImportError, ValueError) as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/db/pool/stats")
+def db_pool_stats():
+    """Connection pool occupancy and checkout wait times."""
+    return pool_stats()
+
+
 class ResumeUpdateRequest(BaseModel):
     content: dict
 
+JSON_PATCH_TYPE = "application/json-patch+json"
+MERGE_PATCH_TYPE = "application/merge-patch+json"
+
+def _parse_if_match(if_match: Optional[str]) -> Optional[int]:
+    """The profile version from an If-Match header ("3", "\"3\"" or W/"3")."""
+    if if_match is None or if_match.strip() == "*":
+        return None
+    try:
+        return int(if_match.strip().removeprefix("W/").strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="If-Match must be a profile version")
+
 @app.patch("/api/resume/{profile_id}", response_model=ResumeResponse)
-def update_resume(
+async def update_resume(
     profile_id: str, 
-    update: ResumeUpdateRequest, 
-    db: Session = Depends(get_db)
+    response: Response,
+    body: Union[list, dict] = Body(...),
+    content_type: Optional[str] = Header(None),
+    if_match: Optional[str] = Header(None),
+    db: SessionRunner = Depends(get_session_runner)
 ):
     """
-    Update specific sections of the resume content.
-    Expects a dictionary of top-level keys to update (e.g. {"basics": {...}}).
+    Update a resume's content. The body is, by Content-Type:
+      application/json              {"content": {...}} replacing top-level keys
+      application/json-patch+json   an RFC 6902 JSON Patch
+      application/merge-patch+json  an RFC 7386 merge patch (deep merge)
+    Patches run server-side in one UPDATE. Send the version you read (the
+    ETag) as If-Match to get a 409 instead of overwriting someone else's edit.
     """
     try:
         profile_uuid = uuid.UUID(profile_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid profile ID format")
+    expected_version = _parse_if_match(if_match)
         
-    from app.services.resume_service import ResumeService
-    service = ResumeService(db)
+    from app.services.json_patch import InvalidPatch
+    from app.services.resume_service import ProfileVersionConflict, ResumeService
+    media_type = (content_type or "").split(";")[0].strip().lower()
     
-    try:
-        updated_profile = service.update_profile_content(
+    if media_type not in (JSON_PATCH_TYPE, MERGE_PATCH_TYPE):
+        try:
+            update = ResumeUpdateRequest.model_validate(body)
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+    
+    def apply(session: Session) -> ResumeResponse:
+        service = ResumeService(session)
+        if media_type in (JSON_PATCH_TYPE, MERGE_PATCH_TYPE):
+            patched = service.patch_profile_content(
+                profile_uuid,
+                operations=body if media_type == JSON_PATCH_TYPE else None,
+                merge=body if media_type == MERGE_PATCH_TYPE else None,
+                expected_version=expected_version
+            )
+            return ResumeResponse(profile_id=profile_id, **patched)
+        updated = service.update_profile_content(
             profile_id=profile_uuid,
-            updates=update.content
+            updates=update.content,
+            expected_version=expected_version
         )
-        return ResumeResponse(
-            profile_id=str(updated_profile.profile_id),
-            profile_name=updated_profile.profile_name,
-            content=updated_profile.content
+        return ResumeResponse(profile_id=profile_id, **updated)
+    
+    try:
+        result = await db.run(apply)
+    except ProfileVersionConflict as e:
+        raise HTTPException(
+            status_code=409, detail={"message": str(e), "current_version": e.current_version}
         )
+    except InvalidPatch as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    
+    response.headers["ETag"] = f'"{result.version}"'
+    return result
 
 
 @app.get("/api/resume/{profile_id}", response_model=ResumeResponse)
-def get_resume(profile_id: str, db: Session = Depends(get_db)):
-    """Retrieve a resume profile by ID."""
+async def get_resume(
+    profile_id: str,
+    response: Response,
+    fields: Optional[str] = None,
+    db: SessionRunner = Depends(get_session_runner)
+):
+    """
+    Retrieve a resume profile by ID.
+    `fields` (e.g. "basics,skills" or "meta.years_experience") limits the
+    content to those sections; they are extracted in the database.
+    The ETag is the profile version, for If-Match on PATCH.
+    """
     try:
         profile_uuid = uuid.UUID(profile_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid profile ID format")
     
-    profile = db.query(ResumeProfile).filter(
+    if fields is not None:
+        from app.services.resume_service import ResumeService, parse_fields
+        try:
+            paths = parse_fields(fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        projected = await db.run(lambda session: ResumeService(session).get_projected_content(profile_uuid, paths))
+        if projected is None:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        profile_name, content, version = projected
+        response.headers["ETag"] = f'"{version}"'
+        return ResumeResponse(
+            profile_id=profile_id,
+            profile_name=profile_name,
+            content=content,
+            version=version
+        )
+    
+    row = await db.run(lambda session: session.query(
+        ResumeProfile.profile_name, ResumeProfile.content, ResumeProfile.version
+    ).filter(
         ResumeProfile.profile_id == profile_uuid
-    ).first()
+    ).first())
     
-    if not profile:
+    if not row:
         raise HTTPException(status_code=404, detail="Profile not found")
     
+    response.headers["ETag"] = f'"{row.version}"'
     return ResumeResponse(
-        profile_id=str(profile.profile_id),
-        profile_name=profile.profile_name,
-        content=profile.content
+        profile_id=profile_id,
+        profile_name=row.profile_name,
+        content=row.content,
+        version=row.version
     )
 
 
+@app.get("/api/resume/{profile_id}/raw-text")
+async def get_resume_raw_text(profile_id: str, db: SessionRunner = Depends(get_session_runner)):
+    """The text extracted from a profile's original PDF."""
+    try:
+        profile_uuid = uuid.UUID(profile_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid profile ID format")
+    
+    from app.services.resume_service import ResumeService
+    raw_text = await db.run(lambda session: ResumeService(session).get_raw_text(profile_uuid))
+    if raw_text is None:
+        raise HTTPException(status_code=404, detail="No raw text stored for this profile")
+    return {"profile_id": profile_id, "raw_text": raw_text}
+
+
+class ResumeVersionItem(BaseModel):
+    version: int
+    name: Optional[str] = None
+    snapshot: bool
+    sections_modified: list[str]
+    created_at: Optional[str] = None
+
+@app.get("/api/resume/{profile_id}/versions", response_model=list[ResumeVersionItem])
+async def list_resume_versions(profile_id: str, db: SessionRunner = Depends(get_session_runner)):
+    """A profile's edit history, newest first (metadata only)."""
+    from app.services.resume_service import ResumeService
+    try:
+        profile_uuid = uuid.UUID(profile_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid profile ID format")
+    return await db.run(lambda session: ResumeService(session).list_versions(profile_uuid))
+
+@app.get("/api/resume/{profile_id}/versions/{version}", response_model=ResumeResponse)
+async def get_resume_version(profile_id: str, version: int, db: SessionRunner = Depends(get_session_runner)):
+    """A profile's content as of an earlier version."""
+    from app.services.resume_service import ResumeService
+    try:
+        profile_uuid = uuid.UUID(profile_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid profile ID format")
+    
+    def load(session: Session):
+        content = ResumeService(session).get_version(profile_uuid, version)
+        if content is None:
+            return None
+        profile_name = session.query(ResumeProfile.profile_name).filter(
+            ResumeProfile.profile_id == profile_uuid
+        ).scalar()
+        return ResumeResponse(profile_id=profile_id, profile_name=profile_name, content=content, version=version)
+    
+    result = await db.run(load)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Version not found")
+    return result
+
+@app.post("/api/resume/{profile_id}/versions/{version}/restore", response_model=ResumeResponse)
+async def restore_resume_version(
+    profile_id: str,
+    version: int,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: SessionRunner = Depends(get_session_runner)
+):
+    """Undo back to an earlier version (recorded as a new version)."""
+    from app.services.resume_service import ProfileVersionConflict, ResumeService
+    try:
+        profile_uuid = uuid.UUID(profile_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid profile ID format")
+    expected_version = _parse_if_match(if_match)
+    
+    def restore(session: Session) -> ResumeResponse:
+        profile = ResumeService(session).restore_version(profile_uuid, version, expected_version=expected_version)
+        return ResumeResponse(
+            profile_id=profile_id,
+            profile_name=profile.profile_name,
+            content=profile.content,
+            version=profile.version
+        )
+    
+    try:
+        result = await db.run(restore)
+    except ProfileVersionConflict as e:
+        raise HTTPException(
+            status_code=409, detail={"message": str(e), "current_version": e.current_version}
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    response.headers["ETag"] = f'"{result.version}"'
+    return result
+
+
 @app.get("/api/resumes", response_model=list[ResumeListItem])
-def list_resumes(db: Session = Depends(get_db)):
-    """List all resume profiles."""
-    profiles = db.query(ResumeProfile).filter(
-        ResumeProfile.is_active == True
-    ).all()
+async def list_resumes(
+    response: Response,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    owner_id: Optional[str] = None,
+    db: SessionRunner = Depends(get_session_runner)
+):
+    """
+    List active resume profiles, newest first, `limit` at a time.
+    When there are more, the X-Next-Cursor header holds the `cursor` for
+    the next page.
+    """
+    from app.services.resume_service import ResumeService
+    
+    owner_uuid = None
+    if owner_id is not None:
+        try:
+            owner_uuid = uuid.UUID(owner_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid owner ID format")
+    
+    try:
+        rows, next_cursor = await db.run(
+            lambda session: ResumeService(session).list_profiles(limit=limit, cursor=cursor, owner_id=owner_uuid)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return [
         ResumeListItem(
-            profile_id=str(p.profile_id),
-            profile_name=p.profile_name,
-            created_at=p.created_at.isoformat() if p.created_at else None
+            profile_id=str(row.profile_id),
+            profile_name=row.profile_name,
+            created_at=row.created_at.isoformat() if row.created_at else None
         )
-        for p in profiles
+        for row in rows
     ]
 
 
 @app.delete("/api/resume/{profile_id}")
-def delete_resume(profile_id: str, db: Session = Depends(get_db)):
+async def delete_resume(profile_id: str, db: SessionRunner = Depends(get_session_runner)):
     """Soft delete a resume profile."""
     try:
         profile_uuid = uuid.UUID(profile_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid profile ID format")
     
-    profile = db.query(ResumeProfile).filter(
-        ResumeProfile.profile_id == profile_uuid
-    ).first()
+    def soft_delete(session: Session) -> int:
+        deleted = session.query(ResumeProfile).filter(
+            ResumeProfile.profile_id == profile_uuid
+        ).update({ResumeProfile.is_active: False}, synchronize_session=False)
+        session.commit()
+        return deleted
     
-    if not profile:
+    if not await db.run(soft_delete):
         raise HTTPException(status_code=404, detail="Profile not found")
     
-    profile.is_active = False
-    db.commit()
-    
     return {"message": "Profile deleted", "profile_id": profile_id}
 
 
+# Market Scout Endpoints
+
+class ScoreJobsRequest(BaseModel):
+    profile_id: str
+    user_id: Optional[str] = None  # Whose preferences apply; defaults to the profile's owner
+    status: Optional[str] = None  # Only score jobs in this status
+
+class ScoreJobsResponse(BaseModel):
+    scored: int
+    updated: int
+    mean_score: Optional[float] = None
+
+@app.post("/api/jobs/score", response_model=ScoreJobsResponse)
+def score_jobs(req: ScoreJobsRequest, db: Session = Depends(get_db)):
+    """Recompute every job's fit_score against a resume profile and the user's preferences."""
+    from app.services.fit_scoring import load_candidate, score_all_jobs
+    try:
+        profile_uuid = uuid.UUID(req.profile_id)
+        user_uuid = uuid.UUID(req.user_id) if req.user_id else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid profile or user ID format")
+    
+    try:
+        candidate = load_candidate(db, profile_uuid, user_uuid)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return score_all_jobs(db, candidate, status=req.status)
+
+
+class JobSkillMatch(BaseModel):
+    job_id: str
+    matched_skills: int
+
+@app.get("/api/jobs/by-skills")
+def jobs_by_skills(skills: str, match: str = "any", limit: int = 100, db: Session = Depends(get_db)):
+    """
+    Jobs requiring any (or, with match=all, every one) of the comma-separated
+    `skills`. Aliases are resolved ("k8s" matches "Kubernetes").
+    """
+    from app.services.skills import find_jobs
+    from app.skill_names import normalize_skills
+    if match not in ("any", "all"):
+        raise HTTPException(status_code=400, detail="match must be 'any' or 'all'")
+    wanted = normalize_skills(skills.split(","))
+    job_ids = find_jobs(db, wanted, match)
+    return {
+        "skills": wanted,
+        "match": match,
+        "total": len(job_ids),
+        "job_ids": [str(job_id) for job_id in job_ids[:max(0, limit)]]
+    }
+
+@app.get("/api/resume/{profile_id}/matching-jobs", response_model=list[JobSkillMatch])
+def matching_jobs(profile_id: str, limit: int = 50, db: Session = Depends(get_db)):
+    """Jobs sharing required skills with a profile, most shared skills first."""
+    from app.services.skills import get_skill_index, profile_skills
+    try:
+        profile_uuid = uuid.UUID(profile_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid profile ID format")
+    
+    content = db.query(ResumeProfile.content).filter(ResumeProfile.profile_id == profile_uuid).scalar()
+    if content is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    index = get_skill_index()
+    index.refresh(db)
+    return [
+        JobSkillMatch(job_id=str(job_id), matched_skills=count)
+        for job_id, count in index.rank(profile_skills(content), limit=max(0, limit))
+    ]
+
+@app.get("/api/jobs/skill-index/stats")
+def skill_index_stats():
+    """Size and age of the in-memory skill index."""
+    from app.services.skills import get_skill_index
+    return get_skill_index().stats()
+
+
+@app.get("/api/jobs/near-duplicates/stats")
+def near_duplicate_stats():
+    """Size and age of the in-memory near-duplicate (LSH) index."""
+    from app.services.near_duplicates import get_near_duplicate_index
+    return get_near_duplicate_index().stats()
+
+@app.get("/api/jobs/{job_id}/duplicates")
+def job_duplicates(job_id: str, db: Session = Depends(get_db)):
+    """The near-duplicate cluster of a job: its canonical job and every member."""
+    from app.models import Job
+    try:
+        job_uuid = uuid.UUID(job_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid job ID format")
+    
+    job = db.query(Job.job_id, Job.duplicate_of).filter(Job.job_id == job_uuid).first()
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    canonical_id = job.duplicate_of or job.job_id
+    members = db.query(Job.job_id).filter(Job.duplicate_of == canonical_id).order_by(Job.discovered_date)
+    return {
+        "job_id": str(job.job_id),
+        "canonical_id": str(canonical_id),
+        "duplicates": [str(row.job_id) for row in members],
+    }
+
+
+class IngestJobsResponse(BaseModel):
+    received: int
+    inserted: int
+    updated: int
+    unchanged: int
+    duplicates: int
+    near_duplicates: int
+    invalid: int
+    errors: list[str]
+    seconds: float
+    rows_per_second: Optional[float] = None
+
+@app.post("/api/jobs/ingest", response_model=IngestJobsResponse)
+async def ingest_jobs(file: UploadFile = File(...), batch_size: Optional[int] = None):
+    """
+    Upsert job postings from a JSONL upload (one posting object per line),
+    deduplicated by canonical URL. Invalid lines are counted and skipped.
+    """
+    from app.services.job_ingestion import JOB_INGEST_BATCH_SIZE, JobIngester
+    if batch_size is not None and batch_size < 1:
+        raise HTTPException(status_code=400, detail="batch_size must be positive")
+
+    # The upload is already spooled (and size-limited by the middleware); read it line by line
+    ingester = JobIngester(batch_size=batch_size or JOB_INGEST_BATCH_SIZE)
+    return await run_in_threadpool(ingester.run, iter(file.file.readline, b""))
+
+
+# Network Matcher Endpoints
+
+class IntroHop(BaseModel):
+    person_id: str
+    name: str
+
+class IntroPath(BaseModel):
+    strength: float  # 100 * product of the relationship strengths along the path (each / 100)
+    hops: int
+    path: list[IntroHop]
+
+@app.get("/api/network/paths", response_model=list[IntroPath])
+def intro_paths(company: str, k: int = 3, db: Session = Depends(get_db)):
+    """
+    How do I reach `company`? The k strongest warm-introduction paths,
+    each ending at a different person who works there.
+    """
+    from app.services.network_graph import get_network_graph
+    if not 1 <= k <= 50:
+        raise HTTPException(status_code=400, detail="k must be between 1 and 50")
+    graph = get_network_graph()
+    graph.refresh(db)
+    return graph.intro_paths(company, k)
+
+@app.get("/api/network/graph/stats")
+def network_graph_stats():
+    """Size, pending overlay and age of the in-memory network graph."""
+    from app.services.network_graph import get_network_graph
+    return get_network_graph().stats()
+
+
 # Guide Agent Endpoints
 
 class CritiqueRequest(BaseModel):
@@ -243,6 +836,38 @@ class CritiqueResponse(BaseModel):
     critique: str
     question: str
 
+class CritiqueBatchRequest(BaseModel):
+    profile_id: Optional[str] = None
+    bullets: Optional[list[str]] = None
+    domain: Optional[str] = None  # Defaults to the profile's primary domain
+    years_experience: Optional[int] = None
+    stream: bool = False
+
+class CritiqueBatchItem(BaseModel):
+    index: int
+    bullet_text: str
+    path: Optional[str] = None
+    missing_components: Optional[list[str]] = None
+    critique: Optional[str] = None
+    question: Optional[str] = None
+    source: Optional[str] = None  # "prescreen" (local rules) or "llm"
+    error: Optional[str] = None
+
+class CritiqueBatchResponse(BaseModel):
+    results: list[CritiqueBatchItem]
+    total_bullets: int
+    unique_bullets: int
+
+class CritiqueStaleRequest(BaseModel):
+    domain: Optional[str] = None  # Defaults to the profile's primary domain
+    years_experience: Optional[int] = None
+
+class CritiqueStaleResponse(BaseModel):
+    profile_id: str
+    results: list[CritiqueBatchItem]
+    unique_bullets: int
+    remaining_stale: int
+
 class RefineRequest(BaseModel):
     original_text: str
     context_answer: str
@@ -272,6 +897,176 @@ def critique_bullet(req: CritiqueRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/guide/critique/batch", response_model=CritiqueBatchResponse)
+def critique_bullets_batch(req: CritiqueBatchRequest, db: Session = Depends(get_db)):
+    """
+    Agent B (DSPy): Critique every bullet of a profile (or a given list) at once.
+    Identical bullets are critiqued once. With stream=true, results are sent
+    as Server-Sent Events (`result` per bullet, then `done`) as they finish.
+    """
+    from app.services.guide_service import normalize_bullet, profile_bullets
+    
+    if (req.profile_id is None) == (req.bullets is None):
+        raise HTTPException(status_code=400, detail="Provide either profile_id or bullets")
+    
+    domain, experience = req.domain, req.years_experience
+    if req.profile_id is not None:
+        from app.services.resume_service import ResumeService
+        try:
+            profile_uuid = uuid.UUID(req.profile_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid profile ID format")
+        projected = ResumeService(db).get_projected_content(
+            profile_uuid, [("work_experience",), ("meta",)]
+        )
+        if projected is None:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        content = projected[1]
+        meta = content.get("meta") or {}
+        domain = domain or meta.get("primary_domain")
+        experience = experience if experience is not None else meta.get("years_experience")
+        bullets = profile_bullets(content)
+    else:
+        bullets = [{"text": text, "path": None} for text in req.bullets if text and text.strip()]
+    
+    domain = domain or "General"
+    experience = experience if experience is not None else 5
+    
+    try:
+        from app.services.guide_service import get_guide_service
+        guide_service = get_guide_service()
+    except ImportError:
+        raise HTTPException(status_code=500, detail="dspy-ai not installed")
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    # Positions of each distinct bullet, so one critique answers all its copies
+    positions: dict = {}
+    for index, bullet in enumerate(bullets):
+        positions.setdefault(normalize_bullet(bullet["text"]), []).append(index)
+    
+    def items(text, result, error):
+        fields = dict(result or {})
+        fields["source"] = fields.get("source", "llm") if result else None
+        for index in positions[text]:
+            yield CritiqueBatchItem(
+                index=index,
+                bullet_text=bullets[index]["text"],
+                path=bullets[index]["path"],
+                error=error,
+                **fields
+            )
+    
+    results = guide_service.critique_many(list(positions), domain=domain, experience=experience)
+    
+    if req.stream:
+        def events():
+            for text, result, error in results:
+                for item in items(text, result, error):
+                    yield _sse("result", item.model_dump())
+            yield _sse("done", {"total_bullets": len(bullets), "unique_bullets": len(positions)})
+        
+        return StreamingResponse(
+            events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    
+    collected = [item for text, result, error in results for item in items(text, result, error)]
+    return CritiqueBatchResponse(
+        results=sorted(collected, key=lambda item: item.index),
+        total_bullets=len(bullets),
+        unique_bullets=len(positions)
+    )
+
+@app.post("/api/resume/{profile_id}/critique-stale", response_model=CritiqueStaleResponse)
+def critique_stale_bullets(
+    profile_id: str,
+    req: Optional[CritiqueStaleRequest] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Agent B (DSPy): Critique only the accomplishments that are new or were
+    edited since their last critique, and store the critiques on the profile.
+    """
+    from app.services.resume_service import ResumeService
+    
+    try:
+        profile_uuid = uuid.UUID(profile_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid profile ID format")
+    req = req or CritiqueStaleRequest()
+    
+    try:
+        from app.services.guide_service import get_guide_service
+        guide_service = get_guide_service()
+    except ImportError:
+        raise HTTPException(status_code=500, detail="dspy-ai not installed")
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    try:
+        outcome = ResumeService(db).critique_stale_bullets(
+            profile_uuid, guide_service, domain=req.domain, experience=req.years_experience
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    return CritiqueStaleResponse(
+        profile_id=profile_id,
+        results=[
+            CritiqueBatchItem(index=index, bullet_text=item["text"], path=item["path"],
+                              error=item["error"], **(item["result"] or {}))
+            for index, item in enumerate(outcome["results"])
+        ],
+        unique_bullets=outcome["unique_bullets"],
+        remaining_stale=outcome["remaining_stale"]
+    )
+
+@app.get("/api/guide/cache/stats")
+def guide_cache_stats():
+    """Hit/miss counters for the critique/refine memo."""
+    try:
+        from app.services.guide_service import get_guide_service
+        guide_service = get_guide_service()
+    except ImportError:
+        raise HTTPException(status_code=500, detail="dspy-ai not installed")
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if not guide_service.cache:
+        return {"enabled": False}
+    return {"enabled": True, **guide_service.cache.stats()}
+
+@app.get("/api/guide/prescreen/stats")
+def guide_prescreen_stats():
+    """How many bullets the local STAR screen decided vs escalated to the LLM."""
+    try:
+        from app.services.guide_service import get_guide_service
+        guide_service = get_guide_service()
+    except ImportError:
+        raise HTTPException(status_code=500, detail="dspy-ai not installed")
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if not guide_service.prescreen:
+        return {"enabled": False}
+    return {"enabled": True, **guide_service.prescreen.stats()}
+
+@app.get("/api/guide/program")
+def guide_program_info():
+    """Manifest of the compiled guide program in use (or the generic one)."""
+    try:
+        from app.services.guide_service import get_guide_service
+        guide_service = get_guide_service()
+    except ImportError:
+        raise HTTPException(status_code=500, detail="dspy-ai not installed")
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {
+        "compiled": guide_service.program_manifest is not None,
+        "manifest": guide_service.program_manifest,
+        "fingerprint": guide_service.fingerprint(),
+    }
+
 @app.post("/api/guide/refine", response_model=RefineResponse)
 def refine_bullet(req: RefineRequest):
     """
@@ -1,8 +1,10 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, CheckConstraint, ForeignKey, JSON, Text, DECIMAL, Date
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, CheckConstraint, ForeignKey, JSON, LargeBinary, Text, DECIMAL, Date, UniqueConstraint, Index, true
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import validates
 from sqlalchemy.sql import func
 import uuid
 from app.database import Base
+from app.skill_names import normalize_skills
 
 class Job(Base):
     __tablename__ = "jobs"
@@ -11,6 +13,9 @@ class Job(Base):
     title = Column(String(255), nullable=False)
     company = Column(String(255), nullable=False)
     url = Column(Text)
+    # Dedupe key and change detector for ingested postings (see services/job_ingestion.py)
+    url_hash = Column(String(64))
+    content_hash = Column(String(64))
     discovered_date = Column(DateTime, server_default=func.now())
     
     # Scoring and Status
@@ -20,6 +25,8 @@ class Job(Base):
     # Requirements
     required_skills = Column(JSON)
     nice_to_have_skills = Column(JSON)
+    # Canonical spellings of required_skills (see skill_names.py), kept in step by the validator below
+    normalized_skills = Column(JSON().with_variant(JSONB(), "postgresql"))
     
     # Details
     salary_range = Column(JSON)
@@ -29,6 +36,9 @@ class Job(Base):
     
     # Metadata
     raw_description = Column(Text)
+    # MinHash of raw_description, and the canonical job of its near-duplicate cluster (see services/near_duplicates.py)
+    minhash = Column(LargeBinary)
+    duplicate_of = Column(UUID(as_uuid=True), ForeignKey('jobs.job_id', ondelete='SET NULL'), nullable=True)
     company_size = Column(String(50))
     industry = Column(String(100))
     
@@ -38,8 +48,18 @@ class Job(Base):
     __table_args__ = (
         CheckConstraint('fit_score >= 0 AND fit_score <= 100', name='check_fit_score'),
         CheckConstraint("status IN ('discovered', 'analyzed', 'applied', 'responded', 'rejected', 'passed')", name='check_status'),
+        # Answers normalized_skills ?| / ?& (jobs requiring any/all of a skill list)
+        Index('ix_jobs_normalized_skills', 'normalized_skills', postgresql_using='gin'),
+        # ON CONFLICT target for ingestion upserts
+        Index('ix_jobs_url_hash', 'url_hash', unique=True),
+        Index('ix_jobs_duplicate_of', 'duplicate_of'),
     )
 
+    @validates('required_skills')
+    def _normalize_required_skills(self, key, skills):
+        self.normalized_skills = normalize_skills(skills)
+        return skills
+
 class Network(Base):
     __tablename__ = "network"
 
@@ -72,6 +92,8 @@ class Network(Base):
 
     __table_args__ = (
         CheckConstraint('relationship_strength >= 0 AND relationship_strength <= 100', name='check_rel_strength'),
+        # Change feed for the in-memory network graph (services/network_graph.py)
+        Index('ix_network_updated_at', 'updated_at'),
     )
 
 class ResumeProfile(Base):
@@ -82,15 +104,75 @@ class ResumeProfile(Base):
     
     # The Core NoSQL Document
     # Structure: { "basics": {}, "work_experience": [], "skills": [], "education": [] }
-    content = Column(JSON, default={})
+    # JSONB on Postgres so sections can be extracted server-side
+    content = Column(JSON().with_variant(JSONB(), "postgresql"), default={})
     
     # Metadata
     owner_id = Column(UUID(as_uuid=True)) # Link to User if needed later
     is_active = Column(Boolean, default=True)
     
+    # Bumped on every content write; clients send it back to detect conflicting edits
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    # ORM updates check and increment `version` (compare-and-swap)
+    __mapper_args__ = {"version_id_col": version}
+
+    # Keyset pagination of the listing, newest first; deleted profiles aren't indexed
+    __table_args__ = (
+        Index(
+            'ix_resume_profiles_active_listing', 'created_at', 'profile_id',
+            postgresql_where=is_active.is_(true()), sqlite_where=is_active.is_(true())
+        ),
+        Index(
+            'ix_resume_profiles_owner_listing', 'owner_id', 'created_at', 'profile_id',
+            postgresql_where=is_active.is_(true()), sqlite_where=is_active.is_(true())
+        ),
+    )
+
+class ResumeRawText(Base):
+    """Extracted PDF text for a profile, kept out of the profile document."""
+    __tablename__ = "resume_raw_texts"
+
+    profile_id = Column(UUID(as_uuid=True), ForeignKey("resume_profiles.profile_id", ondelete="CASCADE"), primary_key=True)
+    raw_text = Column(Text, nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
+
+class ResumeVersion(Base):
+    """
+    One entry in a profile's history: the full document (snapshot) or the
+    delta from the previous version (see app.services.resume_history).
+    """
+    __tablename__ = "resume_versions"
+
+    version_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    version_name = Column(String(255))
+    created_date = Column(DateTime, server_default=func.now())
+    targeted_role_type = Column(String(100))
+    
+    # History of a profile
+    profile_id = Column(UUID(as_uuid=True), ForeignKey("resume_profiles.profile_id", ondelete="CASCADE"))
+    version_number = Column(Integer)
+    is_snapshot = Column(Boolean, default=False)
+    content = Column(JSON)  # Snapshots only
+    delta = Column(JSON)  # {"patch": [...]} or {"merge": {...}} from the previous version
+    
+    rendered_formats = Column(JSON)
+    performance_metrics = Column(JSON)
+    tailored_for_job_ids = Column(JSON)
+    key_skills_emphasized = Column(JSON)
+    sections_modified = Column(JSON)
+    is_active = Column(Boolean, default=True)
+    
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        UniqueConstraint('profile_id', 'version_number', name='uq_resume_version_number'),
+    )
+
 class Decision(Base):
     __tablename__ = "decisions"
 
@@ -183,3 +265,62 @@ class UserPreference(Base):
     
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+class ParseCacheEntry(Base):
+    __tablename__ = "parse_cache"
+
+    cache_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    
+    # Content addresses (sha256 hex)
+    pdf_sha256 = Column(String(64), index=True)
+    text_sha256 = Column(String(64), nullable=False, index=True)
+    
+    # What produced the result; a new model or prompt never reuses old rows
+    model = Column(String(100), nullable=False)
+    prompt_version = Column(String(64), nullable=False)
+    
+    content = Column(JSON, nullable=False)
+    raw_text = Column(Text)
+    
+    hit_count = Column(Integer, default=0)
+    last_hit_at = Column(DateTime, server_default=func.now())
+    created_at = Column(DateTime, server_default=func.now())
+
+class GuideCacheEntry(Base):
+    __tablename__ = "guide_cache"
+
+    # sha256 of the normalized inputs and the program fingerprint
+    cache_key = Column(String(64), primary_key=True)
+    kind = Column(String(20), nullable=False)  # 'critique' or 'refine'
+    
+    # DSPy signatures/demos + model that produced the result
+    program_fingerprint = Column(String(64), nullable=False, index=True)
+    
+    result = Column(JSON, nullable=False)
+    
+    hit_count = Column(Integer, default=0)
+    last_hit_at = Column(DateTime, server_default=func.now())
+    expires_at = Column(DateTime, nullable=False, index=True)
+    created_at = Column(DateTime, server_default=func.now())
+
+class ImportCheckpoint(Base):
+    __tablename__ = "import_checkpoints"
+
+    checkpoint_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    import_id = Column(String(64), nullable=False, index=True)
+    
+    # sha256 of the PDF, so renamed or reordered files still match
+    file_key = Column(String(64), nullable=False)
+    filename = Column(Text)
+    
+    status = Column(String(20), nullable=False)
+    profile_id = Column(UUID(as_uuid=True), ForeignKey('resume_profiles.profile_id'), nullable=True)
+    error = Column(Text)
+    
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint('import_id', 'file_key', name='uq_import_checkpoint_file'),
+        CheckConstraint("status IN ('stored', 'failed')", name='check_import_status'),
+    )
@@ -0,0 +1,292 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+
+from app.database import SessionLocal
+from app.models import ImportCheckpoint
+from app.services.rate_limit import TokenBucket
+from app.services.resume_service import ResumeService
+from app.uploads import MAX_UPLOAD_BYTES
+
+STORED = "stored"
+FAILED = "failed"
+
+HASH_CHUNK_BYTES = 1024 * 1024
+
+# Where zips uploaded through the API are kept while they import
+BULK_IMPORT_DIR = os.getenv("BULK_IMPORT_DIR", os.path.join(tempfile.gettempdir(), "resume-bulk-import"))
+
+
+class FileTooLarge(Exception):
+    """Raised when loading an import file over MAX_UPLOAD_BYTES."""
+
+
+def _oversize(name: str) -> Tuple[str, Callable]:
+    """(file_key, load) for a file too large to parse: keyed by name, since its content is never read."""
+    def load():
+        raise FileTooLarge(f"File exceeds {MAX_UPLOAD_BYTES} bytes")
+    return hashlib.sha256(f"oversize:{name}".encode("utf-8")).hexdigest(), load
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def default_import_id(source: str) -> str:
+    """Stable id for a source, so re-running the same import resumes it."""
+    if zipfile.is_zipfile(source):
+        return file_sha256(source)[:32]
+    return hashlib.sha256(os.path.abspath(source).encode("utf-8")).hexdigest()[:32]
+
+
+def iter_pdf_sources(source: str) -> Iterator[Tuple[str, str, Callable]]:
+    """
+    Yield (name, file_key, load) for every PDF in a directory (recursively)
+    or zip archive. `load()` returns bytes or an open binary file, or raises
+    FileTooLarge for files over MAX_UPLOAD_BYTES.
+    """
+    if os.path.isdir(source):
+        for root, _, files in os.walk(source):
+            for filename in sorted(files):
+                if not filename.lower().endswith(".pdf"):
+                    continue
+                path = os.path.join(root, filename)
+                name = os.path.relpath(path, source)
+                if os.path.getsize(path) > MAX_UPLOAD_BYTES:
+                    yield (name, *_oversize(name))
+                    continue
+                yield name, file_sha256(path), lambda path=path: open(path, "rb")
+        return
+
+    if not zipfile.is_zipfile(source):
+        raise ValueError(f"{source} is neither a directory nor a zip archive")
+
+    with zipfile.ZipFile(source) as archive:
+        for info in archive.infolist():
+            if info.is_dir() or not info.filename.lower().endswith(".pdf"):
+                continue
+            if os.path.basename(info.filename).startswith("._"):
+                continue  # macOS resource forks
+            if info.file_size > MAX_UPLOAD_BYTES:
+                yield (info.filename, *_oversize(info.filename))
+                continue
+            data = archive.read(info)
+            yield info.filename, hashlib.sha256(data).hexdigest(), lambda data=data: data
+
+
+class BulkImporter:
+    """
+    Imports a directory or zip of resume PDFs.
+
+    Files are parsed on a bounded pool under an optional LLM tokens-per-minute
+    budget, and stored in batched transactions that also record a checkpoint
+    per file. Re-running an import skips files already stored; parses lost to
+    an interruption before their batch committed are served from the parse
+    cache rather than paid for again.
+    """
+
+    def __init__(
+        self,
+        parser,
+        session_factory: Callable = SessionLocal,
+        concurrency: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ):
+        self.parser = parser
+        self.session_factory = session_factory
+        self.concurrency = concurrency or int(os.getenv("BULK_IMPORT_CONCURRENCY", "4"))
+        self.batch_size = batch_size or int(os.getenv("BULK_IMPORT_BATCH_SIZE", "20"))
+
+        tokens_per_minute = tokens_per_minute or int(os.getenv("BULK_IMPORT_TOKENS_PER_MINUTE", "0"))
+        self.token_budget = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+    def run(
+        self,
+        source: str,
+        import_id: Optional[str] = None,
+        progress: Optional[Callable[[dict], None]] = None,
+    ) -> dict:
+        import_id = import_id or default_import_id(source)
+        started = time.monotonic()
+        report = {"import_id": import_id, "stored": 0, "failed": 0, "skipped": 0, "duplicates": 0}
+
+        done = self._stored_keys(import_id)
+        seen = set()
+        batch: List[dict] = []
+
+        def collect(future):
+            batch.append(future.result())
+            if len(batch) >= self.batch_size:
+                self._write_batch(import_id, batch, report)
+                batch.clear()
+                if progress:
+                    progress(dict(report))
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="bulk-import") as pool:
+            pending = set()
+            for name, file_key, load in iter_pdf_sources(source):
+                if file_key in done:
+                    report["skipped"] += 1
+                    continue
+                if file_key in seen:
+                    report["duplicates"] += 1
+                    continue
+                seen.add(file_key)
+
+                # Keep a bounded window in flight so large zips aren't all in memory
+                while len(pending) >= self.concurrency * 2:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        collect(future)
+                pending.add(pool.submit(self._parse_one, name, file_key, load))
+
+            for future in pending:
+                collect(future)
+
+        if batch:
+            self._write_batch(import_id, batch, report)
+
+        report["elapsed_seconds"] = round(time.monotonic() - started, 2)
+        if progress:
+            progress(dict(report))
+        return report
+
+    def _parse_one(self, name: str, file_key: str, load: Callable) -> dict:
+        result = {"filename": name, "file_key": file_key, "content": None, "error": None}
+        source = None
+        try:
+            source = load()
+            result["content"] = self.parser.parse_pdf(source, before_llm=self._wait_for_budget)
+        except Exception as e:
+            result["error"] = str(e)
+        finally:
+            if hasattr(source, "close"):
+                source.close()
+        return result
+
+    def _wait_for_budget(self, raw_text: str):
+        if self.token_budget:
+            from app.services.pdf_parser import estimate_parse_tokens
+            self.token_budget.acquire(estimate_parse_tokens(raw_text))
+
+    def _stored_keys(self, import_id: str) -> set:
+        db = self.session_factory()
+        try:
+            rows = db.query(ImportCheckpoint.file_key).filter(
+                ImportCheckpoint.import_id == import_id,
+                ImportCheckpoint.status == STORED,
+            )
+            return {row.file_key for row in rows}
+        finally:
+            db.close()
+
+    def _write_batch(self, import_id: str, batch: List[dict], report: dict):
+        """Insert the batch's profiles and checkpoints in one transaction."""
+        db = self.session_factory()
+        try:
+            service = ResumeService(db)
+            checkpoints = []
+            for result in batch:
+                profile_id = None
+                if result["content"] is not None:
+                    profile_id = service.create_parsed_profile(result["content"], commit=False).profile_id
+                checkpoints.append({
+                    "import_id": import_id,
+                    "file_key": result["file_key"],
+                    "filename": result["filename"],
+                    "status": STORED if profile_id else FAILED,
+                    "profile_id": profile_id,
+                    "error": result["error"],
+                })
+            db.flush()
+
+            stmt = insert(ImportCheckpoint).values(checkpoints)
+            db.execute(stmt.on_conflict_do_update(
+                constraint="uq_import_checkpoint_file",
+                set_={
+                    "filename": stmt.excluded.filename,
+                    "status": stmt.excluded.status,
+                    "profile_id": stmt.excluded.profile_id,
+                    "error": stmt.excluded.error,
+                    "updated_at": func.now(),
+                },
+            ))
+            db.commit()
+        finally:
+            db.close()
+
+        for checkpoint in checkpoints:
+            report[checkpoint["status"]] += 1
+
+
+def import_status(db, import_id: str) -> dict:
+    """Per-status checkpoint counts and the most recent failures for an import."""
+    counts = dict(
+        db.query(ImportCheckpoint.status, func.count())
+        .filter(ImportCheckpoint.import_id == import_id)
+        .group_by(ImportCheckpoint.status)
+        .all()
+    )
+    failures = db.query(ImportCheckpoint.filename, ImportCheckpoint.error).filter(
+        ImportCheckpoint.import_id == import_id,
+        ImportCheckpoint.status == FAILED,
+    ).order_by(ImportCheckpoint.updated_at.desc()).limit(20).all()
+    return {
+        "import_id": import_id,
+        "stored": counts.get(STORED, 0),
+        "failed": counts.get(FAILED, 0),
+        "recent_failures": [{"filename": f, "error": e} for f, e in failures],
+    }
+
+
+# Imports started through the API, by import id
+_running: Dict[str, dict] = {}
+_running_lock = threading.Lock()
+
+
+def start_background_import(source: str, import_id: str, cleanup: bool = False) -> bool:
+    """
+    Run an import on a background thread. Returns False if that import is
+    already running. With cleanup=True the source file is deleted afterwards.
+    """
+    with _running_lock:
+        if import_id in _running and _running[import_id].get("running"):
+            return False
+        _running[import_id] = {"running": True, "report": None, "error": None}
+
+    def target():
+        state = _running[import_id]
+        try:
+            from app.services.pdf_parser import get_pdf_parser
+            importer = BulkImporter(get_pdf_parser())
+            state["report"] = importer.run(
+                source, import_id, progress=lambda report: state.update(report=report)
+            )
+        except Exception as e:
+            state["error"] = str(e)
+        finally:
+            state["running"] = False
+            if cleanup and os.path.exists(source):
+                os.remove(source)
+
+    threading.Thread(target=target, name=f"bulk-import-{import_id[:8]}", daemon=True).start()
+    return True
+
+
+def running_import(import_id: str) -> Optional[dict]:
+    with _running_lock:
+        state = _running.get(import_id)
+        return dict(state) if state else None
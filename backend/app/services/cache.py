@@ -0,0 +1,208 @@
+import json
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Hashable, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU with an entry limit, an optional size budget
+    and hit/miss/eviction counters.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_size: Optional[int] = None,
+        size_of: Callable[[Any], int] = lambda value: 1,
+    ):
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.size_of = size_of
+
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key: Hashable, value: Any):
+        size = self.size_of(value)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._size -= old[1]
+            if self.max_size is not None and size > self.max_size:
+                return  # Never cache a single value larger than the whole budget
+            self._data[key] = (value, size)
+            self._size += size
+            self._evict()
+
+    def pop(self, key: Hashable) -> Any:
+        with self._lock:
+            item = self._data.pop(key, None)
+            if item is None:
+                return None
+            self._size -= item[1]
+            return item[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "size": self._size,
+                "max_entries": self.max_entries,
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def _evict(self):
+        # Caller holds self._lock
+        while self._data and (
+            len(self._data) > self.max_entries
+            or (self.max_size is not None and self._size > self.max_size)
+        ):
+            _, (_, size) = self._data.popitem(last=False)
+            self._size -= size
+            self.evictions += 1
+
+
+class TwoTierCache(ABC):
+    """
+    An in-process LRU in front of a database table of entries with
+    `hit_count` and `last_hit_at` columns.
+
+    Memory values are JSON strings, so every hit hands out a fresh, mutable
+    copy. Subclasses build keys and queries and say how a database entry is
+    kept in memory; `_lookup` and `_write` count database hits, misses and
+    errors (under `_lock`, like the LRU's own counters).
+    """
+
+    entry_model = None  # The table's mapped class
+
+    def __init__(self, session_factory: Callable, memory: LRUCache):
+        self.session_factory = session_factory
+        self.memory = memory
+
+        self.db_hits = 0
+        self.db_misses = 0
+        self.db_errors = 0
+        self._lock = threading.Lock()
+
+    def _memory_get(self, key: Hashable) -> Optional[str]:
+        return self.memory.get(key)
+
+    @abstractmethod
+    def _remember(self, entry) -> str:
+        """Put a database entry in memory and return its JSON payload."""
+
+    def _lookup(self, key: Hashable, fetch: Callable) -> Optional[Any]:
+        """Memory first, then `fetch(db)` (an entry or None), which is marked as hit."""
+        payload = self._memory_get(key)
+        if payload is not None:
+            return json.loads(payload)
+
+        try:
+            db = self.session_factory()
+            try:
+                entry = fetch(db)
+                if entry is None:
+                    with self._lock:
+                        self.db_misses += 1
+                    return None
+
+                entry.hit_count = (entry.hit_count or 0) + 1
+                entry.last_hit_at = datetime.utcnow()
+                db.commit()
+                payload = self._remember(entry)
+            finally:
+                db.close()
+        except SQLAlchemyError:
+            # An unreachable second tier degrades to a miss, never a failed caller
+            with self._lock:
+                self.db_errors += 1
+                self.db_misses += 1
+            return None
+
+        with self._lock:
+            self.db_hits += 1
+        return json.loads(payload)
+
+    def _write(self, entry, merge: bool = False):
+        """Add (or merge) an entry; a database error is counted, not raised."""
+        try:
+            db = self.session_factory()
+            try:
+                if merge:
+                    db.merge(entry)
+                else:
+                    db.add(entry)
+                db.commit()
+                self._after_write(db)
+            finally:
+                db.close()
+        except SQLAlchemyError:
+            with self._lock:
+                self.db_errors += 1
+
+    def _after_write(self, db):
+        pass
+
+    def _delete(self, *criteria) -> int:
+        """Delete entries matching `criteria` (errors propagate: this is maintenance)."""
+        db = self.session_factory()
+        try:
+            deleted = db.query(self.entry_model).filter(*criteria).delete(synchronize_session=False)
+            db.commit()
+            return deleted
+        finally:
+            db.close()
+
+    def stats(self) -> dict:
+        memory = self.memory.stats()
+        with self._lock:
+            hits, misses, errors = self.db_hits, self.db_misses, self.db_errors
+        db_lookups = hits + misses
+        return {
+            "memory": memory,
+            "db": {
+                "hits": hits,
+                "misses": misses,
+                "errors": errors,
+                "hit_rate": round(hits / db_lookups, 4) if db_lookups else 0.0,
+            },
+            # A DB lookup only happens after a memory miss
+            "hits": memory["hits"] + hits,
+            "misses": misses,
+        }
@@ -0,0 +1,276 @@
+"""Vectorized batch fit scoring of jobs against a candidate."""
+import re
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import Integer, Text, bindparam, cast, func, literal, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.orm import Session
+
+from app.models import Job, ResumeProfile, UserPreference
+from app.services.skills import profile_skills
+from app.skill_names import normalize_skill
+
+# fit_score = 100 * weighted mean of the terms below (0 on a deal breaker); missing data scores NEUTRAL
+REQUIRED_WEIGHT = 0.55
+NICE_WEIGHT = 0.15
+SALARY_WEIGHT = 0.15
+REMOTE_WEIGHT = 0.15
+NEUTRAL = 0.5
+
+# Pay below this fraction of the candidate's minimum scores 0; the fit rises linearly to 1 at the minimum
+SALARY_FLOOR = 0.8
+
+# Jobs read from the database per round trip when scoring the whole table
+LOAD_BATCH_SIZE = 5000
+
+REMOTE, HYBRID, ONSITE, UNKNOWN = range(4)
+
+# Rows: the candidate's remote_preference; columns: the job's policy code
+_REMOTE_FIT = {
+    "remote_only": np.array([1.0, 0.4, 0.0, NEUTRAL]),
+    "hybrid": np.array([1.0, 1.0, 0.3, NEUTRAL]),
+}
+_NO_PREFERENCE = np.array([1.0, 1.0, 1.0, 1.0])
+
+_POLICY_DEAL_BREAKERS = {"no_remote": REMOTE, "no_hybrid": HYBRID, "no_onsite": ONSITE}
+
+
+def remote_code(policy: Optional[str]) -> int:
+    policy = (policy or "").lower()
+    if "hybrid" in policy:
+        return HYBRID
+    if "remote" in policy:
+        return REMOTE
+    if "site" in policy or "office" in policy:
+        return ONSITE
+    return UNKNOWN
+
+
+def _salary_top(salary_range) -> float:
+    """The top of a job's salary range, or NaN when it isn't stated."""
+    if not isinstance(salary_range, dict):
+        return np.nan
+    for key in ("max", "min"):
+        try:
+            value = float(salary_range.get(key))
+        except (TypeError, ValueError):
+            continue
+        if value > 0:
+            return value
+    return np.nan
+
+
+class Candidate:
+    """What the jobs are scored against: a skill set plus search preferences."""
+
+    def __init__(
+        self,
+        skills: Iterable[str],
+        min_salary: Optional[int] = None,
+        remote_preference: Optional[str] = None,
+        deal_breakers: Sequence[str] = (),
+    ):
+        self.skills = {normalize_skill(skill) for skill in skills}
+        self.min_salary = min_salary
+        self.remote_preference = remote_preference
+        self.deal_breakers = [normalize_skill(item).replace(" ", "_") for item in deal_breakers or ()]
+
+    @classmethod
+    def from_profile(cls, content: Optional[dict], preference: Optional[UserPreference] = None) -> "Candidate":
+        skills = profile_skills(content)
+        if preference is None:
+            return cls(skills)
+        skills |= {normalize_skill(skill) for skill in preference.core_skills or [] if isinstance(skill, str)}
+        return cls(
+            skills,
+            min_salary=preference.min_salary,
+            remote_preference=preference.remote_preference,
+            deal_breakers=preference.deal_breakers or (),
+        )
+
+
+class JobBatch:
+    """A batch of jobs encoded as arrays, sharing one skill vocabulary."""
+
+    def __init__(self):
+        self.job_ids: List = []
+        self.titles: List[str] = []
+        self.vocabulary: Dict[str, int] = {}
+        self._ids_by_spelling: Dict[str, int] = {}  # Raw skill text -> id, skipping re-normalization
+        self._required_skills: List[int] = []
+        self._required_rows: List[int] = []
+        self._nice_skills: List[int] = []
+        self._nice_rows: List[int] = []
+        self._salary: List[float] = []
+        self._remote: List[int] = []
+
+    def _encode_skills(self, skills, row: int, ids: List[int], rows: List[int]):
+        seen = set()
+        for skill in skills if isinstance(skills, list) else ():
+            skill_id = self._ids_by_spelling.get(skill) if isinstance(skill, str) else None
+            if skill_id is None:
+                if not isinstance(skill, str) or not skill.strip():
+                    continue
+                skill_id = self.vocabulary.setdefault(normalize_skill(skill), len(self.vocabulary))
+                self._ids_by_spelling[skill] = skill_id
+            if skill_id not in seen:
+                seen.add(skill_id)
+                ids.append(skill_id)
+                rows.append(row)
+
+    def add(self, job_id, title, required_skills, nice_to_have_skills, salary_range, remote_policy):
+        row = len(self.job_ids)
+        self.job_ids.append(job_id)
+        self.titles.append(title or "")
+        self._encode_skills(required_skills, row, self._required_skills, self._required_rows)
+        self._encode_skills(nice_to_have_skills, row, self._nice_skills, self._nice_rows)
+        self._salary.append(_salary_top(salary_range))
+        self._remote.append(remote_code(remote_policy))
+
+    @classmethod
+    def from_jobs(cls, jobs: Iterable) -> "JobBatch":
+        """Encode Job rows (ORM objects or rows with the same attribute names)."""
+        batch = cls()
+        for job in jobs:
+            batch.add(
+                job.job_id, job.title, job.required_skills, job.nice_to_have_skills,
+                job.salary_range, job.remote_policy,
+            )
+        return batch
+
+    def __len__(self) -> int:
+        return len(self.job_ids)
+
+    def arrays(self) -> dict:
+        return {
+            "required_skills": np.array(self._required_skills, dtype=np.int32),
+            "required_rows": np.array(self._required_rows, dtype=np.int32),
+            "nice_skills": np.array(self._nice_skills, dtype=np.int32),
+            "nice_rows": np.array(self._nice_rows, dtype=np.int32),
+            "salary": np.array(self._salary, dtype=np.float64),
+            "remote": np.array(self._remote, dtype=np.int8),
+        }
+
+
+def _coverage(has_skill: np.ndarray, skills: np.ndarray, rows: np.ndarray, job_count: int) -> np.ndarray:
+    """Per job, the fraction of its listed skills the candidate has (NEUTRAL if none listed)."""
+    listed = np.bincount(rows, minlength=job_count)
+    matched = np.bincount(rows, weights=has_skill[skills], minlength=job_count)
+    coverage = np.full(job_count, NEUTRAL)
+    np.divide(matched, listed, out=coverage, where=listed > 0)
+    return coverage
+
+
+def _deal_breaker_mask(batch: JobBatch, remote: np.ndarray, deal_breakers: List[str]) -> np.ndarray:
+    blocked = np.zeros(len(batch), dtype=bool)
+    title_terms = []
+    for item in deal_breakers:
+        if item in _POLICY_DEAL_BREAKERS:
+            blocked |= remote == _POLICY_DEAL_BREAKERS[item]
+        elif item.startswith("no_") and len(item) > 3:
+            title_terms.append(item[3:].replace("_", " "))
+    if title_terms:
+        pattern = re.compile(r"\b(" + "|".join(re.escape(term) for term in title_terms) + r")\b", re.IGNORECASE)
+        blocked |= np.fromiter((bool(pattern.search(title)) for title in batch.titles), dtype=bool, count=len(batch))
+    return blocked
+
+
+def score_jobs(batch: JobBatch, candidate: Candidate) -> np.ndarray:
+    """Fit scores (0-100, int) for every job in the batch, in batch order."""
+    job_count = len(batch)
+    if not job_count:
+        return np.zeros(0, dtype=np.int16)
+    arrays = batch.arrays()
+
+    has_skill = np.zeros(len(batch.vocabulary), dtype=np.float64)
+    known = [batch.vocabulary[skill] for skill in candidate.skills if skill in batch.vocabulary]
+    has_skill[known] = 1.0
+
+    required = _coverage(has_skill, arrays["required_skills"], arrays["required_rows"], job_count)
+    nice = _coverage(has_skill, arrays["nice_skills"], arrays["nice_rows"], job_count)
+
+    salary = arrays["salary"]
+    if candidate.min_salary:
+        ratio = salary / candidate.min_salary
+        salary_fit = np.clip((ratio - SALARY_FLOOR) / (1 - SALARY_FLOOR), 0.0, 1.0)
+        salary_fit[np.isnan(salary)] = NEUTRAL
+    else:
+        salary_fit = np.ones(job_count)
+
+    remote_table = _REMOTE_FIT.get((candidate.remote_preference or "").lower(), _NO_PREFERENCE)
+    remote_fit = remote_table[arrays["remote"]]
+
+    total_weight = REQUIRED_WEIGHT + NICE_WEIGHT + SALARY_WEIGHT + REMOTE_WEIGHT
+    fit = (
+        REQUIRED_WEIGHT * required + NICE_WEIGHT * nice + SALARY_WEIGHT * salary_fit + REMOTE_WEIGHT * remote_fit
+    ) / total_weight
+    scores = np.rint(fit * 100).astype(np.int16)
+    scores[_deal_breaker_mask(batch, arrays["remote"], candidate.deal_breakers)] = 0
+    return scores
+
+
+def write_scores(db: Session, job_ids: Sequence, scores: np.ndarray) -> int:
+    """
+    Store fit scores (no commit). On Postgres this is a single
+    UPDATE ... FROM unnest(ids, scores) that skips rows whose score is
+    unchanged; elsewhere an executemany. Returns the rows updated.
+    """
+    if not len(job_ids):
+        return 0
+    if db.get_bind().dialect.name == "postgresql":
+        scored = func.unnest(
+            cast(literal([str(job_id) for job_id in job_ids], ARRAY(Text)), ARRAY(UUID(as_uuid=True))),
+            literal([int(score) for score in scores], ARRAY(Integer)),
+        ).table_valued("job_id", "fit_score").render_derived(name="scored")
+        statement = update(Job).where(
+            Job.job_id == scored.c.job_id,
+            Job.fit_score.is_distinct_from(scored.c.fit_score),
+        ).values(fit_score=scored.c.fit_score, updated_at=func.now())
+        return db.execute(statement).rowcount
+
+    statement = update(Job.__table__).where(Job.__table__.c.job_id == bindparam("scored_job_id")).values(
+        fit_score=bindparam("scored_fit_score"), updated_at=func.now()
+    )
+    result = db.execute(statement, [
+        {"scored_job_id": job_id, "scored_fit_score": int(score)} for job_id, score in zip(job_ids, scores)
+    ])
+    return result.rowcount
+
+
+def load_candidate(db: Session, profile_id, user_id=None) -> Candidate:
+    """
+    The candidate for a profile: its skills plus the search preferences of
+    `user_id` (default: the profile's owner), when any are stored.
+    """
+    row = db.query(ResumeProfile.content, ResumeProfile.owner_id).filter(
+        ResumeProfile.profile_id == profile_id
+    ).first()
+    if row is None:
+        raise ValueError(f"Profile {profile_id} not found")
+    preference_id = user_id or row.owner_id
+    preference = db.get(UserPreference, preference_id) if preference_id else None
+    return Candidate.from_profile(row.content, preference)
+
+
+def score_all_jobs(db: Session, candidate: Candidate, status: Optional[str] = None) -> dict:
+    """
+    Score every canonical job (optionally only those with `status`) and
+    write the scores back in one bulk UPDATE; near-duplicates are skipped.
+    Only the columns scoring needs are read.
+    """
+    query = db.query(
+        Job.job_id, Job.title, Job.required_skills, Job.nice_to_have_skills, Job.salary_range, Job.remote_policy
+    ).filter(Job.duplicate_of.is_(None))
+    if status:
+        query = query.filter(Job.status == status)
+    batch = JobBatch.from_jobs(query.execution_options(yield_per=LOAD_BATCH_SIZE))
+
+    scores = score_jobs(batch, candidate)
+    updated = write_scores(db, batch.job_ids, scores)
+    db.commit()
+    return {
+        "scored": len(batch),
+        "updated": updated,
+        "mean_score": round(float(scores.mean()), 1) if len(scores) else None,
+    }
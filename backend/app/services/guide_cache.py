@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, Optional
+
+from sqlalchemy import or_
+
+from app.database import SessionLocal
+from app.models import GuideCacheEntry
+from app.services.cache import LRUCache, TwoTierCache
+from app.services.parse_cache import normalize_text
+
+# Upper bounds of the years-of-experience buckets; critiques rarely change within one
+EXPERIENCE_BUCKETS = (1, 4, 9, 14)
+
+
+def experience_bucket(years) -> str:
+    try:
+        years = int(years)
+    except (TypeError, ValueError):
+        return "unknown"
+    lower = 0
+    for upper in EXPERIENCE_BUCKETS:
+        if years <= upper:
+            return f"{lower}-{upper}"
+        lower = upper + 1
+    return f"{lower}+"
+
+
+def program_fingerprint(signatures: Iterable, model: str, program=None) -> str:
+    """
+    Hash of everything that shapes a guide answer: each signature's
+    instructions and fields, the program's learned state (demos, if it has
+    been compiled) and the model name. Any change yields a new fingerprint,
+    so older cached answers stop matching.
+    """
+    material = {"model": model, "signatures": []}
+    for signature in signatures:
+        material["signatures"].append({
+            "name": signature.__name__,
+            "instructions": signature.instructions,
+            "fields": {
+                name: {key: str(value) for key, value in sorted((field.json_schema_extra or {}).items())}
+                for name, field in signature.fields.items()
+            },
+        })
+    if program is not None:
+        material["state"] = program.dump_state()
+    encoded = json.dumps(material, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _normalize_label(value: str) -> str:
+    return normalize_text(value or "").lower()
+
+
+class GuideCache(TwoTierCache):
+    """
+    Two-tier memo of critique/refine results.
+
+    Tier 1 is an in-process LRU; tier 2 is the guide_cache table. Keys cover
+    the normalized inputs, the experience bucket and the program fingerprint;
+    entries expire after `ttl_seconds`.
+    """
+
+    entry_model = GuideCacheEntry
+
+    def __init__(
+        self,
+        fingerprint: str,
+        session_factory: Callable = SessionLocal,
+        ttl_seconds: Optional[int] = None,
+        max_memory_entries: Optional[int] = None,
+    ):
+        # Memory values are (expires_at monotonic, JSON string)
+        super().__init__(session_factory, LRUCache(
+            max_entries=max_memory_entries or int(os.getenv("GUIDE_CACHE_MEMORY_ENTRIES", "2048"))
+        ))
+        self.fingerprint = fingerprint
+        self.ttl_seconds = ttl_seconds or int(os.getenv("GUIDE_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+
+    def critique_key(self, text: str, domain: str, experience) -> str:
+        return self._key("critique", normalize_text(text), _normalize_label(domain), experience_bucket(experience))
+
+    def refine_key(self, original: str, answer: str, domain: str) -> str:
+        return self._key("refine", normalize_text(original), normalize_text(answer), _normalize_label(domain))
+
+    def _key(self, *parts) -> str:
+        material = json.dumps([self.fingerprint, *parts])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        return self._lookup(key, lambda db: db.query(GuideCacheEntry).filter(
+            GuideCacheEntry.cache_key == key,
+            GuideCacheEntry.program_fingerprint == self.fingerprint,
+            GuideCacheEntry.expires_at > datetime.utcnow(),
+        ).first())
+
+    def put(self, key: str, kind: str, result: dict):
+        self.memory.put(key, (time.monotonic() + self.ttl_seconds, json.dumps(result)))
+        self._write(GuideCacheEntry(
+            cache_key=key,
+            kind=kind,
+            program_fingerprint=self.fingerprint,
+            result=result,
+            hit_count=0,
+            expires_at=datetime.utcnow() + timedelta(seconds=self.ttl_seconds),
+        ), merge=True)
+
+    def purge_stale(self) -> int:
+        """Delete expired rows and rows from any other program fingerprint."""
+        return self._delete(or_(
+            GuideCacheEntry.program_fingerprint != self.fingerprint,
+            GuideCacheEntry.expires_at <= datetime.utcnow(),
+        ))
+
+    def stats(self) -> dict:
+        return {"program_fingerprint": self.fingerprint, "ttl_seconds": self.ttl_seconds, **super().stats()}
+
+    def _memory_get(self, key: str) -> Optional[str]:
+        cached = self.memory.get(key)
+        if cached is None:
+            return None
+        expires_at, payload = cached
+        if expires_at > time.monotonic():
+            return payload
+        self.memory.pop(key)
+        return None
+
+    def _remember(self, entry: GuideCacheEntry) -> str:
+        payload = json.dumps(entry.result)
+        remaining = (entry.expires_at - datetime.utcnow()).total_seconds()
+        self.memory.put(entry.cache_key, (time.monotonic() + remaining, payload))
+        return payload
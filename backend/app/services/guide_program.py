@@ -0,0 +1,202 @@
+"""Offline compilation of the GuideAgent and loading of compiled artifacts."""
+import json
+import os
+import time
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import dspy
+
+from app.services.guide_cache import program_fingerprint
+from app.services.guide_service import (
+    GUIDE_MODEL, CritiqueBulletPoint, GuideAgent, RewriteBulletPoint, parse_components
+)
+
+ARTIFACT_FORMAT = 1
+
+# The compiled program answers from demos rather than step-by-step reasoning,
+# so its instructions can be much terser than the hand-written docstrings
+COMPACT_CRITIQUE_INSTRUCTIONS = (
+    "List the STAR components this resume bullet lacks, say why it is weak, and ask one follow-up question."
+)
+COMPACT_REWRITE_INSTRUCTIONS = "Rewrite the bullet with a strong verb and the user's metrics."
+
+
+def signature_fingerprint() -> str:
+    """Identifies the signatures in code; artifacts compiled against others are refused."""
+    return program_fingerprint((CritiqueBulletPoint, RewriteBulletPoint), model="")
+
+
+def load_examples(path: str) -> List[dspy.Example]:
+    """
+    Read labelled critique examples from JSONL, one per line:
+    {"raw_text": ..., "domain": ..., "years_experience": ..., "missing_components": [...]}
+    """
+    examples = []
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            if "raw_text" not in row or "missing_components" not in row:
+                raise ValueError(f"{path}:{line_number}: needs raw_text and missing_components")
+            examples.append(dspy.Example(
+                task_type="critique",
+                raw_text=row["raw_text"],
+                domain=row.get("domain", "General"),
+                years_experience=row.get("years_experience", 5),
+                missing_components=row["missing_components"],
+                weakness_explanation=row.get("weakness_explanation", ""),
+                follow_up_question=row.get("follow_up_question", ""),
+            ).with_inputs("task_type", "raw_text", "domain", "years_experience"))
+    return examples
+
+
+def _components(value) -> set:
+    return {str(v).strip().lower() for v in parse_components(value)}
+
+
+def critique_metric(example, prediction, trace=None):
+    """Jaccard overlap of missing STAR components; bootstrapping keeps near-exact demos."""
+    expected = _components(example.missing_components)
+    predicted = _components(prediction.missing_star_components)
+    union = expected | predicted
+    score = len(expected & predicted) / len(union) if union else 1.0
+    return score >= 0.75 if trace is not None else score
+
+
+def compile_program(
+    trainset: List[dspy.Example],
+    version: str,
+    max_demos: int = 4,
+) -> Tuple[GuideAgent, dict]:
+    """
+    Distil the chain-of-thought agent into a compact one (no reasoning step,
+    terse instructions): the teacher answers each training bullet, and up to
+    `max_demos` answers that match the labels become the student's few-shot
+    demos. This is BootstrapFewShot's procedure, done by hand because DSPy's
+    optimizer needs teacher and student to share a structure. Uses the
+    currently configured DSPy LM.
+    """
+    student = GuideAgent(chain_of_thought=False)
+    student.critique_prog.signature = student.critique_prog.signature.with_instructions(COMPACT_CRITIQUE_INSTRUCTIONS)
+    student.rewrite_prog.signature = student.rewrite_prog.signature.with_instructions(COMPACT_REWRITE_INSTRUCTIONS)
+
+    teacher = GuideAgent()
+    demos = []
+    for example in trainset:
+        if len(demos) >= max_demos:
+            break
+        prediction = teacher(**example.inputs())
+        if not critique_metric(example, prediction, trace=True):
+            continue
+        demos.append(dspy.Example(
+            raw_text=example.raw_text,
+            domain=example.domain,
+            years_experience=str(example.years_experience),
+            missing_star_components=prediction.missing_star_components,
+            weakness_explanation=prediction.weakness_explanation,
+            follow_up_question=prediction.follow_up_question,
+        ))
+    student.critique_prog.demos = demos
+
+    manifest = {
+        "format": ARTIFACT_FORMAT,
+        "version": version,
+        "chain_of_thought": False,
+        "signature_fingerprint": signature_fingerprint(),
+        "model": GUIDE_MODEL,
+        "dspy_version": dspy.__version__,
+        "optimizer": "bootstrap-from-cot-teacher",
+        "trainset_size": len(trainset),
+        "demos": len(demos),
+        "created_at": datetime.utcnow().isoformat(),
+    }
+    return student, manifest
+
+
+def save_program(program: GuideAgent, manifest: dict, path: str):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"manifest": manifest, "program": program.dump_state()}, f, indent=2, default=str)
+    os.replace(tmp_path, path)  # Never leave a half-written artifact for a starting server
+
+
+def load_program(path: str, pinned_version: Optional[str] = None) -> Tuple[GuideAgent, dict]:
+    """
+    Load a compiled GuideAgent. Raises ValueError if the artifact is not the
+    pinned version or was compiled against different signatures.
+    """
+    with open(path) as f:
+        artifact = json.load(f)
+    manifest = artifact.get("manifest") or {}
+
+    if manifest.get("format") != ARTIFACT_FORMAT:
+        raise ValueError(f"{path}: unsupported guide program format {manifest.get('format')!r}")
+    if pinned_version and manifest.get("version") != pinned_version:
+        raise ValueError(
+            f"{path}: guide program version {manifest.get('version')!r} does not match pinned {pinned_version!r}"
+        )
+    if manifest.get("signature_fingerprint") != signature_fingerprint():
+        raise ValueError(f"{path}: guide program was compiled against different signatures; recompile it")
+
+    program = GuideAgent(chain_of_thought=manifest.get("chain_of_thought", True))
+    program.load_state(artifact["program"])
+    return program, manifest
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def measure_program(program: GuideAgent, devset: List[dspy.Example]) -> dict:
+    """Run `program` over `devset`, recording tokens (from LM history), latency and score."""
+    lm = dspy.settings.lm
+    prompt_tokens, completion_tokens, prompt_chars, latencies, scores = [], [], [], [], []
+
+    for example in devset:
+        history_start = len(lm.history)
+        start = time.perf_counter()
+        prediction = program(**example.inputs())
+        latencies.append((time.perf_counter() - start) * 1000)
+        scores.append(critique_metric(example, prediction))
+
+        entries = lm.history[history_start:]
+        prompt_chars.append(sum(
+            len(str(message.get("content") or "")) for entry in entries for message in entry.get("messages") or []
+        ))
+        usage = [entry.get("usage") or {} for entry in entries]
+        prompt_tokens.append(sum(u.get("prompt_tokens") or 0 for u in usage))
+        completion_tokens.append(sum(u.get("completion_tokens") or 0 for u in usage))
+
+    calls = len(devset)
+    if not calls:
+        return {"calls": 0}
+    return {
+        "calls": calls,
+        # Prompt size is reported in characters too, for providers/fakes without usage
+        "avg_prompt_chars": round(sum(prompt_chars) / calls, 1),
+        "avg_prompt_tokens": round(sum(prompt_tokens) / calls, 1),
+        "avg_completion_tokens": round(sum(completion_tokens) / calls, 1),
+        "avg_total_tokens": round((sum(prompt_tokens) + sum(completion_tokens)) / calls, 1),
+        "avg_latency_ms": round(sum(latencies) / calls, 1),
+        "p95_latency_ms": round(_percentile(latencies, 0.95), 1),
+        "avg_score": round(sum(scores) / calls, 3),
+    }
+
+
+def compare_programs(raw: GuideAgent, compiled: GuideAgent, devset: List[dspy.Example]) -> dict:
+    """Tokens per call, latency and metric score for the raw vs compiled program."""
+    report = {"raw": measure_program(raw, devset), "compiled": measure_program(compiled, devset)}
+    if report["raw"].get("avg_total_tokens"):
+        report["token_reduction"] = round(
+            1 - report["compiled"]["avg_total_tokens"] / report["raw"]["avg_total_tokens"], 3
+        )
+    if report["raw"].get("avg_latency_ms"):
+        report["latency_reduction"] = round(
+            1 - report["compiled"]["avg_latency_ms"] / report["raw"]["avg_latency_ms"], 3
+        )
+    return report
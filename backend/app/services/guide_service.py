@@ -1,7 +1,44 @@
 import dspy
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator, List, Optional, Tuple
 import os
 import ast
+import asyncio
+import threading
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.services.guide_cache import GuideCache, program_fingerprint
+from app.services.llm_gateway import get_llm_gateway
+from app.services.star_prescreen import StarPrescreen
+
+GUIDE_MODEL = os.getenv("OPENAI_GUIDE_MODEL", "gpt-4o")
+
+# Bullets critiqued at once by batch requests (the LLM gateway still applies its own limits)
+GUIDE_BATCH_CONCURRENCY = int(os.getenv("GUIDE_BATCH_CONCURRENCY", "8"))
+
+# Completion parameters passed through to the provider; DSPy adds its own bookkeeping kwargs
+_COMPLETION_PARAMS = {"temperature", "max_tokens", "top_p", "n", "stop", "response_format", "seed"}
+
+
+class GatewayLM(dspy.BaseLM):
+    """DSPy language model that sends requests through the shared LLM gateway."""
+
+    def __init__(self, model: str = GUIDE_MODEL, gateway=None, **kwargs):
+        super().__init__(model=model, **kwargs)
+        self.gateway = gateway or get_llm_gateway()
+
+    def _request(self, prompt, messages, kwargs) -> dict:
+        params = {k: v for k, v in {**self.kwargs, **kwargs}.items() if k in _COMPLETION_PARAMS and v is not None}
+        params["messages"] = messages or [{"role": "user", "content": prompt}]
+        params["model"] = self.model.split("/", 1)[-1]  # Accept "openai/gpt-4o" as well
+        return params
+
+    def forward(self, prompt=None, messages=None, **kwargs):
+        return self.gateway.complete(**self._request(prompt, messages, kwargs))
+
+    async def aforward(self, prompt=None, messages=None, **kwargs):
+        return await asyncio.to_thread(self.gateway.complete, **self._request(prompt, messages, kwargs))
 
 # 1. Define Signatures (The "Contract")
 
@@ -31,14 +68,53 @@ class RewriteBulletPoint(dspy.Signature):
     improvement_reason = dspy.OutputField(desc="Why this version is better")
 
 
+def normalize_bullet(text: str) -> str:
+    """Collapse whitespace so trivially different copies of a bullet dedupe."""
+    return " ".join(text.split())
+
+
+def parse_components(missing) -> list:
+    """Coerce DSPy's missing_star_components output into a list."""
+    # DSPy may return missing_star_components as a string representation of a list
+    # We need to convert it to an actual list
+    if isinstance(missing, str):
+        try:
+            missing = ast.literal_eval(missing)
+        except (ValueError, SyntaxError):
+            # If parsing fails, wrap the string in a list
+            missing = [missing] if missing else []
+    
+    # Ensure it's always a list
+    if not isinstance(missing, list):
+        missing = [missing] if missing else []
+    return missing
+
+
+def profile_bullets(content: dict) -> List[dict]:
+    """Every accomplishment bullet in a profile, with its location."""
+    bullets = []
+    for i, job in enumerate(content.get("work_experience") or []):
+        for j, accomplishment in enumerate(job.get("accomplishments") or []):
+            text = accomplishment.get("raw_text") if isinstance(accomplishment, dict) else accomplishment
+            if isinstance(text, str) and text.strip():
+                bullets.append({
+                    "text": text,
+                    "path": f"work_experience[{i}].accomplishments[{j}]",
+                    "company": job.get("company"),
+                })
+    return bullets
+
+
 # 2. Define the Module (The "Logic")
 
 class GuideAgent(dspy.Module):
-    def __init__(self):
+    def __init__(self, chain_of_thought: bool = True):
         super().__init__()
+        # Compiled programs drop the reasoning step and lean on few-shot demos instead
+        predictor = dspy.ChainOfThought if chain_of_thought else dspy.Predict
         # In a real app, we'd add 'dspy.Retrieve(k=3)' here for RAG
-        self.critique_prog = dspy.ChainOfThought(CritiqueBulletPoint)
-        self.rewrite_prog = dspy.ChainOfThought(RewriteBulletPoint)
+        self.critique_prog = predictor(CritiqueBulletPoint)
+        self.rewrite_prog = predictor(RewriteBulletPoint)
     
     def forward(self, task_type: str, **kwargs):
         if task_type == "critique":
@@ -57,19 +133,62 @@ class GuideAgent(dspy.Module):
 # 3. Service Wrapper
 
 class GuideService:
-    def __init__(self):
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY not found")
+    def __init__(self, cache: Optional[GuideCache] = None):
+        # Route DSPy through the shared gateway so guide calls share the
+        # provider rate limits with resume parsing
+        dspy.settings.configure(lm=GatewayLM())
         
-        # Configure DSPy to use GPT-4o
-        lm = dspy.LM('openai/gpt-4o', api_key=api_key)
-        dspy.settings.configure(lm=lm)
+        # A compiled program from disk if configured, else the generic one
+        self.program_manifest = None
+        program_path = os.getenv("GUIDE_PROGRAM_PATH")
+        if program_path:
+            from app.services.guide_program import load_program
+            self.agent, self.program_manifest = load_program(
+                program_path, pinned_version=os.getenv("GUIDE_PROGRAM_VERSION") or None
+            )
+        else:
+            self.agent = GuideAgent()
         
-        self.agent = GuideAgent()
+        # Memo of previous answers (disable with GUIDE_CACHE_ENABLED=0)
+        if cache is None and os.getenv("GUIDE_CACHE_ENABLED", "1") == "1":
+            cache = GuideCache(self.fingerprint())
+            try:
+                cache.purge_stale()  # Answers from an older program or model
+            except SQLAlchemyError:
+                pass
+        self.cache = cache
+        
+        # Local STAR screen that answers clear-cut bullets without the LLM
+        # (disable with GUIDE_PRESCREEN_ENABLED=0)
+        self.prescreen = StarPrescreen() if os.getenv("GUIDE_PRESCREEN_ENABLED", "1") == "1" else None
+    
+    def fingerprint(self) -> str:
+        """Identifies the current signatures, learned program state and model."""
+        return program_fingerprint(
+            (CritiqueBulletPoint, RewriteBulletPoint), GUIDE_MODEL, program=self.agent
+        )
     
     def analyze_bullet(self, text: str, domain: str = "General", experience: int = 5) -> dict:
         """Analyze a bullet point and return critique."""
+        if self.prescreen:
+            screened = self.prescreen.screen([text])[0]
+            if screened is not None:
+                return screened
+        return self._memoized_critique(text, domain, experience)
+    
+    def _memoized_critique(self, text: str, domain: str, experience: int) -> dict:
+        key = self.cache.critique_key(text, domain, experience) if self.cache else None
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        
+        result = self._analyze_bullet(text, domain, experience)
+        if key:
+            self.cache.put(key, "critique", result)
+        return result
+    
+    def _analyze_bullet(self, text: str, domain: str, experience: int) -> dict:
         pred = self.agent(
             task_type="critique", 
             raw_text=text, 
@@ -77,28 +196,58 @@ class GuideService:
             years_experience=experience
         )
         
-        # DSPy may return missing_star_components as a string representation of a list
-        # We need to convert it to an actual list
-        missing = pred.missing_star_components
-        if isinstance(missing, str):
-            try:
-                missing = ast.literal_eval(missing)
-            except (ValueError, SyntaxError):
-                # If parsing fails, wrap the string in a list
-                missing = [missing] if missing else []
-        
-        # Ensure it's always a list
-        if not isinstance(missing, list):
-            missing = [missing] if missing else []
-        
         return {
-            "missing_components": missing,
+            "missing_components": parse_components(pred.missing_star_components),
             "critique": pred.weakness_explanation,
             "question": pred.follow_up_question
         }
 
+    def critique_many(
+        self,
+        texts: List[str],
+        domain: str = "General",
+        experience: int = 5,
+    ) -> Iterator[Tuple[str, Optional[dict], Optional[str]]]:
+        """
+        Critique several bullets concurrently, once per distinct (normalized)
+        text. Yields (normalized_text, result, error) as each one finishes.
+        """
+        unique = list(dict.fromkeys(normalize_bullet(t) for t in texts if t and t.strip()))
+        
+        # Screen the whole batch locally first; only ambiguous bullets reach the LLM
+        screened = self.prescreen.screen(unique) if self.prescreen else [None] * len(unique)
+        futures = {
+            _get_batch_pool().submit(self._memoized_critique, text, domain, experience): text
+            for text, result in zip(unique, screened) if result is None
+        }
+        try:
+            for text, result in zip(unique, screened):
+                if result is not None:
+                    yield text, result, None
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result(), None
+                except Exception as e:
+                    yield futures[future], None, str(e)
+        finally:
+            # Client went away mid-stream: drop work that hasn't started
+            for future in futures:
+                future.cancel()
+
     def refine_bullet(self, original: str, answer: str, domain: str = "General") -> dict:
         """Rewrite a bullet point based on user answers."""
+        key = self.cache.refine_key(original, answer, domain) if self.cache else None
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        
+        result = self._refine_bullet(original, answer, domain)
+        if key:
+            self.cache.put(key, "refine", result)
+        return result
+    
+    def _refine_bullet(self, original: str, answer: str, domain: str) -> dict:
         pred = self.agent(
             task_type="rewrite",
             original_text=original,
@@ -113,9 +262,25 @@ class GuideService:
 
 # Singleton
 _guide_instance = None
+_batch_pool: Optional[ThreadPoolExecutor] = None
+_batch_pool_lock = threading.Lock()
+
+def _get_batch_pool() -> ThreadPoolExecutor:
+    global _batch_pool
+    with _batch_pool_lock:
+        if _batch_pool is None:
+            _batch_pool = ThreadPoolExecutor(
+                max_workers=GUIDE_BATCH_CONCURRENCY, thread_name_prefix="guide-batch"
+            )
+    return _batch_pool
+
+_guide_lock = threading.Lock()
 
 def get_guide_service():
     global _guide_instance
-    if _guide_instance is None:
-        _guide_instance = GuideService()
+    # DSPy only accepts configure() from one thread, so concurrent first
+    # requests must not each build a service
+    with _guide_lock:
+        if _guide_instance is None:
+            _guide_instance = GuideService()
     return _guide_instance
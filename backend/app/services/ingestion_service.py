@@ -0,0 +1,162 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from app.database import SessionLocal
+from app.uploads import PDFSource
+from app.services.resume_service import ResumeService
+
+# Ingestion lifecycle
+QUEUED = "queued"
+EXTRACTING = "extracting"
+PARSING = "parsing"
+STORED = "stored"
+FAILED = "failed"
+
+FINISHED_STATES = (STORED, FAILED)
+
+
+class IngestionQueueFull(Exception):
+    """Raised when the queue already holds the maximum number of pending uploads."""
+
+
+class IngestionJob:
+    """Progress record for one uploaded resume."""
+
+    def __init__(self, filename: str):
+        self.ingestion_id = str(uuid.uuid4())
+        self.filename = filename
+        self.status = QUEUED
+        self.profile_id: Optional[str] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+
+    def to_dict(self) -> dict:
+        return {
+            "ingestion_id": self.ingestion_id,
+            "filename": self.filename,
+            "status": self.status,
+            "profile_id": self.profile_id,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+
+class IngestionQueue:
+    """
+    Runs PDF extraction + LLM parsing on a bounded worker pool so the
+    upload endpoint can return immediately instead of holding the event loop.
+    """
+
+    def __init__(
+        self,
+        parser_factory: Callable,
+        session_factory: Callable = SessionLocal,
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        retention_seconds: Optional[int] = None,
+    ):
+        self.parser_factory = parser_factory
+        self.session_factory = session_factory
+        self.max_workers = max_workers or int(os.getenv("INGESTION_WORKERS", "4"))
+        self.max_pending = max_pending or int(os.getenv("INGESTION_MAX_PENDING", "100"))
+        self.retention_seconds = retention_seconds or int(os.getenv("INGESTION_RETENTION_SECONDS", "3600"))
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="resume-ingest"
+        )
+        self._jobs: Dict[str, IngestionJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, pdf_source: PDFSource, filename: str) -> IngestionJob:
+        """
+        Queue an upload for background parsing. Raises IngestionQueueFull.
+        The queue takes ownership of file sources and closes them when done.
+        """
+        with self._lock:
+            self._prune_finished()
+            pending = sum(1 for j in self._jobs.values() if j.status not in FINISHED_STATES)
+            if pending >= self.max_pending:
+                raise IngestionQueueFull(
+                    f"Ingestion queue is full ({pending} uploads pending)"
+                )
+            job = IngestionJob(filename)
+            self._jobs[job.ingestion_id] = job
+
+        self._executor.submit(self._run, job, pdf_source)
+        return job
+
+    def get(self, ingestion_id: str) -> Optional[IngestionJob]:
+        with self._lock:
+            return self._jobs.get(ingestion_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = {state: 0 for state in (QUEUED, EXTRACTING, PARSING, STORED, FAILED)}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        return {"workers": self.max_workers, "max_pending": self.max_pending, "jobs": counts}
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+    def _set_status(self, job: IngestionJob, status: str):
+        with self._lock:
+            job.status = status
+            job.updated_at = time.time()
+
+    def _prune_finished(self):
+        # Caller holds self._lock
+        cutoff = time.time() - self.retention_seconds
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.status in FINISHED_STATES and job.updated_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _run(self, job: IngestionJob, pdf_source: PDFSource):
+        try:
+            try:
+                parsed_content = self.parser_factory().parse_pdf(
+                    pdf_source,
+                    on_stage=lambda stage: self._set_status(job, stage)
+                )
+            finally:
+                if hasattr(pdf_source, "close"):
+                    pdf_source.close()
+
+            db = self.session_factory()
+            try:
+                profile = ResumeService(db).create_parsed_profile(parsed_content)
+                profile_id = str(profile.profile_id)
+            finally:
+                db.close()
+
+            with self._lock:
+                job.profile_id = profile_id
+                job.status = STORED
+                job.updated_at = time.time()
+        except Exception as e:
+            with self._lock:
+                job.error = str(e)
+                job.status = FAILED
+                job.updated_at = time.time()
+
+
+# Singleton
+_queue_instance: Optional[IngestionQueue] = None
+
+def get_ingestion_queue() -> IngestionQueue:
+    """Get or create the shared ingestion queue."""
+    global _queue_instance
+    if _queue_instance is None:
+        from app.services.pdf_parser import get_pdf_parser
+        _queue_instance = IngestionQueue(parser_factory=get_pdf_parser)
+    return _queue_instance
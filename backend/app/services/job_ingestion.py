@@ -0,0 +1,302 @@
+"""Bulk ingestion of job postings from JSONL, deduplicated by canonical URL hash."""
+import hashlib
+import json
+import os
+import re
+import time
+import uuid
+from datetime import date
+from typing import Callable, Iterable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from sqlalchemy import bindparam, func, update
+
+from app.database import SessionLocal
+from app.models import Job
+from app.services.near_duplicates import NEAR_DUP_ENABLED, assign_duplicates, get_near_duplicate_index
+from app.services.skills import get_skill_index
+from app.skill_names import normalize_skills
+
+JOB_INGEST_BATCH_SIZE = int(os.getenv("JOB_INGEST_BATCH_SIZE", "1000"))
+
+# Bind parameters per INSERT statement (Postgres allows 65535, SQLite 32766)
+MAX_STATEMENT_PARAMS = 30000
+
+# Line errors kept in the report (the rest are only counted)
+MAX_REPORTED_ERRORS = 20
+
+JOB_STATUSES = ("discovered", "analyzed", "applied", "responded", "rejected", "passed")
+
+_TRACKING_PARAMS = {
+    "gclid", "fbclid", "msclkid", "mc_cid", "mc_eid", "ref", "referrer", "refid",
+    "source", "src", "trk", "trackingid", "lipi", "_hsenc", "_hsmi",
+}
+
+_WHITESPACE = re.compile(r"\s+")
+
+# Columns an upsert rewrites; status, discovered_date and created_at keep their first values
+_CONTENT_COLUMNS = (
+    "title", "company", "url", "required_skills", "nice_to_have_skills", "normalized_skills",
+    "salary_range", "location", "remote_policy", "application_deadline", "raw_description",
+    "company_size", "industry",
+)
+
+
+def canonical_url(url: Optional[str]) -> Optional[str]:
+    """The URL in canonical form, or None if it has no host."""
+    if not isinstance(url, str) or not url.strip():
+        return None
+    url = url.strip()
+    parts = urlsplit(url if "://" in url else f"https://{url}")
+    host = (parts.hostname or "").lower()
+    if not host:
+        return None
+    if host.startswith("www."):
+        host = host[4:]
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host if port in (None, 80, 443) else f"{host}:{port}"
+    path = re.sub(r"/{2,}", "/", parts.path).rstrip("/")
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in _TRACKING_PARAMS
+    )
+    return urlunsplit(("https", netloc, path, urlencode(query), ""))
+
+
+def posting_key(title: str, company: str, url: Optional[str], location: Optional[str] = None) -> str:
+    """The dedupe hash: of the canonical URL, or of company/title/location without one."""
+    canonical = canonical_url(url)
+    if canonical is None:
+        fields = (company, title, location or "")
+        canonical = "posting:" + "|".join(_WHITESPACE.sub(" ", field).strip().lower() for field in fields)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _text(posting: dict, key: str, max_length: Optional[int] = None, required: bool = False) -> Optional[str]:
+    value = posting.get(key)
+    if value is None or (isinstance(value, str) and not value.strip()):
+        if required:
+            raise ValueError(f"'{key}' is required")
+        return None
+    if not isinstance(value, str):
+        raise ValueError(f"'{key}' must be a string")
+    value = value.strip()
+    if max_length and len(value) > max_length:
+        raise ValueError(f"'{key}' is longer than {max_length} characters")
+    return value
+
+
+def _skills(posting: dict, key: str) -> List[str]:
+    value = posting.get(key)
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    if not isinstance(value, list):
+        raise ValueError(f"'{key}' must be a list of strings")
+    return [skill.strip() for skill in value if isinstance(skill, str) and skill.strip()]
+
+
+def posting_row(posting) -> dict:
+    """A `jobs` row from one posting object. Raises ValueError if it's unusable."""
+    if not isinstance(posting, dict):
+        raise ValueError("Posting must be a JSON object")
+    title = _text(posting, "title", 255, required=True)
+    company = _text(posting, "company", 255, required=True)
+    url = _text(posting, "url")
+    location = _text(posting, "location", 255)
+
+    salary_range = posting.get("salary_range")
+    if salary_range is not None and not isinstance(salary_range, dict):
+        raise ValueError("'salary_range' must be an object")
+
+    deadline = posting.get("application_deadline")
+    if deadline:
+        try:
+            deadline = date.fromisoformat(str(deadline)[:10])
+        except ValueError:
+            raise ValueError("'application_deadline' must be an ISO date")
+    else:
+        deadline = None
+
+    status = posting.get("status") or "discovered"
+    if status not in JOB_STATUSES:
+        raise ValueError(f"'status' must be one of {', '.join(JOB_STATUSES)}")
+
+    required_skills = _skills(posting, "required_skills")
+    row = {
+        "title": title,
+        "company": company,
+        "url": url,
+        "required_skills": required_skills,
+        "nice_to_have_skills": _skills(posting, "nice_to_have_skills"),
+        "normalized_skills": normalize_skills(required_skills),  # Core inserts skip the model validator
+        "salary_range": salary_range,
+        "location": location,
+        "remote_policy": _text(posting, "remote_policy", 50),
+        "application_deadline": deadline,
+        "raw_description": _text(posting, "raw_description") or _text(posting, "description"),
+        "company_size": _text(posting, "company_size", 50),
+        "industry": _text(posting, "industry", 100),
+    }
+    row["url_hash"] = posting_key(title, company, url, location)
+    row["content_hash"] = hashlib.sha256(
+        json.dumps(row, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+    row["status"] = status
+    return row
+
+
+def upsert_statement(rows: List[dict], dialect_name: str):
+    """
+    INSERT ... ON CONFLICT (url_hash) DO UPDATE for `rows`, rewriting only
+    rows whose content_hash differs and returning (url_hash, job_id) of
+    every row inserted or updated.
+    """
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise ValueError(f"Job ingestion needs PostgreSQL or SQLite, not {dialect_name}")
+
+    table = Job.__table__
+    stmt = insert(table).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.url_hash],
+        set_={
+            **{column: stmt.excluded[column] for column in _CONTENT_COLUMNS},
+            "content_hash": stmt.excluded.content_hash,
+            "fit_score": None,
+            "updated_at": func.now(),
+        },
+        where=table.c.content_hash.is_distinct_from(stmt.excluded.content_hash),
+    ).returning(table.c.url_hash, table.c.job_id)
+
+
+class JobIngester:
+    """
+    Streams postings into `jobs` in batches, each one committed on its own,
+    and counts what happened to them:
+
+        inserted         new url_hash
+        updated          known url_hash, content changed
+        unchanged        known url_hash, same content
+        duplicates       url_hash repeated within a batch (the last one wins)
+        near_duplicates  inserted/updated, but the description matches another job's
+        invalid          not JSON, or missing title/company etc.
+    """
+
+    def __init__(self, session_factory: Callable = SessionLocal, batch_size: int = JOB_INGEST_BATCH_SIZE):
+        self.session_factory = session_factory
+        self.batch_size = max(1, batch_size)
+
+    def run(self, lines: Iterable, progress: Optional[Callable[[dict], None]] = None) -> dict:
+        """Ingest JSONL `lines` (str or bytes). `progress` gets the report after each batch."""
+        report = {
+            "received": 0, "inserted": 0, "updated": 0, "unchanged": 0,
+            "duplicates": 0, "near_duplicates": 0, "invalid": 0, "errors": [],
+        }
+        start = time.perf_counter()
+        batch = {}
+        for line_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            report["received"] += 1
+            try:
+                row = posting_row(json.loads(line))
+            except ValueError as e:  # JSONDecodeError is a ValueError
+                report["invalid"] += 1
+                if len(report["errors"]) < MAX_REPORTED_ERRORS:
+                    report["errors"].append(f"line {line_number}: {e}")
+                continue
+            if row["url_hash"] in batch:
+                report["duplicates"] += 1
+            batch[row["url_hash"]] = row
+            if len(batch) >= self.batch_size:
+                self._write_batch(list(batch.values()), report)
+                batch = {}
+                self._finish(report, start)
+                if progress:
+                    progress(report)
+        if batch:
+            self._write_batch(list(batch.values()), report)
+        self._finish(report, start)
+        if report["inserted"] or report["updated"]:
+            get_skill_index().invalidate()
+        return report
+
+    @staticmethod
+    def _finish(report: dict, start: float):
+        seconds = time.perf_counter() - start
+        report["seconds"] = round(seconds, 3)
+        report["rows_per_second"] = round(report["received"] / seconds, 1) if seconds > 0 else None
+
+    def _write_batch(self, rows: List[dict], report: dict):
+        db = self.session_factory()
+        try:
+            dialect_name = db.get_bind().dialect.name
+            hashes = [row["url_hash"] for row in rows]
+            existing = {
+                url_hash for (url_hash,) in
+                db.query(Job.url_hash).filter(Job.url_hash.in_(hashes))
+            }
+            for row in rows:
+                row["job_id"] = uuid.uuid4()  # Ignored when the row already exists
+
+            written = {}
+            per_statement = max(1, MAX_STATEMENT_PARAMS // len(rows[0]))
+            for offset in range(0, len(rows), per_statement):
+                stmt = upsert_statement(rows[offset:offset + per_statement], dialect_name)
+                for url_hash, job_id in db.execute(stmt):
+                    written[url_hash] = job_id
+            if NEAR_DUP_ENABLED and written:
+                descriptions = {row["url_hash"]: row["raw_description"] for row in rows}
+                report["near_duplicates"] += assign_duplicates(
+                    db, [(job_id, descriptions[url_hash]) for url_hash, job_id in written.items()]
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            get_near_duplicate_index().invalidate()  # It may hold rows that were never committed
+            raise
+        finally:
+            db.close()
+
+        updated = len(written.keys() & existing)
+        report["inserted"] += len(written) - updated
+        report["updated"] += updated
+        report["unchanged"] += len(existing - written.keys())
+
+
+def backfill_url_hashes(db, batch_size: int = 1000) -> int:
+    """
+    Set url_hash on jobs stored before ingestion existed. Where several old
+    rows share a posting only the first keeps the hash (the index is
+    unique); the rest stay NULL. Returns rows changed.
+    """
+    table = Job.__table__
+    statement = update(table).where(table.c.job_id == bindparam("job")).values(url_hash=bindparam("hash"))
+    changed, last_id = 0, None
+    while True:
+        query = db.query(Job.job_id, Job.title, Job.company, Job.url, Job.location).filter(
+            Job.url_hash.is_(None)
+        ).order_by(Job.job_id)
+        if last_id is not None:
+            query = query.filter(Job.job_id > last_id)
+        rows = query.limit(batch_size).all()
+        if not rows:
+            return changed
+        hashes = {}
+        for row in rows:
+            hashes.setdefault(posting_key(row.title, row.company, row.url, row.location), row.job_id)
+        taken = {url_hash for (url_hash,) in db.query(Job.url_hash).filter(Job.url_hash.in_(list(hashes)))}
+        updates = [{"job": job_id, "hash": url_hash} for url_hash, job_id in hashes.items() if url_hash not in taken]
+        if updates:
+            db.execute(statement, updates)
+            db.commit()
+            changed += len(updates)
+        last_id = rows[-1].job_id
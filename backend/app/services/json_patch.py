@@ -0,0 +1,215 @@
+"""RFC 6902 JSON Patch and RFC 7386 merge patch, in Python and as Postgres JSONB expressions."""
+import copy
+import json
+import re
+from typing import Any, List
+
+from sqlalchemy import Text, and_, case, cast, false, func, literal, true
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+
+MAX_PATCH_OPERATIONS = 100
+
+OPERATIONS = ("add", "remove", "replace", "move", "copy", "test")
+
+_ARRAY_INDEX = re.compile(r"^(0|[1-9][0-9]*)$")
+
+# jsonb_set appends when given an out-of-range positive index
+_APPEND_INDEX = "2147483647"
+
+
+class InvalidPatch(ValueError):
+    """The patch is malformed or cannot be applied to the document."""
+
+
+def parse_pointer(pointer: str) -> List[str]:
+    """Split a JSON Pointer ("/work_experience/0/role") into unescaped tokens."""
+    if not isinstance(pointer, str) or (pointer and not pointer.startswith("/")):
+        raise InvalidPatch(f"Invalid JSON pointer: {pointer!r}")
+    if not pointer:
+        return []
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def validate_patch(operations) -> List[dict]:
+    """Check the shape of a JSON Patch document; returns the operations."""
+    if not isinstance(operations, list):
+        raise InvalidPatch("A JSON Patch must be an array of operations")
+    if len(operations) > MAX_PATCH_OPERATIONS:
+        raise InvalidPatch(f"A JSON Patch may hold at most {MAX_PATCH_OPERATIONS} operations")
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict) or operation.get("op") not in OPERATIONS:
+            raise InvalidPatch(f"Operation {index}: op must be one of {', '.join(OPERATIONS)}")
+        path = parse_pointer(operation.get("path"))
+        if operation["op"] in ("add", "replace", "test") and "value" not in operation:
+            raise InvalidPatch(f"Operation {index}: {operation['op']} needs a value")
+        if operation["op"] == "remove" and not path:
+            raise InvalidPatch(f"Operation {index}: cannot remove the whole document")
+        if operation["op"] in ("move", "copy"):
+            source = parse_pointer(operation.get("from"))
+            if operation["op"] == "move" and path[:len(source)] == source and path != source:
+                raise InvalidPatch(f"Operation {index}: cannot move a value into itself")
+    return operations
+
+
+# Python implementation
+
+def _child(container, token: str, pointer: str):
+    if isinstance(container, dict) and token in container:
+        return container[token]
+    if isinstance(container, list) and _ARRAY_INDEX.match(token) and int(token) < len(container):
+        return container[int(token)]
+    raise InvalidPatch(f"Path not found: {pointer}")
+
+
+def _get(doc, tokens: List[str], pointer: str):
+    for token in tokens:
+        doc = _child(doc, token, pointer)
+    return doc
+
+
+def _add(doc, tokens: List[str], value, pointer: str):
+    if not tokens:
+        return value
+    parent, token = _get(doc, tokens[:-1], pointer), tokens[-1]
+    if isinstance(parent, dict):
+        parent[token] = value
+    elif isinstance(parent, list) and token == "-":
+        parent.append(value)
+    elif isinstance(parent, list) and _ARRAY_INDEX.match(token) and int(token) <= len(parent):
+        parent.insert(int(token), value)
+    else:
+        raise InvalidPatch(f"Cannot add at {pointer}")
+    return doc
+
+
+def _remove(doc, tokens: List[str], pointer: str):
+    parent, token = _get(doc, tokens[:-1], pointer), tokens[-1]
+    value = _child(parent, token, pointer)
+    if isinstance(parent, dict):
+        del parent[token]
+    else:
+        del parent[int(token)]
+    return value
+
+
+def _replace(doc, tokens: List[str], value, pointer: str):
+    _get(doc, tokens, pointer)  # Must exist
+    if not tokens:
+        return value
+    parent, token = _get(doc, tokens[:-1], pointer), tokens[-1]
+    parent[token if isinstance(parent, dict) else int(token)] = value
+    return doc
+
+
+def apply_json_patch(document: Any, operations: List[dict]) -> Any:
+    """Apply a JSON Patch to a copy of `document`. Raises InvalidPatch."""
+    doc = copy.deepcopy(document)
+    for operation in validate_patch(operations):
+        op, pointer = operation["op"], operation["path"]
+        tokens = parse_pointer(pointer)
+        if op == "add":
+            doc = _add(doc, tokens, copy.deepcopy(operation["value"]), pointer)
+        elif op == "remove":
+            _remove(doc, tokens, pointer)
+        elif op == "replace":
+            doc = _replace(doc, tokens, copy.deepcopy(operation["value"]), pointer)
+        elif op == "move":
+            source = parse_pointer(operation["from"])
+            doc = _add(doc, tokens, _remove(doc, source, operation["from"]) if source else doc, pointer)
+        elif op == "copy":
+            value = copy.deepcopy(_get(doc, parse_pointer(operation["from"]), operation["from"]))
+            doc = _add(doc, tokens, value, pointer)
+        elif _get(doc, tokens, pointer) != operation["value"]:
+            raise InvalidPatch(f"Test failed at {pointer}")
+    return doc
+
+
+def apply_merge_patch(document: Any, patch: Any) -> Any:
+    """RFC 7386: objects merge recursively, null deletes, anything else replaces."""
+    if not isinstance(patch, dict):
+        return copy.deepcopy(patch)
+    result = copy.deepcopy(document) if isinstance(document, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = apply_merge_patch(result.get(key), value)
+    return result
+
+
+# Postgres implementation
+
+def _path(tokens: List[str]):
+    return cast(literal(tokens, ARRAY(Text)), ARRAY(Text))
+
+
+def _json(value):
+    return cast(literal(json.dumps(value)), JSONB)
+
+
+def _at(doc, tokens: List[str]):
+    return doc.op("#>", return_type=JSONB)(_path(tokens))
+
+
+def _sql_add(doc, tokens: List[str], value):
+    if not tokens:
+        return value
+    parent, token = _at(doc, tokens[:-1]), tokens[-1]
+    parent_type = func.jsonb_typeof(parent)
+    set_key = func.jsonb_set(doc, _path(tokens), value, true(), type_=JSONB)
+    if token == "-":
+        append = func.jsonb_set(doc, _path(tokens[:-1] + [_APPEND_INDEX]), value, true(), type_=JSONB)
+        return case((parent_type == "array", append), (parent_type == "object", set_key))
+    if _ARRAY_INDEX.match(token):
+        insert = func.jsonb_insert(doc, _path(tokens), value, type_=JSONB)
+        return case(
+            (and_(parent_type == "array", func.jsonb_array_length(parent) >= int(token)), insert),
+            (parent_type == "object", set_key),
+        )
+    return case((parent_type == "object", set_key))
+
+
+def sql_patch_operation(doc, operation: dict):
+    """
+    JSONB expression for `doc` with one (validated) JSON Patch operation
+    applied, or NULL if the operation fails.
+    """
+    op = operation["op"]
+    tokens = parse_pointer(operation["path"])
+    target = _at(doc, tokens)
+
+    if op == "add":
+        return _sql_add(doc, tokens, _json(operation["value"]))
+    if op == "remove":
+        return case((target.isnot(None), doc.op("#-", return_type=JSONB)(_path(tokens))))
+    if op == "replace":
+        replaced = func.jsonb_set(doc, _path(tokens), _json(operation["value"]), false(), type_=JSONB) \
+            if tokens else _json(operation["value"])
+        return case((target.isnot(None), replaced))
+    if op == "test":
+        return case((target == _json(operation["value"]), doc))
+
+    source_tokens = parse_pointer(operation["from"])
+    source = _at(doc, source_tokens)
+    if op == "copy":
+        return case((source.isnot(None), _sql_add(doc, tokens, source)))
+    removed = doc.op("#-", return_type=JSONB)(_path(source_tokens)) if source_tokens else doc
+    return case((source.isnot(None), _sql_add(removed, tokens, source)))
+
+
+def sql_merge_patch(doc, patch: Any):
+    """JSONB expression for `doc` merged with `patch` (RFC 7386)."""
+    if not isinstance(patch, dict):
+        return _json(patch)
+    merged = case((func.jsonb_typeof(doc) == "object", doc), else_=cast(literal("{}"), JSONB))
+    deleted = [key for key, value in patch.items() if value is None]
+    if deleted:
+        merged = merged.op("-", return_type=JSONB)(_path(deleted))
+    replaced = {key: value for key, value in patch.items() if value is not None and not isinstance(value, dict)}
+    if replaced:
+        merged = merged.op("||", return_type=JSONB)(_json(replaced))
+    for key, value in patch.items():
+        if isinstance(value, dict):
+            child = sql_merge_patch(doc.op("->", return_type=JSONB)(cast(literal(key), Text)), value)
+            merged = merged.op("||", return_type=JSONB)(func.jsonb_build_object(cast(literal(key), Text), child, type_=JSONB))
+    return merged
@@ -0,0 +1,141 @@
+import json
+from typing import List, Optional, Tuple
+
+# Events produced while scanning a streamed JSON object:
+#   ("section", key, value)       a top-level value has closed
+#   ("item", key, index, value)   one element of a top-level array has closed
+SECTION = "section"
+ITEM = "item"
+
+
+class IncrementalSectionParser:
+    """
+    Incrementally scans a JSON object as it streams in and reports each
+    top-level section (and each element of top-level arrays) as soon as
+    its closing token arrives, without re-parsing the whole buffer.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+
+        # Top-level key/value tracking (depth 1)
+        self._expect_key = False
+        self._key_start: Optional[int] = None
+        self._key: Optional[str] = None
+        self._awaiting_value = False
+        self._value_start: Optional[int] = None
+
+        # Elements of a top-level array (depth 2)
+        self._in_section_array = False
+        self._awaiting_item = False
+        self._item_start: Optional[int] = None
+        self._item_index = 0
+
+    def feed(self, chunk: str) -> List[Tuple]:
+        """Append streamed text and return the events it completed."""
+        self.text += chunk
+        events: List[Tuple] = []
+        text = self.text
+
+        for i in range(self._pos, len(text)):
+            c = text[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._key_start is not None:
+                        self._key = json.loads(text[self._key_start:i + 1])
+                        self._key_start = None
+                continue
+
+            if c.isspace():
+                continue
+
+            depth = len(self._stack)
+
+            # First token of a new value
+            if depth == 1 and self._awaiting_value and c not in ",}":
+                self._value_start = i
+                self._awaiting_value = False
+            elif depth == 2 and self._in_section_array and self._awaiting_item and c not in ",]":
+                self._item_start = i
+                self._awaiting_item = False
+
+            if c == '"':
+                self._in_string = True
+                if depth == 1 and self._expect_key:
+                    self._key_start = i
+                    self._expect_key = False
+            elif c in "{[":
+                self._stack.append(c)
+                if len(self._stack) == 1:
+                    self._expect_key = c == "{"
+                elif len(self._stack) == 2 and c == "[" and self._stack[0] == "{":
+                    self._in_section_array = True
+                    self._awaiting_item = True
+                    self._item_index = 0
+            elif c in "}]":
+                if depth == 2 and self._in_section_array and c == "]":
+                    self._end_scalar_item(i, events)
+                elif depth == 1 and c == "}":
+                    self._end_scalar_value(i, events)
+
+                self._stack.pop()
+                if len(self._stack) == 1 and self._value_start is not None:
+                    # A container section closed
+                    if c == "}":
+                        events.append((SECTION, self._key, json.loads(text[self._value_start:i + 1])))
+                    self._value_start = None
+                    self._in_section_array = False
+                elif len(self._stack) == 2 and self._in_section_array and self._item_start is not None:
+                    # A container element of a section array closed
+                    self._emit_item(json.loads(text[self._item_start:i + 1]), events)
+            elif c == ",":
+                if depth == 1:
+                    self._end_scalar_value(i, events)
+                    self._expect_key = True
+                elif depth == 2 and self._in_section_array:
+                    self._end_scalar_item(i, events)
+                    self._awaiting_item = True
+            elif c == ":" and depth == 1:
+                self._awaiting_value = True
+
+        self._pos = len(text)
+        return events
+
+    def finish(self) -> dict:
+        """Parse the complete document. Raises json.JSONDecodeError if it is invalid."""
+        return json.loads(self.text)
+
+    def _end_scalar_value(self, end: int, events: List[Tuple]):
+        if self._value_start is not None:
+            events.append((SECTION, self._key, json.loads(self.text[self._value_start:end])))
+            self._value_start = None
+
+    def _end_scalar_item(self, end: int, events: List[Tuple]):
+        if self._item_start is not None:
+            self._emit_item(json.loads(self.text[self._item_start:end]), events)
+
+    def _emit_item(self, value, events: List[Tuple]):
+        events.append((ITEM, self._key, self._item_index, value))
+        self._item_index += 1
+        self._item_start = None
+
+
+def section_events(document: dict) -> List[Tuple]:
+    """The events a full stream of `document` would have produced."""
+    events: List[Tuple] = []
+    for key, value in document.items():
+        if isinstance(value, list):
+            events.extend((ITEM, key, index, item) for index, item in enumerate(value))
+        else:
+            events.append((SECTION, key, value))
+    return events
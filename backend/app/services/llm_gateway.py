@@ -0,0 +1,249 @@
+import asyncio
+import os
+import queue
+import random
+import threading
+import time
+from typing import Iterator, Optional
+
+try:
+    import httpx
+    import openai
+    from openai import AsyncOpenAI
+except ImportError:
+    httpx = openai = AsyncOpenAI = None
+
+from app.services.rate_limit import TokenBucket
+
+# Provider limits; the defaults suit a tier-1 OpenAI key for gpt-4o
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "30000"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "120"))
+LLM_BASE_URL = os.getenv("LLM_BASE_URL") or None
+
+RETRY_BASE_SECONDS = 0.5
+RETRY_MAX_SECONDS = 30.0
+
+
+def estimate_tokens(messages: list, max_tokens: Optional[int]) -> int:
+    """Prompt tokens (~4 characters each) plus the completion allowance."""
+    prompt_chars = sum(len(m.get("content") or "") for m in messages if isinstance(m.get("content"), str))
+    return prompt_chars // 4 + (max_tokens or 1024)
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, (openai.APIConnectionError, openai.RateLimitError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class LLMGateway:
+    """
+    Process-wide gateway for chat completions.
+
+    All calls share one pooled async HTTP client running on a dedicated event
+    loop thread, a concurrency semaphore, and request/token buckets sized to
+    the provider's limits, so load above the limit queues here instead of
+    turning into 429s. 429/5xx/connection errors are retried with jittered
+    exponential backoff (honouring Retry-After); a 429 also pauses every
+    caller briefly, since the whole key is over its limit.
+
+    Blocking callers (threadpool handlers, workers) use `complete` and
+    `stream`; coroutines on the gateway's loop can await `acomplete`.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        requests_per_minute: int = LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute: int = LLM_TOKENS_PER_MINUTE,
+        max_retries: int = LLM_MAX_RETRIES,
+    ):
+        if client is None:
+            if AsyncOpenAI is None:
+                raise ImportError("openai package is required. Run: pip install openai")
+            api_key = os.getenv("OPENAI_API_KEY")
+            if not api_key or api_key == "your-openai-api-key-here":
+                raise ValueError("OPENAI_API_KEY environment variable must be set")
+            client = AsyncOpenAI(
+                api_key=api_key,
+                base_url=LLM_BASE_URL,
+                max_retries=0,  # Retries are handled here, with the rate limiters
+                timeout=LLM_TIMEOUT_SECONDS,
+                http_client=httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=max_concurrency,
+                        max_keepalive_connections=max_concurrency,
+                    ),
+                    timeout=LLM_TIMEOUT_SECONDS,
+                ),
+            )
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.request_budget = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.token_budget = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+        self._paused_until = 0.0
+        self._counters = {"requests": 0, "retries": 0, "rate_limited": 0, "failures": 0, "in_flight": 0}
+        self._counter_lock = threading.Lock()
+
+        self._loop = asyncio.new_event_loop()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._thread = threading.Thread(target=self._run_loop, name="llm-gateway", daemon=True)
+        self._thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def _count(self, name: str, delta: int = 1):
+        with self._counter_lock:
+            self._counters[name] += delta
+
+    async def _take(self, bucket: Optional[TokenBucket], amount: float):
+        while bucket:
+            wait = bucket.try_acquire(amount)
+            if wait == 0:
+                return
+            await asyncio.sleep(wait)
+
+    async def _admit(self, estimate: int):
+        """Wait out any global pause, then take request and token budget."""
+        while True:
+            pause = self._paused_until - time.monotonic()
+            if pause <= 0:
+                break
+            await asyncio.sleep(pause)
+        await self._take(self.request_budget, 1)
+        await self._take(self.token_budget, estimate)
+
+    async def _backoff(self, error: Exception, attempt: int):
+        delay = random.uniform(0, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** attempt))
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        if isinstance(error, openai.RateLimitError):
+            self._count("rate_limited")
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        self._count("retries")
+        await asyncio.sleep(delay)
+
+    async def acomplete(self, **kwargs):
+        """chat.completions.create with admission control and retries."""
+        estimate = estimate_tokens(kwargs.get("messages", []), kwargs.get("max_tokens"))
+        async with self._semaphore:
+            self._count("in_flight")
+            try:
+                for attempt in range(self.max_retries + 1):
+                    await self._admit(estimate)
+                    self._count("requests")
+                    try:
+                        response = await self.client.chat.completions.create(**kwargs)
+                    except Exception as e:
+                        if openai is None or not _is_retryable(e) or attempt == self.max_retries:
+                            self._count("failures")
+                            raise
+                        await self._backoff(e, attempt)
+                        continue
+
+                    usage = getattr(response, "usage", None)
+                    if self.token_budget and usage and usage.total_tokens < estimate:
+                        self.token_budget.refund(estimate - usage.total_tokens)
+                    return response
+            finally:
+                self._count("in_flight", -1)
+
+    def complete(self, **kwargs):
+        """Blocking `acomplete` for code running outside the gateway's loop."""
+        return asyncio.run_coroutine_threadsafe(self.acomplete(**kwargs), self._loop).result()
+
+    def stream(self, **kwargs) -> Iterator:
+        """
+        Blocking iterator over a streamed completion's chunks. Retries only
+        happen before the first chunk arrives; the concurrency slot is held
+        until the stream finishes.
+        """
+        chunks: queue.Queue = queue.Queue(maxsize=256)
+        done = object()
+        cancelled = threading.Event()
+
+        async def pump():
+            estimate = estimate_tokens(kwargs.get("messages", []), kwargs.get("max_tokens"))
+            stream = None
+            try:
+                async with self._semaphore:
+                    self._count("in_flight")
+                    try:
+                        for attempt in range(self.max_retries + 1):
+                            await self._admit(estimate)
+                            self._count("requests")
+                            try:
+                                stream = await self.client.chat.completions.create(stream=True, **kwargs)
+                                break
+                            except Exception as e:
+                                if openai is None or not _is_retryable(e) or attempt == self.max_retries:
+                                    self._count("failures")
+                                    raise
+                                await self._backoff(e, attempt)
+
+                        async for chunk in stream:
+                            if cancelled.is_set():
+                                break
+                            await asyncio.to_thread(chunks.put, chunk)
+                    finally:
+                        self._count("in_flight", -1)
+                        if stream is not None and hasattr(stream, "close"):
+                            await stream.close()
+            finally:
+                await asyncio.to_thread(chunks.put, done)
+
+        future = asyncio.run_coroutine_threadsafe(pump(), self._loop)
+        try:
+            while True:
+                chunk = chunks.get()
+                if chunk is done:
+                    break
+                yield chunk
+            future.result()  # Re-raise anything the stream failed with
+        finally:
+            cancelled.set()
+            # Unblock the pump if the consumer stopped early
+            while not future.done():
+                try:
+                    chunks.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+
+    def stats(self) -> dict:
+        with self._counter_lock:
+            counters = dict(self._counters)
+        counters["max_concurrency"] = self.max_concurrency
+        counters["paused_seconds"] = round(max(0.0, self._paused_until - time.monotonic()), 2)
+        if self.token_budget:
+            counters["tokens_available"] = int(self.token_budget.available)
+        return counters
+
+
+_gateway_instance: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+def get_llm_gateway() -> LLMGateway:
+    """Get or create the shared LLM gateway."""
+    global _gateway_instance
+    with _gateway_lock:
+        if _gateway_instance is None:
+            _gateway_instance = LLMGateway()
+    return _gateway_instance
@@ -0,0 +1,275 @@
+"""Near-duplicate detection of job postings by MinHash/LSH over raw_description."""
+import os
+import re
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import bindparam, update
+
+from app.models import Job
+
+# Off: ingestion doesn't sign or cluster new postings
+NEAR_DUP_ENABLED = os.getenv("NEAR_DUP_ENABLED", "1") == "1"
+NEAR_DUP_THRESHOLD = float(os.getenv("NEAR_DUP_THRESHOLD", "0.8"))
+NEAR_DUP_PERMUTATIONS = int(os.getenv("NEAR_DUP_PERMUTATIONS", "128"))
+# Pairs above about (1 / bands) ** (bands / permutations) similarity share a band (0.71 at 16 of 128)
+NEAR_DUP_BANDS = int(os.getenv("NEAR_DUP_BANDS", "16"))
+NEAR_DUP_SHINGLE_WORDS = int(os.getenv("NEAR_DUP_SHINGLE_WORDS", "3"))
+# Shorter descriptions ("Apply on our site") aren't signed: they'd match unrelated jobs
+NEAR_DUP_MIN_WORDS = int(os.getenv("NEAR_DUP_MIN_WORDS", "20"))
+NEAR_DUP_INDEX_TTL_SECONDS = float(os.getenv("NEAR_DUP_INDEX_TTL_SECONDS", "300"))
+
+if NEAR_DUP_PERMUTATIONS % NEAR_DUP_BANDS:
+    raise ValueError("NEAR_DUP_PERMUTATIONS must be a multiple of NEAR_DUP_BANDS")
+
+# Permutations are h(x) = (a * x + b) mod P over 31-bit shingle hashes, so a * x fits in uint64
+_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.default_rng(20261017)  # Fixed: stored signatures must stay comparable
+_A = _rng.integers(1, _PRIME, size=NEAR_DUP_PERMUTATIONS, dtype=np.uint64)
+_B = _rng.integers(0, _PRIME, size=NEAR_DUP_PERMUTATIONS, dtype=np.uint64)
+
+_WORD = re.compile(r"\w+")
+
+
+def shingles(text: Optional[str]) -> List[str]:
+    """Overlapping word n-grams of the lower-cased text ([] if it is too short)."""
+    words = _WORD.findall((text or "").lower())
+    if len(words) < max(NEAR_DUP_MIN_WORDS, NEAR_DUP_SHINGLE_WORDS):
+        return []
+    size = NEAR_DUP_SHINGLE_WORDS
+    return [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+def minhash(text: Optional[str]) -> Optional[np.ndarray]:
+    """The MinHash signature (uint32 array) of a description, or None if too short."""
+    grams = shingles(text)
+    if not grams:
+        return None
+    hashes = np.fromiter((zlib.crc32(gram.encode("utf-8")) for gram in set(grams)), dtype=np.uint64)
+    hashes %= _PRIME
+    permuted = (_A[:, None] * hashes[None, :] + _B[:, None]) % _PRIME
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def similarity(first: np.ndarray, second: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    return float(np.count_nonzero(first == second)) / len(first)
+
+
+def signature_bytes(signature: np.ndarray) -> bytes:
+    return signature.astype("<u4").tobytes()
+
+
+def signature_from_bytes(data: Optional[bytes]) -> Optional[np.ndarray]:
+    """A stored signature, or None if missing or made with other settings."""
+    if not data or len(data) != NEAR_DUP_PERMUTATIONS * 4:
+        return None
+    return np.frombuffer(data, dtype="<u4")
+
+
+class NearDuplicateIndex:
+    """
+    LSH band buckets over job signatures, plus each indexed job's signature
+    and canonical job. Reloaded from the database when older than the TTL
+    (other workers ingest too) or after `invalidate()`; assign_duplicates
+    adds to it in place.
+    """
+
+    def __init__(self, threshold: float = NEAR_DUP_THRESHOLD, ttl_seconds: float = NEAR_DUP_INDEX_TTL_SECONDS):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.rows = NEAR_DUP_PERMUTATIONS // NEAR_DUP_BANDS
+        self.buckets: List[Dict[bytes, List]] = [{} for _ in range(NEAR_DUP_BANDS)]
+        self.signatures: Dict = {}
+        self.canonical: Dict = {}  # job_id -> its cluster's canonical job_id
+        self.built_at: Optional[float] = None
+        self._lock = threading.RLock()
+
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(NEAR_DUP_BANDS):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def add(self, job_id, signature: np.ndarray, canonical_id=None):
+        with self._lock:
+            self.remove(job_id)
+            self.signatures[job_id] = signature
+            self.canonical[job_id] = canonical_id or job_id
+            for band, key in self._band_keys(signature):
+                self.buckets[band].setdefault(key, []).append(job_id)
+
+    def remove(self, job_id):
+        with self._lock:
+            signature = self.signatures.pop(job_id, None)
+            self.canonical.pop(job_id, None)
+            if signature is None:
+                return
+            for band, key in self._band_keys(signature):
+                bucket = self.buckets[band].get(key)
+                if bucket and job_id in bucket:
+                    bucket.remove(job_id)
+                    if not bucket:
+                        del self.buckets[band][key]
+
+    def best_match(self, signature: np.ndarray, exclude=None) -> Optional[Tuple]:
+        """(job_id, similarity) of the most similar indexed job at or above the threshold."""
+        with self._lock:
+            candidates = set()
+            for band, key in self._band_keys(signature):
+                candidates.update(self.buckets[band].get(key, ()))
+            candidates.discard(exclude)
+            best = None
+            for job_id in candidates:
+                score = similarity(signature, self.signatures[job_id])
+                if score >= self.threshold and (best is None or score > best[1]):
+                    best = (job_id, score)
+            return best
+
+    def canonical_for(self, signature: np.ndarray, job_id=None):
+        """The canonical job a posting with `signature` duplicates, or None."""
+        match = self.best_match(signature, exclude=job_id)
+        if match is None:
+            return None
+        canonical = self.canonical[match[0]]
+        return None if canonical == job_id else canonical
+
+    def load(self, db):
+        """Index every signed job (signatures come from jobs.minhash, nothing is re-shingled)."""
+        fresh = NearDuplicateIndex(self.threshold, self.ttl_seconds)
+        rows = db.query(Job.job_id, Job.minhash, Job.duplicate_of).filter(
+            Job.minhash.isnot(None)
+        ).execution_options(yield_per=5000)
+        for row in rows:
+            signature = signature_from_bytes(row.minhash)
+            if signature is not None:
+                fresh.add(row.job_id, signature, row.duplicate_of)
+        with self._lock:
+            self.buckets, self.signatures, self.canonical = fresh.buckets, fresh.signatures, fresh.canonical
+            self.built_at = time.monotonic()
+
+    def is_stale(self) -> bool:
+        return self.built_at is None or time.monotonic() - self.built_at > self.ttl_seconds
+
+    def refresh(self, db):
+        if self.is_stale():
+            with self._lock:
+                if self.is_stale():
+                    self.load(db)
+
+    def invalidate(self):
+        self.built_at = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "jobs": len(self.signatures),
+                "clusters": len(set(self.canonical.values())),
+                "buckets": sum(len(buckets) for buckets in self.buckets),
+                "age_seconds": round(time.monotonic() - self.built_at, 1) if self.built_at else None,
+            }
+
+
+def assign_duplicates(db, jobs: Iterable[Tuple], index: Optional[NearDuplicateIndex] = None) -> int:
+    """
+    Sign (job_id, raw_description) pairs, store their signatures and point
+    each near-duplicate at its cluster's canonical job (no commit). Jobs
+    are added to the index as they go, so duplicates within `jobs` are
+    found too. Returns how many were marked as duplicates.
+    """
+    index = index or get_near_duplicate_index()
+    index.refresh(db)
+    table = Job.__table__
+    updates, duplicates = [], 0
+    for job_id, description in jobs:
+        signature = minhash(description)
+        if signature is None:
+            index.remove(job_id)
+            updates.append({"job": job_id, "signature": None, "canonical": None})
+            continue
+        canonical = index.canonical_for(signature, job_id)
+        index.add(job_id, signature, canonical)
+        duplicates += canonical is not None
+        updates.append({"job": job_id, "signature": signature_bytes(signature), "canonical": canonical})
+    if updates:
+        db.execute(
+            update(table).where(table.c.job_id == bindparam("job")).values(
+                minhash=bindparam("signature"), duplicate_of=bindparam("canonical")
+            ),
+            updates,
+        )
+    return duplicates
+
+
+def cluster_all_jobs(db, batch_size: int = 1000, resign: bool = False) -> dict:
+    """
+    Sign jobs that have no signature yet (all of them with `resign`), then
+    recluster everything oldest first, so each cluster's canonical job is
+    its earliest posting. Commits per batch; returns counts.
+    """
+    table = Job.__table__
+    sign = update(table).where(table.c.job_id == bindparam("job")).values(minhash=bindparam("signature"))
+    signed, last_id = 0, None
+    while True:
+        query = db.query(Job.job_id, Job.raw_description).order_by(Job.job_id)
+        if not resign:
+            query = query.filter(Job.minhash.is_(None), Job.raw_description.isnot(None))
+        if last_id is not None:
+            query = query.filter(Job.job_id > last_id)
+        rows = query.limit(batch_size).all()
+        if not rows:
+            break
+        updates = []
+        for row in rows:
+            signature = minhash(row.raw_description)
+            if signature is not None:
+                updates.append({"job": row.job_id, "signature": signature_bytes(signature)})
+            elif resign:
+                updates.append({"job": row.job_id, "signature": None})
+        if updates:
+            db.execute(sign, updates)
+            db.commit()
+            signed += len(updates)
+        last_id = rows[-1].job_id
+
+    index = NearDuplicateIndex()
+    changes = []
+    rows = db.query(Job.job_id, Job.minhash, Job.duplicate_of).order_by(
+        Job.discovered_date, Job.created_at, Job.job_id
+    ).execution_options(yield_per=5000)
+    for row in rows:
+        signature = signature_from_bytes(row.minhash)
+        canonical = None
+        if signature is not None:
+            canonical = index.canonical_for(signature, row.job_id)
+            index.add(row.job_id, signature, canonical)
+        if canonical != row.duplicate_of:
+            changes.append({"job": row.job_id, "canonical": canonical})
+
+    mark = update(table).where(table.c.job_id == bindparam("job")).values(duplicate_of=bindparam("canonical"))
+    for offset in range(0, len(changes), batch_size):
+        db.execute(mark, changes[offset:offset + batch_size])
+        db.commit()
+
+    index.built_at = time.monotonic()
+    global _index_instance
+    _index_instance = index
+    return {
+        "signed": signed,
+        "indexed": len(index.signatures),
+        "clusters": len(set(index.canonical.values())),
+        "duplicates": sum(1 for job_id, canonical in index.canonical.items() if canonical != job_id),
+        "changed": len(changes),
+    }
+
+
+# Singleton
+_index_instance: Optional[NearDuplicateIndex] = None
+
+def get_near_duplicate_index() -> NearDuplicateIndex:
+    """Get or create the shared near-duplicate index (loaded on first refresh)."""
+    global _index_instance
+    if _index_instance is None:
+        _index_instance = NearDuplicateIndex()
+    return _index_instance
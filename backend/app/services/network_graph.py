@@ -0,0 +1,336 @@
+"""In-memory network graph for warm-introduction pathfinding."""
+import heapq
+import math
+import os
+import re
+import threading
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func
+
+from app.models import Network
+
+NETWORK_INTRO_STRENGTH = int(os.getenv("NETWORK_INTRO_STRENGTH", "50"))
+# Changes are pulled from network.updated_at at most this often; a full reload after the TTL
+NETWORK_GRAPH_SYNC_SECONDS = float(os.getenv("NETWORK_GRAPH_SYNC_SECONDS", "5"))
+NETWORK_GRAPH_TTL_SECONDS = float(os.getenv("NETWORK_GRAPH_TTL_SECONDS", "3600"))
+NETWORK_GRAPH_COMPACT_FRACTION = float(os.getenv("NETWORK_GRAPH_COMPACT_FRACTION", "0.1"))
+
+ME = 0
+PERSON, COMPANY = 1, 2
+
+_COMPANY_SUFFIX = re.compile(r"[,\s]+(inc|llc|ltd|limited|corp|corporation|co|gmbh|plc)\.?$")
+_WHITESPACE = re.compile(r"\s+")
+
+_EMPTY_INDICES = np.zeros(0, dtype=np.int32)
+_EMPTY_COSTS = np.zeros(0, dtype=np.float64)
+
+
+def normalize_company(name) -> str:
+    """Company names as matched ("Acme, Inc." and "acme" are one company)."""
+    name = _WHITESPACE.sub(" ", str(name)).strip().lower()
+    return _COMPANY_SUFFIX.sub("", name).strip(" ,.")
+
+
+def strength_cost(strength) -> Optional[float]:
+    """Edge cost -log(s / 100) of a strength (paths minimize cost, maximizing product), or None."""
+    try:
+        strength = float(strength)
+    except (TypeError, ValueError):
+        return None
+    if strength <= 0:
+        return None
+    return -math.log(min(strength, 100.0) / 100.0)
+
+
+def _person_key(person_id) -> str:
+    try:
+        return str(uuid.UUID(str(person_id)))
+    except ValueError:
+        return str(person_id)
+
+
+def _intro_targets(can_introduce_to) -> List[Tuple[str, float]]:
+    targets = []
+    for entry in can_introduce_to if isinstance(can_introduce_to, list) else ():
+        if isinstance(entry, dict):
+            person_id, strength = entry.get("person_id"), entry.get("strength", NETWORK_INTRO_STRENGTH)
+        else:
+            person_id, strength = entry, NETWORK_INTRO_STRENGTH
+        cost = strength_cost(strength)
+        if person_id and cost is not None:
+            targets.append((_person_key(person_id), cost))
+    return targets
+
+
+def _companies(row) -> Dict[str, str]:
+    """Normalized name -> display name of the companies a person works at."""
+    names = [row.current_company] if row.current_company else []
+    if isinstance(row.works_at_companies, list):
+        names.extend(name for name in row.works_at_companies if isinstance(name, str))
+    companies = {}
+    for name in names:
+        companies.setdefault(normalize_company(name), name.strip())
+    companies.pop("", None)
+    return companies
+
+
+class NetworkGraph:
+    """
+    CSR adjacency over me, people and companies, with an overlay of changed
+    nodes folded back in by compact(). Edges:
+
+        me -> person        relationship_strength
+        person -> person    can_introduce_to (NETWORK_INTRO_STRENGTH without a strength)
+        person -> company   current_company and works_at_companies, at no cost
+    """
+
+    _COLUMNS = (
+        Network.person_id, Network.name, Network.current_company, Network.relationship_strength,
+        Network.can_introduce_to, Network.works_at_companies, Network.updated_at,
+    )
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+        self.built_at: Optional[float] = None
+        self.synced_at: Optional[float] = None
+        self.synced_until = None  # Latest network.updated_at applied
+
+    def _reset(self):
+        self.node_ids: Dict[tuple, int] = {("me", None): ME}
+        self.kinds: List[int] = [0]
+        self.keys: List[Optional[str]] = [None]  # person_id or normalized company name
+        self.labels: List[str] = ["me"]
+        self.people: Dict[str, int] = {}  # Rows currently in `network`
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.indices = _EMPTY_INDICES
+        self.costs = _EMPTY_COSTS
+        self.overlay: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def _node(self, kind: int, key: str, label: Optional[str] = None) -> int:
+        node_key = ("person" if kind == PERSON else "company", key)
+        node = self.node_ids.get(node_key)
+        if node is None:
+            node = self.node_ids[node_key] = len(self.kinds)
+            self.kinds.append(kind)
+            self.keys.append(key)
+            self.labels.append(label or key)
+        elif label and kind == PERSON:  # Names change; a company keeps its first spelling
+            self.labels[node] = label
+        return node
+
+    def neighbors(self, node: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(target nodes, costs) of a node's out-edges."""
+        if node in self.overlay:
+            return self.overlay[node]
+        if node + 1 < len(self.indptr):
+            start, end = self.indptr[node], self.indptr[node + 1]
+            return self.indices[start:end], self.costs[start:end]
+        return _EMPTY_INDICES, _EMPTY_COSTS
+
+    @property
+    def edge_count(self) -> int:
+        compacted = len(self.indices) - sum(
+            int(self.indptr[node + 1] - self.indptr[node]) for node in self.overlay if node + 1 < len(self.indptr)
+        )
+        return compacted + sum(len(indices) for indices, _ in self.overlay.values())
+
+    def _person_edges(self, row) -> Tuple[int, Optional[float], Dict[int, float]]:
+        """The row's node, the cost of me -> it, and its out-edges."""
+        node = self._node(PERSON, _person_key(row.person_id), row.name)
+        edges = {}
+        for person_id, cost in _intro_targets(row.can_introduce_to):
+            target = self._node(PERSON, person_id)
+            if target != node:
+                edges[target] = min(cost, edges.get(target, cost))
+        for company, label in _companies(row).items():
+            edges[self._node(COMPANY, company, label)] = 0.0
+        return node, strength_cost(row.relationship_strength), edges
+
+    @staticmethod
+    def _arrays(edges: Dict[int, float]) -> Tuple[np.ndarray, np.ndarray]:
+        if not edges:
+            return _EMPTY_INDICES, _EMPTY_COSTS
+        return (
+            np.fromiter(edges.keys(), dtype=np.int32, count=len(edges)),
+            np.fromiter(edges.values(), dtype=np.float64, count=len(edges)),
+        )
+
+    def _build(self, adjacency: Dict[int, Dict[int, float]]):
+        node_count = len(self.kinds)
+        counts = np.zeros(node_count, dtype=np.int64)
+        for node, edges in adjacency.items():
+            counts[node] = len(edges)
+        self.indptr = np.zeros(node_count + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.indptr[1:])
+        self.indices = np.empty(self.indptr[-1], dtype=np.int32)
+        self.costs = np.empty(self.indptr[-1], dtype=np.float64)
+        for node, edges in adjacency.items():
+            start = self.indptr[node]
+            self.indices[start:start + len(edges)] = list(edges.keys())
+            self.costs[start:start + len(edges)] = list(edges.values())
+        self.overlay = {}
+
+    def build(self, rows: Iterable):
+        """Rebuild from `network` rows (anything with the Network column names)."""
+        with self._lock:
+            self._reset()
+            adjacency = {ME: {}}
+            latest = None
+            for row in rows:
+                node, my_cost, edges = self._person_edges(row)
+                self.people[_person_key(row.person_id)] = node
+                adjacency[node] = edges
+                if my_cost is not None:
+                    adjacency[ME][node] = my_cost
+                if row.updated_at is not None and (latest is None or row.updated_at > latest):
+                    latest = row.updated_at
+            self._build(adjacency)
+            self.synced_until = latest
+            self.built_at = self.synced_at = time.monotonic()
+
+    def compact(self):
+        """Fold the overlay back into the CSR arrays."""
+        with self._lock:
+            adjacency = {}
+            for node in range(len(self.kinds)):
+                indices, costs = self.neighbors(node)
+                if len(indices):
+                    adjacency[node] = dict(zip(indices.tolist(), costs.tolist()))
+            self._build(adjacency)
+
+    def apply(self, rows: Iterable):
+        """Replace the edges of changed (or new) `network` rows."""
+        with self._lock:
+            indices, costs = self.neighbors(ME)
+            mine = dict(zip(indices.tolist(), costs.tolist()))
+            for row in rows:
+                node, my_cost, edges = self._person_edges(row)
+                self.people[_person_key(row.person_id)] = node
+                self.overlay[node] = self._arrays(edges)
+                if my_cost is None:
+                    mine.pop(node, None)
+                else:
+                    mine[node] = my_cost
+                if row.updated_at is not None and (self.synced_until is None or row.updated_at > self.synced_until):
+                    self.synced_until = row.updated_at
+            self.overlay[ME] = self._arrays(mine)
+            self._maybe_compact()
+
+    def remove(self, person_ids: Iterable):
+        """Drop the edges of deleted people (intros pointing at them lead nowhere)."""
+        with self._lock:
+            indices, costs = self.neighbors(ME)
+            mine = dict(zip(indices.tolist(), costs.tolist()))
+            for person_id in person_ids:
+                node = self.people.pop(_person_key(person_id), None)
+                if node is not None:
+                    self.overlay[node] = (_EMPTY_INDICES, _EMPTY_COSTS)
+                    mine.pop(node, None)
+            self.overlay[ME] = self._arrays(mine)
+            self._maybe_compact()
+
+    def _maybe_compact(self):
+        if len(self.overlay) > NETWORK_GRAPH_COMPACT_FRACTION * len(self.kinds):
+            self.compact()
+
+    def load(self, db):
+        self.build(db.query(*self._COLUMNS).execution_options(yield_per=5000))
+
+    def sync(self, db):
+        """
+        Apply rows updated since the last sync. Deletions don't leave an
+        updated_at behind, so a row count below ours triggers a full reload.
+        """
+        query = db.query(*self._COLUMNS)
+        if self.synced_until is not None:
+            query = query.filter(Network.updated_at >= self.synced_until)  # >=: same-timestamp writes
+        self.apply(query.all())
+        if db.query(func.count(Network.person_id)).scalar() < len(self.people):
+            self.load(db)
+        self.synced_at = time.monotonic()
+
+    def refresh(self, db):
+        """Reload after the TTL, otherwise pull recent changes (at most every sync interval)."""
+        now = time.monotonic()
+        with self._lock:
+            if self.built_at is None or now - self.built_at > NETWORK_GRAPH_TTL_SECONDS:
+                self.load(db)
+            elif now - self.synced_at > NETWORK_GRAPH_SYNC_SECONDS:
+                self.sync(db)
+
+    def invalidate(self):
+        self.built_at = None
+
+    def intro_paths(self, company: str, k: int = 3) -> List[dict]:
+        """
+        The k strongest paths from me to people at `company`, one per
+        insider (the last hop), strongest first. A single Dijkstra run from
+        me, stopping once no unsettled path can beat the k found.
+        """
+        with self._lock:
+            target = self.node_ids.get(("company", normalize_company(company)))
+            if target is None or k <= 0:
+                return []
+            distance = {ME: 0.0}
+            previous, settled = {}, set()
+            found = []  # Max-heap (negated) of the best k (cost, insider)
+            heap = [(0.0, ME)]
+            while heap:
+                cost, node = heapq.heappop(heap)
+                if node in settled:
+                    continue
+                settled.add(node)
+                if len(found) == k and cost >= -found[0][0]:
+                    break
+                indices, costs = self.neighbors(node)
+                for neighbor, edge_cost in zip(indices.tolist(), costs.tolist()):
+                    total = cost + edge_cost
+                    if neighbor == target:
+                        if node != ME:
+                            heapq.heappush(found, (-total, node))
+                            if len(found) > k:
+                                heapq.heappop(found)
+                    elif self.kinds[neighbor] == PERSON and total < distance.get(neighbor, math.inf):
+                        distance[neighbor] = total
+                        previous[neighbor] = node
+                        heapq.heappush(heap, (total, neighbor))
+
+            paths = []
+            for negative_cost, insider in sorted(found, reverse=True):
+                hops, node = [], insider
+                while node != ME:
+                    hops.append(node)
+                    node = previous[node]
+                paths.append({
+                    "strength": round(100 * math.exp(negative_cost), 1),
+                    "hops": len(hops),
+                    "path": [{"person_id": self.keys[node], "name": self.labels[node]} for node in reversed(hops)],
+                })
+            return paths
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "nodes": len(self.kinds),
+                "people": len(self.people),
+                "companies": sum(1 for kind in self.kinds if kind == COMPANY),
+                "edges": self.edge_count,
+                "overlay_nodes": len(self.overlay),
+                "age_seconds": round(time.monotonic() - self.built_at, 1) if self.built_at else None,
+            }
+
+
+# Singleton
+_graph_instance: Optional[NetworkGraph] = None
+
+def get_network_graph() -> NetworkGraph:
+    """Get or create the shared network graph (loaded on first refresh)."""
+    global _graph_instance
+    if _graph_instance is None:
+        _graph_instance = NetworkGraph()
+    return _graph_instance
@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from typing import Callable, Optional
+
+from sqlalchemy import or_
+
+from app.database import SessionLocal
+from app.models import ParseCacheEntry
+from app.services.cache import LRUCache, TwoTierCache
+
+_PAGE_MARKER = re.compile(r"^--- Page \d+ ---$", re.MULTILINE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def hash_pdf_bytes(pdf_data) -> str:
+    """sha256 of PDF bytes or any buffer (e.g. an mmap of the upload)."""
+    return hashlib.sha256(pdf_data).hexdigest()
+
+
+def normalize_text(raw_text: str) -> str:
+    """
+    Canonical form of extracted text, so a lightly re-exported PDF
+    (different whitespace, ligatures, page breaks) maps to the same key.
+    """
+    text = unicodedata.normalize("NFKC", raw_text)
+    text = _PAGE_MARKER.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def hash_text(raw_text: str) -> str:
+    return hashlib.sha256(normalize_text(raw_text).encode("utf-8")).hexdigest()
+
+
+class ParseCache(TwoTierCache):
+    """
+    Two-tier cache of structured resume JSON.
+
+    Tier 1 is an in-process LRU; tier 2 is the parse_cache table. Entries are
+    addressed by the PDF bytes hash and by the normalized-text hash, scoped
+    to the model and prompt version that produced them.
+    """
+
+    entry_model = ParseCacheEntry
+
+    def __init__(
+        self,
+        model: str,
+        prompt_version: str,
+        session_factory: Callable = SessionLocal,
+        max_memory_entries: Optional[int] = None,
+        max_memory_bytes: Optional[int] = None,
+        max_rows: Optional[int] = None,
+    ):
+        super().__init__(session_factory, LRUCache(
+            max_entries=max_memory_entries or int(os.getenv("PARSE_CACHE_MEMORY_ENTRIES", "256")),
+            max_size=max_memory_bytes or int(os.getenv("PARSE_CACHE_MEMORY_BYTES", str(64 * 1024 * 1024))),
+            size_of=len,
+        ))
+        self.model = model
+        self.prompt_version = prompt_version
+        self.max_rows = max_rows or int(os.getenv("PARSE_CACHE_MAX_ROWS", "10000"))
+        self.evicted_rows = 0
+
+    def get_by_pdf(self, pdf_sha256: str) -> Optional[dict]:
+        """Look up by PDF bytes hash. Returns {"content", "raw_text"} or None."""
+        return self._get("pdf", pdf_sha256, ParseCacheEntry.pdf_sha256)
+
+    def get_by_text(self, text_sha256: str) -> Optional[dict]:
+        """Look up by normalized-text hash. Returns {"content", "raw_text"} or None."""
+        return self._get("text", text_sha256, ParseCacheEntry.text_sha256)
+
+    def put(self, pdf_sha256: Optional[str], text_sha256: str, content: dict, raw_text: str):
+        """Store a parse result under both addresses."""
+        self._remember_payload(pdf_sha256, text_sha256, json.dumps({"content": content, "raw_text": raw_text}))
+        self._write(ParseCacheEntry(
+            pdf_sha256=pdf_sha256,
+            text_sha256=text_sha256,
+            model=self.model,
+            prompt_version=self.prompt_version,
+            content=content,
+            raw_text=raw_text,
+        ))
+
+    def stats(self) -> dict:
+        stats = {"model": self.model, "prompt_version": self.prompt_version, **super().stats()}
+        stats["db"].update(evicted_rows=self.evicted_rows, max_rows=self.max_rows)
+        return stats
+
+    def _get(self, kind: str, digest: str, column) -> Optional[dict]:
+        return self._lookup((kind, digest), lambda db: db.query(ParseCacheEntry).filter(
+            column == digest,
+            ParseCacheEntry.model == self.model,
+            ParseCacheEntry.prompt_version == self.prompt_version,
+        ).order_by(ParseCacheEntry.last_hit_at.desc()).first())
+
+    def _remember(self, entry: ParseCacheEntry) -> str:
+        payload = json.dumps({"content": entry.content, "raw_text": entry.raw_text})
+        self._remember_payload(entry.pdf_sha256, entry.text_sha256, payload)
+        return payload
+
+    def _remember_payload(self, pdf_sha256: Optional[str], text_sha256: str, payload: str):
+        if pdf_sha256:
+            self.memory.put(("pdf", pdf_sha256), payload)
+        self.memory.put(("text", text_sha256), payload)
+
+    def _after_write(self, db):
+        """Evict least recently hit rows beyond max_rows (all models/prompts share the budget)."""
+        total = db.query(ParseCacheEntry.cache_id).count()
+        overflow = total - self.max_rows
+        if overflow <= 0:
+            return
+
+        stale_ids = [
+            row.cache_id for row in db.query(ParseCacheEntry.cache_id)
+            .order_by(ParseCacheEntry.last_hit_at.asc())
+            .limit(overflow)
+        ]
+        db.query(ParseCacheEntry).filter(
+            ParseCacheEntry.cache_id.in_(stale_ids)
+        ).delete(synchronize_session=False)
+        db.commit()
+        with self._lock:
+            self.evicted_rows += len(stale_ids)
+
+    def invalidate_other_versions(self) -> int:
+        """Delete rows produced by any other model or prompt version."""
+        return self._delete(or_(
+            ParseCacheEntry.model != self.model,
+            ParseCacheEntry.prompt_version != self.prompt_version,
+        ))
@@ -1,6 +1,11 @@
 import os
 import json
-from typing import Optional
+import hashlib
+import mmap
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
 from io import BytesIO
 
 try:
@@ -8,75 +13,32 @@ try:
 except ImportError:
     PdfReader = None
 
-try:
-    from openai import OpenAI
-except ImportError:
-    OpenAI = None
+from app.services.parse_cache import ParseCache, hash_pdf_bytes, hash_text
+from app.services.json_stream import IncrementalSectionParser, section_events
+from app.services.llm_gateway import LLMGateway, get_llm_gateway
+from app.services.section_parser import (
+    SECTION_GROUPS, SECTION_PROMPT_SCOPE, SECTION_USER_PROMPT_TEMPLATE, SectionedResumeParser,
+    compute_years_experience,
+)
+from app.uploads import PDFSource, pdf_buffer
 
 
-class PDFParserService:
-    """
-    Agent A: "The Extractor"
-    Converts raw PDF text -> Structured JSON using OpenAI
-    """
-    
-    def __init__(self):
-        if OpenAI is None:
-            raise ImportError("openai package is required. Run: pip install openai")
-        
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key or api_key == "your-openai-api-key-here":
-            raise ValueError("OPENAI_API_KEY environment variable must be set")
-        
-        self.client = OpenAI(api_key=api_key)
-    
-    def extract_text_from_pdf(self, pdf_bytes: bytes) -> str:
-        """Extract raw text from PDF file bytes with improved handling."""
-        if PdfReader is None:
-            raise ImportError("pypdf package is required. Run: pip install pypdf")
-        
-        reader = PdfReader(BytesIO(pdf_bytes))
-        text_parts = []
-        
-        for i, page in enumerate(reader.pages):
-            text = page.extract_text()
-            if text:
-                # Clean up the text
-                text = text.strip()
-                # Add page separator for multi-page resumes
-                if i > 0:
-                    text_parts.append(f"\n--- Page {i + 1} ---\n")
-                text_parts.append(text)
-        
-        full_text = "\n".join(text_parts)
-        
-        # Basic text cleanup
-        # Remove excessive whitespace while preserving structure
-        lines = full_text.split('\n')
-        cleaned_lines = []
-        for line in lines:
-            # Preserve non-empty lines
-            stripped = line.strip()
-            if stripped:
-                cleaned_lines.append(stripped)
-            elif cleaned_lines and cleaned_lines[-1]:  # Add single blank line
-                cleaned_lines.append('')
-        
-        return '\n'.join(cleaned_lines)
-    
-    def parse_resume_to_json(self, raw_text: str) -> dict:
-        """
-        Use OpenAI to convert unstructured resume text 
-        into our structured JSON schema.
-        """
-        
-        system_prompt = """You are an expert resume parser. Extract ALL information from the resume text into structured JSON.
+PARSE_MODEL = os.getenv("OPENAI_PARSE_MODEL", "gpt-4o")
+
+# "single": one completion for the whole resume.
+# "sectioned": split on headings and parse section groups concurrently.
+PARSE_MODE = os.getenv("PARSE_MODE", "single")
+
+PROMPT_PREAMBLE = """You are an expert resume parser. Extract ALL information from the resume text into structured JSON.
 
 CRITICAL: You must capture EVERY work experience, EVERY bullet point, EVERY skill, EVERY publication, EVERY award mentioned. Do not summarize or skip anything.
 
 Return ONLY valid JSON with this exact structure:
 
-{
+"""
+
+# Target document shape; section-parallel parsing requests subsets of it
+RESUME_SCHEMA_JSON = """{
   "basics": {
     "name": "Full Name",
     "email": "email@example.com",
@@ -178,27 +140,31 @@ Return ONLY valid JSON with this exact structure:
     }
   ],
   "meta": {
-    "years_experience": 0,
     "core_archetype": "Individual Contributor or Technical Leader or Executive",
     "primary_domain": "e.g., Backend, Frontend, ML, DevOps, etc."
   }
-}
+}"""
+
+PROMPT_RULES = """
 
 RULES:
 1. Extract EVERY bullet point from work experience - do not skip or combine them
 2. Preserve the original text of accomplishments in raw_text
-3. Calculate years_experience by summing up all work experience durations
-4. For skills, categorize them appropriately - don't leave any out
-5. If a section is not present in the resume, use empty array [] or null
-6. For accomplishments tags, extract 2-4 relevant keywords/technologies mentioned
-7. Be thorough - a complete resume might have 3-10+ bullet points per role
-8. Extract ALL publications with full citation details (authors, venue, date)
-9. Extract ALL awards, honors, and recognitions
-10. Extract patents if present
-11. Extract spoken/written languages (not programming languages) separately
-12. Extract volunteer/community work if present"""
-
-        user_prompt = f"""Parse this complete resume and extract ALL information into the JSON structure. 
+3. For skills, categorize them appropriately - don't leave any out
+4. If a section is not present in the resume, use empty array [] or null
+5. For accomplishments tags, extract 2-4 relevant keywords/technologies mentioned
+6. Be thorough - a complete resume might have 3-10+ bullet points per role
+7. Extract ALL publications with full citation details (authors, venue, date)
+8. Extract ALL awards, honors, and recognitions
+9. Extract patents if present
+10. Extract spoken/written languages (not programming languages) separately
+11. Extract volunteer/community work if present"""
+
+SYSTEM_PROMPT = PROMPT_PREAMBLE + RESUME_SCHEMA_JSON + PROMPT_RULES
+
+RESUME_SCHEMA = json.loads(RESUME_SCHEMA_JSON)
+
+USER_PROMPT_TEMPLATE = """Parse this complete resume and extract ALL information into the JSON structure. 
 Do not skip any work experience, bullet points, or skills.
 
 ---RESUME TEXT START---
@@ -207,48 +173,351 @@ Do not skip any work experience, bullet points, or skills.
 
 Return ONLY the complete JSON object with all resume content."""
 
-        response = self.client.chat.completions.create(
-            model="gpt-4o",
+# Changes whenever the prompts change, so cached parses from an older
+# prompt (or the other parse mode) are never served
+_prompt_material = SYSTEM_PROMPT + USER_PROMPT_TEMPLATE
+if PARSE_MODE == "sectioned":
+    _prompt_material += SECTION_USER_PROMPT_TEMPLATE + SECTION_PROMPT_SCOPE + json.dumps(SECTION_GROUPS)
+PROMPT_VERSION = hashlib.sha256(_prompt_material.encode("utf-8")).hexdigest()[:16]
+
+
+def estimate_parse_tokens(raw_text: str) -> int:
+    """Rough prompt + completion tokens for one full parse (~4 characters per token)."""
+    prompt_tokens = (len(SYSTEM_PROMPT) + len(USER_PROMPT_TEMPLATE) + len(raw_text)) // 4
+    # The structured output usually runs a bit longer than the resume text
+    return prompt_tokens + min(8192, len(raw_text) * 3 // 8)
+
+
+# Page extraction is CPU-bound pure Python, so long documents are split
+# across a process pool; short resumes stay in-process to skip the IPC cost.
+PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "12"))
+EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_extract_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_extract_pool() -> ProcessPoolExecutor:
+    global _extract_pool
+    if _extract_pool is None:
+        _extract_pool = ProcessPoolExecutor(
+            max_workers=EXTRACT_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _extract_pool
+
+
+def _warm_worker() -> bool:
+    return PdfReader is not None
+
+
+def warm_extract_pool():
+    """Spawn the extraction workers now rather than on the first long PDF."""
+    global _extract_pool
+    if EXTRACT_WORKERS > 1:
+        futures = [_get_extract_pool().submit(_warm_worker) for _ in range(EXTRACT_WORKERS)]
+        try:
+            for future in futures:
+                future.result()
+        except BrokenProcessPool:
+            _extract_pool = None  # Let the next long PDF start a fresh pool
+            raise
+
+
+def _extract_page_range(pdf_bytes: bytes, start: int, stop: int) -> List[Optional[str]]:
+    """Worker entry point: extract pages [start, stop) of a PDF."""
+    reader = PdfReader(BytesIO(pdf_bytes))
+    return [reader.pages[i].extract_text() for i in range(start, stop)]
+
+
+def _as_stream(pdf_data):
+    """A seekable stream over PDF data for PdfReader, without copying it."""
+    if isinstance(pdf_data, mmap.mmap):
+        pdf_data.seek(0)
+        return pdf_data
+    return BytesIO(pdf_data)
+
+
+def _iter_page_texts(pdf_data, parallel: Optional[bool] = None) -> Iterator[Optional[str]]:
+    """Yield each page's raw text in page order."""
+    global _extract_pool
+    reader = PdfReader(_as_stream(pdf_data))
+    page_count = len(reader.pages)
+    
+    if parallel is None:
+        parallel = EXTRACT_WORKERS > 1 and page_count >= PARALLEL_MIN_PAGES
+    
+    if parallel and page_count > 1:
+        chunk = -(-page_count // EXTRACT_WORKERS)  # ceil division
+        ranges = [(start, min(start + chunk, page_count)) for start in range(0, page_count, chunk)]
+        # Workers need picklable bytes; this copy only happens on the long-document path
+        pdf_bytes = pdf_data[:] if isinstance(pdf_data, mmap.mmap) else bytes(pdf_data)
+        try:
+            futures = [
+                _get_extract_pool().submit(_extract_page_range, pdf_bytes, start, stop)
+                for start, stop in ranges
+            ]
+            chunks = [future.result() for future in futures]
+        except BrokenProcessPool:
+            # A worker died; drop the pool and fall back to serial extraction
+            _extract_pool = None
+            chunks = None
+        if chunks is not None:
+            for texts in chunks:
+                yield from texts
+            return
+    
+    for page in reader.pages:
+        yield page.extract_text()
+
+
+def _iter_text_parts(page_texts: Iterable[Optional[str]]) -> Iterator[str]:
+    """Stripped page texts, with a separator before every page after the first."""
+    for i, text in enumerate(page_texts):
+        if text:
+            # Add page separator for multi-page resumes
+            if i > 0:
+                yield f"\n--- Page {i + 1} ---\n"
+            yield text.strip()
+
+
+def _iter_clean_lines(parts: Iterable[str]) -> Iterator[str]:
+    """
+    Stream the lines of "\n".join(parts), stripped, with runs of blank
+    lines collapsed to one and leading blank lines dropped.
+    """
+    emitted = False
+    last_blank = False
+    for part in parts:
+        for line in part.split("\n"):
+            stripped = line.strip()
+            if stripped:
+                yield stripped
+                emitted = True
+                last_blank = False
+            elif emitted and not last_blank:  # Add single blank line
+                yield ""
+                last_blank = True
+
+
+def extract_text(pdf_data, parallel: Optional[bool] = None) -> str:
+    """Extract cleaned text from PDF bytes or an mmap, one page at a time."""
+    if PdfReader is None:
+        raise ImportError("pypdf package is required. Run: pip install pypdf")
+    
+    return "\n".join(_iter_clean_lines(_iter_text_parts(_iter_page_texts(pdf_data, parallel))))
+
+
+class PDFParserService:
+    """
+    Agent A: "The Extractor"
+    Converts raw PDF text -> Structured JSON using OpenAI
+    """
+    
+    def __init__(self, cache: Optional[ParseCache] = None, llm: Optional[LLMGateway] = None):
+        # Shared, rate-limited client (raises ImportError/ValueError if unconfigured)
+        self.llm = llm or get_llm_gateway()
+        
+        # Content-addressed cache of previous parses (disable with PARSE_CACHE_ENABLED=0)
+        if cache is None and os.getenv("PARSE_CACHE_ENABLED", "1") == "1":
+            cache = ParseCache(model=PARSE_MODEL, prompt_version=PROMPT_VERSION)
+        self.cache = cache
+    
+    def extract_text_from_pdf(self, pdf_source: PDFSource) -> str:
+        """Extract raw text from PDF bytes or a PDF file object."""
+        with pdf_buffer(pdf_source) as pdf_data:
+            return extract_text(pdf_data)
+    
+    def parse_resume_to_json(self, raw_text: str) -> dict:
+        """
+        Use OpenAI to convert unstructured resume text 
+        into our structured JSON schema.
+        """
+        if PARSE_MODE == "sectioned":
+            try:
+                sectioned = SectionedResumeParser(
+                    complete=self._complete_json,
+                    schema=RESUME_SCHEMA,
+                    preamble=PROMPT_PREAMBLE,
+                    rules=PROMPT_RULES,
+                ).parse(raw_text)
+                if sectioned is not None:
+                    return sectioned
+            except json.JSONDecodeError:
+                pass  # Fall back to one full-document request
+        
+        user_prompt = USER_PROMPT_TEMPLATE.format(raw_text=raw_text)
+        
+        try:
+            return self._with_years_experience(self._complete_json(
+                SYSTEM_PROMPT,
+                user_prompt,
+                max_tokens=8192  # Increased for longer resumes
+            ))
+        except json.JSONDecodeError as e:
+            # Return a minimal valid structure on parse failure
+            return self._parse_error_structure(raw_text, e)
+    
+    @staticmethod
+    def _with_years_experience(structured_data: dict) -> dict:
+        """Set meta.years_experience from the work experience dates (the prompt doesn't ask for it)."""
+        meta = structured_data.get("meta")
+        if not isinstance(meta, dict):
+            meta = structured_data["meta"] = {}
+        meta["years_experience"] = compute_years_experience(structured_data.get("work_experience"))
+        return structured_data
+    
+    def _complete_json(self, system_prompt: str, user_prompt: str, max_tokens: int) -> dict:
+        """Run one JSON-mode completion. Raises json.JSONDecodeError on bad output."""
+        response = self.llm.complete(
+            model=PARSE_MODEL,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
             ],
-            max_tokens=8192,  # Increased for longer resumes
+            max_tokens=max_tokens,
             temperature=0.1,
             response_format={"type": "json_object"}  # Enforce JSON output
         )
         
         # Extract the JSON from the response
         response_text = response.choices[0].message.content.strip()
+        return json.loads(response_text)
+    
+    def parse_pdf(
+        self,
+        pdf_source: PDFSource,
+        on_stage: Optional[Callable[[str], None]] = None,
+        before_llm: Optional[Callable[[str], None]] = None
+    ) -> dict:
+        """
+        Main entry point: PDF bytes (or a spooled upload file) -> Structured JSON
+
+        on_stage, if given, is called with "extracting" and "parsing" as
+        the pipeline moves between steps (used by the ingestion queue).
+        before_llm, if given, is called with the extracted text right before
+        the LLM is called (not on cache hits), e.g. to wait for a token budget.
+        """
+        cached, raw_text, pdf_sha256, text_sha256 = self._extract_or_cached(pdf_source, on_stage)
+        if cached is not None:
+            return cached
+        
+        if before_llm:
+            before_llm(raw_text)
+        if on_stage:
+            on_stage("parsing")
+        structured_data = self.parse_resume_to_json(raw_text)
+        
+        if self.cache and "_parse_error" not in structured_data:
+            self.cache.put(pdf_sha256, text_sha256, structured_data, raw_text)
+        
+        return self._with_raw_text(structured_data, raw_text)
+    
+    def stream_pdf(self, pdf_source: PDFSource) -> Iterator[Tuple]:
+        """
+        Streaming variant of parse_pdf.
+
+        Yields ("section", key, value) and ("item", key, index, value) events
+        as each part of the LLM's JSON output closes, then ("parsed", content)
+        with the complete structured document.
+        """
+        cached, raw_text, pdf_sha256, text_sha256 = self._extract_or_cached(pdf_source)
+        if cached is not None:
+            yield from section_events({k: v for k, v in cached.items() if not k.startswith("_")})
+            yield ("parsed", cached)
+            return
+        
+        stream = self.llm.stream(
+            model=PARSE_MODEL,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": USER_PROMPT_TEMPLATE.format(raw_text=raw_text)}
+            ],
+            max_tokens=8192,
+            temperature=0.1,
+            response_format={"type": "json_object"}
+        )
+        
+        sections = IncrementalSectionParser()
+        scanning = True
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            if scanning:
+                try:
+                    yield from sections.feed(delta)
+                    continue
+                except json.JSONDecodeError:
+                    # Malformed partial output; keep collecting for the final parse
+                    scanning = False
+                    continue
+            sections.text += delta
         
         try:
-            return json.loads(response_text)
+            structured_data = self._with_years_experience(sections.finish())
         except json.JSONDecodeError as e:
-            # Return a minimal valid structure on parse failure
-            return {
-                "basics": {"name": "Parse Error", "summary": raw_text[:500]},
-                "work_experience": [],
-                "education": [],
-                "skills": {},
-                "projects": [],
-                "certifications": [],
-                "meta": {"years_experience": 0, "core_archetype": "Individual Contributor"},
-                "_parse_error": str(e),
-                "_raw_response": response_text[:2000]
-            }
+            structured_data = self._parse_error_structure(raw_text, e)
+        
+        if self.cache and "_parse_error" not in structured_data:
+            self.cache.put(pdf_sha256, text_sha256, structured_data, raw_text)
+        
+        yield ("parsed", self._with_raw_text(structured_data, raw_text))
     
-    def parse_pdf(self, pdf_bytes: bytes) -> dict:
-        """Main entry point: PDF bytes -> Structured JSON"""
-        raw_text = self.extract_text_from_pdf(pdf_bytes)
+    def _extract_or_cached(
+        self,
+        pdf_source: PDFSource,
+        on_stage: Optional[Callable[[str], None]] = None
+    ) -> Tuple[Optional[dict], str, Optional[str], Optional[str]]:
+        """
+        Resolve a PDF against the parse cache, extracting its text on the way.
+        Returns (cached_content_or_None, raw_text, pdf_sha256, text_sha256).
+        """
+        with pdf_buffer(pdf_source) as pdf_data:
+            pdf_sha256 = hash_pdf_bytes(pdf_data) if self.cache else None
+            if self.cache:
+                cached = self.cache.get_by_pdf(pdf_sha256)
+                if cached:
+                    raw_text = cached["raw_text"]
+                    return self._with_raw_text(cached["content"], raw_text), raw_text, pdf_sha256, None
+            
+            if on_stage:
+                on_stage("extracting")
+            raw_text = extract_text(pdf_data)
         
         if not raw_text.strip():
             raise ValueError("Could not extract any text from PDF. The PDF may be image-based or corrupted.")
         
-        structured_data = self.parse_resume_to_json(raw_text)
+        text_sha256 = hash_text(raw_text) if self.cache else None
+        if self.cache:
+            # Same text from a different export of the PDF
+            cached = self.cache.get_by_text(text_sha256)
+            if cached:
+                self.cache.put(pdf_sha256, text_sha256, cached["content"], raw_text)
+                return self._with_raw_text(cached["content"], raw_text), raw_text, pdf_sha256, text_sha256
         
+        return None, raw_text, pdf_sha256, text_sha256
+    
+    @staticmethod
+    def _parse_error_structure(raw_text: str, error: json.JSONDecodeError) -> dict:
+        """Minimal valid structure returned when the model's JSON is unusable."""
+        return {
+            "basics": {"name": "Parse Error", "summary": raw_text[:500]},
+            "work_experience": [],
+            "education": [],
+            "skills": {},
+            "projects": [],
+            "certifications": [],
+            "meta": {"years_experience": 0, "core_archetype": "Individual Contributor"},
+            "_parse_error": str(error),
+            "_raw_response": error.doc[:2000]
+        }
+    
+    @staticmethod
+    def _with_raw_text(structured_data: dict, raw_text: str) -> dict:
         # Add the raw text for reference/debugging
         structured_data["_raw_text"] = raw_text
-        
         return structured_data
 
 
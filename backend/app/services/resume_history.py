@@ -0,0 +1,171 @@
+"""Delta-encoded version history of resume profiles (resume_versions)."""
+import os
+from typing import Any, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models import ResumeVersion
+from app.services.json_patch import apply_json_patch, apply_merge_patch
+
+RESUME_HISTORY_ENABLED = os.getenv("RESUME_HISTORY_ENABLED", "1") == "1"
+# Every Nth version (and any after a gap) stores the full document, the rest a delta from the one before
+RESUME_SNAPSHOT_INTERVAL = max(1, int(os.getenv("RESUME_SNAPSHOT_INTERVAL", "20")))
+
+
+def _escape(token) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def diff_documents(old: Any, new: Any, path: str = "") -> List[dict]:
+    """
+    JSON Patch operations that turn `old` into `new`. Objects are diffed
+    key by key; lists by trimming their common prefix and suffix and
+    replacing what's left, which keeps single-bullet edits to one operation.
+    """
+    if old == new and type(old) is type(new):
+        return []
+    if isinstance(old, dict) and isinstance(new, dict):
+        operations = []
+        for key in old:
+            if key not in new:
+                operations.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            if key not in old:
+                operations.append({"op": "add", "path": f"{path}/{_escape(key)}", "value": value})
+            else:
+                operations.extend(diff_documents(old[key], value, f"{path}/{_escape(key)}"))
+        return operations
+    if isinstance(old, list) and isinstance(new, list):
+        prefix = 0
+        while prefix < min(len(old), len(new)) and old[prefix] == new[prefix]:
+            prefix += 1
+        suffix = 0
+        while (
+            suffix < min(len(old), len(new)) - prefix
+            and old[len(old) - 1 - suffix] == new[len(new) - 1 - suffix]
+        ):
+            suffix += 1
+        old_middle = old[prefix:len(old) - suffix]
+        new_middle = new[prefix:len(new) - suffix]
+
+        operations = []
+        # Pair up changed items in place, then remove or insert the surplus
+        for offset, (before, after) in enumerate(zip(old_middle, new_middle)):
+            operations.extend(diff_documents(before, after, f"{path}/{prefix + offset}"))
+        paired = min(len(old_middle), len(new_middle))
+        for index in range(prefix + len(old_middle) - 1, prefix + paired - 1, -1):
+            operations.append({"op": "remove", "path": f"{path}/{index}"})
+        for offset, value in enumerate(new_middle[paired:]):
+            operations.append({"op": "add", "path": f"{path}/{prefix + paired + offset}", "value": value})
+        return operations
+    return [{"op": "replace", "path": path, "value": new}]
+
+
+def changed_sections(delta: Optional[dict], previous: Optional[dict], content: Optional[dict]) -> List[str]:
+    """Top-level keys a write touched, for listing history without content."""
+    if delta and "merge" in delta:
+        return sorted(delta["merge"])
+    if delta and "patch" in delta:
+        sections = set()
+        for operation in delta["patch"]:
+            for pointer in (operation["path"], operation.get("from")):
+                if pointer:
+                    sections.add(pointer[1:].split("/")[0].replace("~1", "/").replace("~0", "~"))
+        return sorted(sections)
+    keys = set(previous or {}) | set(content or {})
+    return sorted(key for key in keys if (previous or {}).get(key) != (content or {}).get(key))
+
+
+def record_version(
+    db: Session,
+    profile_id,
+    version_number: int,
+    content: dict,
+    previous: Optional[dict] = None,
+    delta: Optional[dict] = None,
+) -> Optional[ResumeVersion]:
+    """
+    Add the history row for a write that produced `version_number` (no
+    commit; it belongs to the caller's transaction). Pass the previous
+    content to have the delta computed, or the `delta` itself when the
+    write didn't read the document.
+    """
+    if not RESUME_HISTORY_ENABLED:
+        return None
+
+    if delta is None and previous is None:
+        snapshot = True  # A new profile, or a write with nothing to diff against
+    else:
+        latest, latest_snapshot = db.query(
+            func.max(ResumeVersion.version_number),
+            func.max(ResumeVersion.version_number).filter(ResumeVersion.is_snapshot.is_(True)),
+        ).filter(ResumeVersion.profile_id == profile_id).one()
+        if delta is None:
+            delta = {"patch": diff_documents(previous, content)}
+        snapshot = (
+            latest != version_number - 1  # Gap: deltas can't bridge it
+            or latest_snapshot is None
+            or version_number - latest_snapshot >= RESUME_SNAPSHOT_INTERVAL
+        )
+
+    row = ResumeVersion(
+        profile_id=profile_id,
+        version_number=version_number,
+        is_snapshot=snapshot,
+        content=content if snapshot else None,
+        delta=None if snapshot else delta,
+        sections_modified=changed_sections(delta, previous, content),
+    )
+    db.add(row)
+    return row
+
+
+def list_versions(db: Session, profile_id) -> List[dict]:
+    """Version metadata, newest first; content and deltas are not loaded."""
+    rows = db.query(
+        ResumeVersion.version_number,
+        ResumeVersion.version_name,
+        ResumeVersion.is_snapshot,
+        ResumeVersion.sections_modified,
+        ResumeVersion.created_at,
+    ).filter(ResumeVersion.profile_id == profile_id).order_by(ResumeVersion.version_number.desc()).all()
+    return [
+        {
+            "version": row.version_number,
+            "name": row.version_name,
+            "snapshot": row.is_snapshot,
+            "sections_modified": row.sections_modified or [],
+            "created_at": row.created_at.isoformat() if row.created_at else None,
+        }
+        for row in rows
+    ]
+
+
+def reconstruct_version(db: Session, profile_id, version_number: int) -> Optional[dict]:
+    """
+    The profile content as of `version_number`, rebuilt from the nearest
+    snapshot at or before it. Returns None if that version isn't recorded.
+    """
+    snapshot_number = db.query(func.max(ResumeVersion.version_number)).filter(
+        ResumeVersion.profile_id == profile_id,
+        ResumeVersion.is_snapshot.is_(True),
+        ResumeVersion.version_number <= version_number,
+    ).scalar()
+    if snapshot_number is None:
+        return None
+
+    rows = db.query(ResumeVersion.version_number, ResumeVersion.content, ResumeVersion.delta).filter(
+        ResumeVersion.profile_id == profile_id,
+        ResumeVersion.version_number.between(snapshot_number, version_number),
+    ).order_by(ResumeVersion.version_number).all()
+    if not rows or rows[-1].version_number != version_number:
+        return None
+
+    content = rows[0].content
+    for row in rows[1:]:
+        if "merge" in row.delta:
+            content = apply_merge_patch(content, row.delta["merge"])
+        else:
+            content = apply_json_patch(content, row.delta["patch"])
+    return content
@@ -1,8 +1,139 @@
+from sqlalchemy import func, select, tuple_, update
 from sqlalchemy.orm import Session
-from app.models import ResumeProfile
+from sqlalchemy.orm.exc import StaleDataError
+from app.models import ResumeProfile, ResumeRawText
+from app.services.resume_history import list_versions, reconstruct_version, record_version
+from app.services.json_patch import (
+    InvalidPatch, apply_json_patch, apply_merge_patch, parse_pointer, sql_merge_patch,
+    sql_patch_operation, validate_patch
+)
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+import base64
+import copy
+import hashlib
 import json
+import re
 import uuid
 
+# Key in parser output that holds the extracted PDF text
+RAW_TEXT_KEY = "_raw_text"
+
+_FIELD_SEGMENT = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def parse_fields(fields: str) -> List[tuple]:
+    """
+    Parse a `fields=` projection like "basics,skills,meta.years_experience"
+    into JSON paths. Raises ValueError on malformed names.
+    """
+    paths = []
+    for field in fields.split(","):
+        field = field.strip()
+        if not field:
+            continue
+        path = tuple(field.split("."))
+        if not all(_FIELD_SEGMENT.match(segment) for segment in path):
+            raise ValueError(f"Invalid field: {field}")
+        if path not in paths:
+            paths.append(path)
+    if not paths:
+        raise ValueError("No fields requested")
+    return paths
+
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(created_at: datetime, profile_id: uuid.UUID) -> str:
+    """Opaque listing cursor: the (created_at, profile_id) of the last row served."""
+    raw = json.dumps([created_at.isoformat(), str(profile_id)])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, profile_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), uuid.UUID(profile_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+# Attempts at a server-side patch that lost a race with another writer
+PATCH_ATTEMPTS = 3
+
+
+class ProfileVersionConflict(Exception):
+    """The profile was changed by someone else since the version the client read."""
+
+    def __init__(self, current_version: int):
+        super().__init__(f"Profile has changed (current version {current_version})")
+        self.current_version = current_version
+
+
+def _invalidate_edited_critiques(operations: List[dict]) -> List[dict]:
+    """
+    Follow every write to an accomplishment's raw_text with clearing its
+    critique, so patched bullets are picked up by critique_stale_bullets.
+    """
+    result = []
+    for operation in operations:
+        result.append(operation)
+        tokens = parse_pointer(operation["path"])
+        if (
+            operation["op"] in ("add", "replace", "move", "copy")
+            and len(tokens) == 5
+            and (tokens[0], tokens[2], tokens[4]) == ("work_experience", "accomplishments", "raw_text")
+        ):
+            critique_path = "/" + "/".join(tokens[:4] + ["critique"])
+            result.append({"op": "add", "path": critique_path, "value": None})
+    return result
+
+
+def bullet_hash(text: str) -> str:
+    """Hash of a bullet's text, insensitive to whitespace-only edits."""
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()[:16]
+
+
+def iter_accomplishments(content: dict) -> Iterator[Tuple[str, dict]]:
+    """(path, accomplishment) for every dict accomplishment in a profile document."""
+    for i, job in enumerate((content or {}).get("work_experience") or []):
+        if not isinstance(job, dict):
+            continue
+        for j, accomplishment in enumerate(job.get("accomplishments") or []):
+            if isinstance(accomplishment, dict):
+                yield f"work_experience[{i}].accomplishments[{j}]", accomplishment
+
+
+def stamp_accomplishments(content: dict, previous: Optional[dict] = None) -> int:
+    """
+    Set `content_hash` on every accomplishment in `content` (in place) and
+    keep its `critique` only while it was made for the same text: critiques
+    are carried over from `previous` by hash, so reordering bullets or
+    omitting the critique field loses nothing, while an edited bullet gets
+    `critique: None` (stale). Returns the number of stale bullets.
+    """
+    known = {
+        accomplishment["content_hash"]: accomplishment["critique"]
+        for _, accomplishment in iter_accomplishments(previous)
+        if accomplishment.get("content_hash") and accomplishment.get("critique")
+    }
+
+    stale = 0
+    for _, accomplishment in iter_accomplishments(content):
+        text = accomplishment.get("raw_text")
+        content_hash = bullet_hash(text) if isinstance(text, str) and text.strip() else None
+        critique = None
+        if content_hash:
+            critique = known.get(content_hash)
+            if critique is None and accomplishment.get("content_hash") == content_hash:
+                critique = accomplishment.get("critique")
+            stale += critique is None
+        accomplishment["content_hash"] = content_hash
+        accomplishment["critique"] = critique
+    return stale
+
+
 class ResumeService:
     def __init__(self, db: Session):
         self.db = db
@@ -18,26 +149,377 @@ class ResumeService:
             }
         )
         self.db.add(profile)
+        self.db.flush()
+        record_version(self.db, profile.profile_id, profile.version, profile.content)
         self.db.commit()
         self.db.refresh(profile)
         return profile
 
-    def update_profile_content(self, profile_id: uuid.UUID, updates: dict):
+    def create_parsed_profile(self, parsed_content: dict, commit: bool = True) -> ResumeProfile:
+        """
+        Store the output of the PDF parser as a new profile.
+        With commit=False the row is only added to the session, so callers can
+        insert a batch in one transaction (the id is assigned up front).
+        The extracted text (`_raw_text`) is stored in its own table rather
+        than in the profile document.
+        """
+        content = dict(parsed_content)
+        raw_text = content.pop(RAW_TEXT_KEY, None)
+        if "work_experience" in content:
+            content["work_experience"] = copy.deepcopy(content["work_experience"])
+            stamp_accomplishments(content)
+        profile_name = content.get("basics", {}).get("name", "Unnamed Profile")
+
+        profile = ResumeProfile(
+            profile_id=uuid.uuid4(),
+            profile_name=profile_name,
+            content=content,
+            version=1
+        )
+        self.db.add(profile)
+        record_version(self.db, profile.profile_id, profile.version, content)
+        if raw_text is not None:
+            self.db.add(ResumeRawText(profile_id=profile.profile_id, raw_text=raw_text))
+        if not commit:
+            return profile
+        self.db.commit()
+        self.db.refresh(profile)
+        return profile
+
+    def update_profile_content(self, profile_id: uuid.UUID, updates: dict, expected_version: Optional[int] = None) -> dict:
+        """
+        Merge top-level keys into a profile. When work_experience changes,
+        only the accomplishments whose text changed lose their critique.
+        Returns {"profile_name", "version", "content"} as written.
+        Raises ProfileVersionConflict if `expected_version` is stale.
+        """
         profile = self.db.query(ResumeProfile).filter(ResumeProfile.profile_id == profile_id).first()
         if not profile:
             raise ValueError("Profile not found")
+        if expected_version is not None and profile.version != expected_version:
+            raise ProfileVersionConflict(profile.version)
         
-        current_content = dict(profile.content) if profile.content else {}
+        previous_content = profile.content or {}
+        current_content = dict(previous_content)
         
         # Merge top-level keys
         for key, value in updates.items():
+            if key == RAW_TEXT_KEY:
+                continue  # Lives in resume_raw_texts, not the document
             current_content[key] = value
         
+        if "work_experience" in updates:
+            current_content["work_experience"] = copy.deepcopy(current_content["work_experience"])
+            stamp_accomplishments(current_content, previous=previous_content)
+        
         profile.content = current_content
+        return self._commit_versioned(profile, previous_content)
+
+    def _commit_versioned(self, profile: ResumeProfile, previous_content: dict) -> dict:
+        """
+        Commit an ORM content write together with its history entry. The
+        UPDATE only matches the version the profile was read at. Returns
+        {"profile_name", "version", "content"} as written.
+        """
+        version_before = profile.version
+        try:
+            self.db.flush()
+            if profile.version != version_before:  # Unchanged content writes nothing
+                record_version(self.db, profile.profile_id, profile.version, profile.content, previous=previous_content)
+            result = {"profile_name": profile.profile_name, "version": profile.version, "content": profile.content}
+            self.db.commit()
+            return result
+        except StaleDataError:
+            self.db.rollback()
+            current = self.db.query(ResumeProfile.version).filter(
+                ResumeProfile.profile_id == profile.profile_id
+            ).scalar()
+            if current is None:
+                raise ValueError("Profile not found")
+            raise ProfileVersionConflict(current)
+
+    def patch_profile_content(
+        self,
+        profile_id: uuid.UUID,
+        operations: Optional[List[dict]] = None,
+        merge: Optional[dict] = None,
+        expected_version: Optional[int] = None,
+    ) -> dict:
+        """
+        Apply an RFC 6902 JSON Patch (`operations`) or an RFC 7386 merge
+        patch (`merge`) to a profile's content. On Postgres this is one
+        UPDATE ... RETURNING that never loads the document; elsewhere the
+        patch is applied in Python under the same version check.
+
+        Returns {"profile_name", "version", "content"}. Raises ValueError if
+        the profile doesn't exist, InvalidPatch if the patch can't be
+        applied and ProfileVersionConflict if `expected_version` is stale.
+        """
+        if (operations is None) == (merge is None):
+            raise InvalidPatch("Provide either a JSON Patch or a merge patch")
+        if operations is not None:
+            operations = _invalidate_edited_critiques(validate_patch(operations))
+        elif not isinstance(merge, dict):
+            raise InvalidPatch("A merge patch must be an object")
+        elif RAW_TEXT_KEY in merge:
+            raise InvalidPatch(f"{RAW_TEXT_KEY} cannot be patched")
+        if operations and any(parse_pointer(op["path"])[:1] == [RAW_TEXT_KEY] for op in operations):
+            raise InvalidPatch(f"{RAW_TEXT_KEY} cannot be patched")
+
+        def patched(content):
+            if operations is not None:
+                return apply_json_patch(content, operations)
+            return apply_merge_patch(content, merge)
+
+        if self.db.get_bind().dialect.name != "postgresql":
+            profile = self.db.query(ResumeProfile).filter(ResumeProfile.profile_id == profile_id).first()
+            if not profile:
+                raise ValueError("Profile not found")
+            if expected_version is not None and profile.version != expected_version:
+                raise ProfileVersionConflict(profile.version)
+            previous_content = profile.content or {}
+            profile.content = patched(previous_content)
+            return self._commit_versioned(profile, previous_content)
+
+        for _ in range(PATCH_ATTEMPTS):
+            row = self.db.execute(self._patch_statement(profile_id, operations, merge, expected_version)).first()
+            if row is not None:
+                # The operations are exactly the delta from the previous version
+                record_version(
+                    self.db, profile_id, row.version, row.content,
+                    delta={"patch": operations} if operations is not None else {"merge": merge},
+                )
+                self.db.commit()
+                return {"profile_name": row.profile_name, "version": row.version, "content": row.content}
+            self.db.rollback()
+
+            # Nothing updated: find out why (only failures pay for this read)
+            current = self.db.execute(
+                select(ResumeProfile.version, ResumeProfile.content).where(ResumeProfile.profile_id == profile_id)
+            ).first()
+            if current is None:
+                raise ValueError("Profile not found")
+            if expected_version is not None and current.version != expected_version:
+                raise ProfileVersionConflict(current.version)
+            patched(current.content or {})  # Raises InvalidPatch with the failing operation
+            # The patch applies to the current document: another write landed in between
+        raise ProfileVersionConflict(current.version)
+
+    def _patch_statement(self, profile_id, operations, merge, expected_version):
+        """
+        WITH patch_0 AS (SELECT content, version ...), patch_1 AS (... one
+        operation ...), ... UPDATE resume_profiles SET content = patch_N.doc
+        WHERE version is unchanged and every operation succeeded.
+        """
+        table = ResumeProfile.__table__
+        step = select(table.c.content.label("doc"), table.c.version.label("version")).where(
+            table.c.profile_id == profile_id
+        )
+        if expected_version is not None:
+            step = step.where(table.c.version == expected_version)
+        step = step.cte("patch_0")
+        if operations is not None:
+            for index, operation in enumerate(operations, 1):
+                step = select(sql_patch_operation(step.c.doc, operation).label("doc"), step.c.version).cte(f"patch_{index}")
+        else:
+            step = select(sql_merge_patch(step.c.doc, merge).label("doc"), step.c.version).cte("patch_1")
+
+        return update(table).where(
+            table.c.profile_id == profile_id,
+            table.c.version == step.c.version,
+            step.c.doc.isnot(None),
+        ).values(
+            content=step.c.doc,
+            version=table.c.version + 1,
+            updated_at=func.now(),
+        ).returning(table.c.profile_name, table.c.version, table.c.content)
+
+    def list_profiles(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        owner_id: Optional[uuid.UUID] = None,
+    ) -> Tuple[list, Optional[str]]:
+        """
+        One page of active profiles, newest first, as (rows, next_cursor).
+        Rows carry only profile_id, profile_name and created_at; the page
+        continues after `cursor` by (created_at, profile_id), so every page
+        is an index range scan. next_cursor is None on the last page.
+        """
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+        query = self.db.query(
+            ResumeProfile.profile_id, ResumeProfile.profile_name, ResumeProfile.created_at
+        ).filter(ResumeProfile.is_active.is_(True))
+        if owner_id is not None:
+            query = query.filter(ResumeProfile.owner_id == owner_id)
+        if cursor is not None:
+            created_at, profile_id = decode_cursor(cursor)
+            query = query.filter(
+                tuple_(ResumeProfile.created_at, ResumeProfile.profile_id) < tuple_(created_at, profile_id)
+            )
+        rows = query.order_by(
+            ResumeProfile.created_at.desc(), ResumeProfile.profile_id.desc()
+        ).limit(limit + 1).all()
+
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1].created_at, rows[-1].profile_id)
+
+    def get_projected_content(self, profile_id: uuid.UUID, paths: List[tuple]) -> Optional[tuple]:
+        """
+        Fetch only the requested parts of a profile's content, extracted in
+        the database (JSON path operators) so the rest of the document is
+        never loaded. Returns (profile_name, content, version) or None if not
+        found; missing fields are left out.
+        """
+        columns = [ResumeProfile.content[path] for path in paths]
+        row = self.db.query(ResumeProfile.profile_name, ResumeProfile.version, *columns).filter(
+            ResumeProfile.profile_id == profile_id
+        ).first()
+        if row is None:
+            return None
+
+        content = {}
+        for path, value in zip(paths, row[2:]):
+            if value is None:
+                continue
+            target = content
+            for segment in path[:-1]:
+                target = target.setdefault(segment, {})
+            target[path[-1]] = value
+        return row[0], content, row[1]
+
+    def critique_stale_bullets(
+        self,
+        profile_id: uuid.UUID,
+        guide,
+        domain: Optional[str] = None,
+        experience: Optional[int] = None,
+    ) -> dict:
+        """
+        Critique only the accomplishments without a current critique, using
+        `guide.critique_many` (GuideService), and store the results on them.
+        Returns {"results": [{path, text, result, error}], "unique_bullets",
+        "remaining_stale"}. Raises ValueError if the profile doesn't exist.
+        """
+        profile = self.db.query(ResumeProfile).filter(ResumeProfile.profile_id == profile_id).first()
+        if not profile:
+            raise ValueError("Profile not found")
+
+        content = copy.deepcopy(profile.content or {})
+        stamp_accomplishments(content)  # Profiles stored before bullets were hashed
+        pending = [
+            (path, accomplishment) for path, accomplishment in iter_accomplishments(content)
+            if accomplishment["content_hash"] and accomplishment["critique"] is None
+        ]
+        meta = content.get("meta") or {}
+        domain = domain or meta.get("primary_domain") or "General"
+        experience = experience if experience is not None else (meta.get("years_experience") or 5)
+
+        # Don't hold a transaction open across the LLM calls
         self.db.commit()
-        self.db.refresh(profile)
+
+        texts = list(dict.fromkeys(accomplishment["raw_text"] for _, accomplishment in pending))
+        outcomes = {}
+        for text, result, error in guide.critique_many(texts, domain=domain, experience=experience):
+            if result is not None:
+                result = {**result, "source": result.get("source", "llm")}
+            outcomes[bullet_hash(text)] = (result, error)
+
+        # Re-read under a row lock: the profile may have been edited meanwhile,
+        # and results only apply to bullets whose text is still the same
+        profile = self.db.query(ResumeProfile).filter(
+            ResumeProfile.profile_id == profile_id
+        ).with_for_update().first()
+        if not profile:
+            raise ValueError("Profile not found")
+        content = copy.deepcopy(profile.content or {})
+        stamp_accomplishments(content)
+
+        results = []
+        for path, accomplishment in iter_accomplishments(content):
+            outcome = outcomes.get(accomplishment["content_hash"])
+            if outcome is None or accomplishment["critique"] is not None:
+                continue
+            result, error = outcome
+            accomplishment["critique"] = result
+            results.append({"path": path, "text": accomplishment["raw_text"], "result": result, "error": error})
+
+        if content != profile.content:
+            previous_content = profile.content
+            profile.content = content
+            self._commit_versioned(profile, previous_content)
+        else:
+            self.db.commit()
+        return {
+            "results": results,
+            "unique_bullets": len(texts),
+            "remaining_stale": sum(
+                1 for _, accomplishment in iter_accomplishments(content)
+                if accomplishment["content_hash"] and accomplishment["critique"] is None
+            ),
+        }
+
+    def list_versions(self, profile_id: uuid.UUID) -> List[dict]:
+        """A profile's history, newest first, without loading any content."""
+        return list_versions(self.db, profile_id)
+
+    def get_version(self, profile_id: uuid.UUID, version_number: int) -> Optional[dict]:
+        """A profile's content as of `version_number`, or None if not recorded."""
+        return reconstruct_version(self.db, profile_id, version_number)
+
+    def restore_version(
+        self, profile_id: uuid.UUID, version_number: int, expected_version: Optional[int] = None
+    ) -> ResumeProfile:
+        """
+        Make an earlier version's content current again; this is a new
+        version, so the restore itself can be undone.
+        """
+        profile = self.db.query(ResumeProfile).filter(ResumeProfile.profile_id == profile_id).first()
+        if not profile:
+            raise ValueError("Profile not found")
+        if expected_version is not None and profile.version != expected_version:
+            raise ProfileVersionConflict(profile.version)
+        content = self.get_version(profile_id, version_number)
+        if content is None:
+            raise ValueError(f"Version {version_number} not found")
+
+        previous_content = profile.content
+        profile.content = content
+        self._commit_versioned(profile, previous_content)
         return profile
 
+    def get_raw_text(self, profile_id: uuid.UUID) -> Optional[str]:
+        row = self.db.query(ResumeRawText.raw_text).filter(
+            ResumeRawText.profile_id == profile_id
+        ).first()
+        return row.raw_text if row else None
+
+    def move_raw_text_out(self, batch_size: int = 200) -> int:
+        """
+        One-off migration: move `_raw_text` from existing profile documents
+        into resume_raw_texts. Returns the number of profiles migrated.
+        """
+        moved = 0
+        while True:
+            profiles = self.db.query(ResumeProfile).filter(
+                ResumeProfile.content[RAW_TEXT_KEY].as_string().isnot(None)
+            ).limit(batch_size).all()
+            if not profiles:
+                return moved
+
+            for profile in profiles:
+                content = dict(profile.content)
+                raw_text = content.pop(RAW_TEXT_KEY, None)
+                if raw_text is not None and self.db.get(ResumeRawText, profile.profile_id) is None:
+                    self.db.add(ResumeRawText(profile_id=profile.profile_id, raw_text=raw_text))
+                profile.content = content
+            self.db.commit()
+            moved += len(profiles)
+
     def ingest_pdf_text(self, profile_id: uuid.UUID, raw_text: str):
         """
         Stub for LLM parsing logic.
@@ -53,6 +535,7 @@ class ResumeService:
         current_content = dict(profile.content) if profile.content else {}
         current_content["raw_ingest"] = raw_text
         
+        previous_content = profile.content
         profile.content = current_content
-        self.db.commit()
+        self._commit_versioned(profile, previous_content)
         return profile
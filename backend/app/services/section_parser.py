@@ -0,0 +1,262 @@
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Normalized heading text -> top-level schema key
+SECTION_ALIASES = {
+    "summary": "basics",
+    "professional summary": "basics",
+    "profile": "basics",
+    "about": "basics",
+    "about me": "basics",
+    "objective": "basics",
+    "contact": "basics",
+    "experience": "work_experience",
+    "work experience": "work_experience",
+    "professional experience": "work_experience",
+    "relevant experience": "work_experience",
+    "employment": "work_experience",
+    "employment history": "work_experience",
+    "work history": "work_experience",
+    "career history": "work_experience",
+    "education": "education",
+    "academic background": "education",
+    "skills": "skills",
+    "technical skills": "skills",
+    "core competencies": "skills",
+    "technologies": "skills",
+    "skills and tools": "skills",
+    "certifications": "certifications",
+    "licenses and certifications": "certifications",
+    "certificates": "certifications",
+    "publications": "publications",
+    "selected publications": "publications",
+    "papers": "publications",
+    "awards": "awards",
+    "honors": "awards",
+    "honors and awards": "awards",
+    "awards and honors": "awards",
+    "achievements": "awards",
+    "patents": "patents",
+    "languages": "languages",
+    "volunteer": "volunteer",
+    "volunteering": "volunteer",
+    "volunteer experience": "volunteer",
+    "community involvement": "volunteer",
+    "leadership and volunteering": "volunteer",
+    "projects": "projects",
+    "personal projects": "projects",
+    "selected projects": "projects",
+}
+
+# Sections parsed together in one completion. Work experience is usually the
+# bulk of the output, so it gets a request to itself.
+SECTION_GROUPS: Tuple[Tuple[str, ...], ...] = (
+    ("basics", "skills", "languages", "certifications"),
+    ("work_experience", "meta"),
+    ("education", "awards", "volunteer"),
+    ("publications", "patents", "projects"),
+)
+
+MAX_HEADING_LENGTH = 40
+
+SECTION_USER_PROMPT_TEMPLATE = """Parse this excerpt of a resume and extract ALL information for the sections in the JSON structure.
+Do not skip any entries or bullet points.
+
+---RESUME EXCERPT START---
+{raw_text}
+---RESUME EXCERPT END---
+
+Return ONLY the JSON object for these sections."""
+
+SECTION_PROMPT_SCOPE = """
+
+SCOPE: The text is an excerpt of a larger resume. Return only the keys in the structure above; other sections are parsed separately."""
+
+_HEADING_PUNCTUATION = re.compile(r"[:\-–—|•*#_=]+")
+_WHITESPACE = re.compile(r"\s+")
+
+_MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "sept": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+_DATE_POINT = re.compile(
+    r"(?P<present>present|current|now|today)"
+    r"|(?P<num_month>\d{1,2})\s*/\s*(?P<num_year>(?:19|20)\d{2})"
+    r"|(?:(?P<month>[a-z]{3,9})\.?,?\s+)?(?P<year>(?:19|20)\d{2})",
+    re.IGNORECASE,
+)
+
+
+def detect_heading(line: str) -> Optional[str]:
+    """Return the schema key a heading line introduces, or None for body text."""
+    stripped = line.strip()
+    if not stripped or len(stripped) > MAX_HEADING_LENGTH:
+        return None
+    normalized = _HEADING_PUNCTUATION.sub(" ", stripped.lower()).replace("&", " and ")
+    normalized = _WHITESPACE.sub(" ", normalized).strip()
+    return SECTION_ALIASES.get(normalized)
+
+
+def split_sections(raw_text: str) -> Dict[str, str]:
+    """
+    Split resume text on recognized headings. Text before the first heading
+    (name, contact details) belongs to basics. Repeated headings are appended.
+    """
+    buckets: Dict[str, List[str]] = {"basics": []}
+    current = "basics"
+    for line in raw_text.split("\n"):
+        key = detect_heading(line)
+        if key:
+            current = key
+            buckets.setdefault(current, [])
+        buckets[current].append(line)
+    return {
+        key: "\n".join(lines).strip()
+        for key, lines in buckets.items()
+        if any(line.strip() for line in lines)
+    }
+
+
+def group_sections(sections: Dict[str, str]) -> List[Tuple[Tuple[str, ...], str]]:
+    """Pair each non-empty section group with the text it should be parsed from."""
+    groups = []
+    for keys in SECTION_GROUPS:
+        texts = [sections[key] for key in keys if key in sections]
+        if texts:
+            groups.append((keys, "\n\n".join(texts)))
+    return groups
+
+
+def _month_index(match, is_end: bool, today: date) -> Optional[int]:
+    if match.group("present"):
+        return today.year * 12 + today.month - 1
+    if match.group("num_year"):
+        month = int(match.group("num_month"))
+        if not 1 <= month <= 12:
+            return None
+        return int(match.group("num_year")) * 12 + month - 1
+
+    year = int(match.group("year"))
+    month_name = (match.group("month") or "").lower()
+    month = _MONTHS.get(month_name[:4]) or _MONTHS.get(month_name[:3])
+    if month is None:
+        # Year only: count the whole year
+        month = 12 if is_end else 1
+    return year * 12 + month - 1
+
+
+def parse_date_range(dates: str, today: Optional[date] = None) -> Optional[Tuple[int, int]]:
+    """
+    Parse strings like "Jan 2020 - Present" or "03/2018 – 2019" into a
+    half-open [start, end) interval of absolute month indexes.
+    """
+    if not dates:
+        return None
+    today = today or date.today()
+    points = list(_DATE_POINT.finditer(dates))
+    if len(points) < 2:
+        return None
+
+    start = _month_index(points[0], is_end=False, today=today)
+    end = _month_index(points[1], is_end=True, today=today)
+    if start is None or end is None or end < start:
+        return None
+    return start, end + 1
+
+
+def compute_years_experience(work_experience: list, today: Optional[date] = None) -> int:
+    """Total years across roles, counting overlapping roles once."""
+    intervals = sorted(
+        interval for interval in (
+            parse_date_range(role.get("dates") or "", today)
+            for role in work_experience or [] if isinstance(role, dict)
+        )
+        if interval
+    )
+
+    months = 0
+    current_start, current_end = None, None
+    for start, end in intervals:
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                months += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        months += current_end - current_start
+
+    return int(round(months / 12))
+
+
+class SectionedResumeParser:
+    """
+    Parses a resume as several smaller concurrent completions, one per
+    section group, then merges them into the full schema.
+    """
+
+    def __init__(
+        self,
+        complete: Callable[[str, str, int], dict],
+        schema: dict,
+        preamble: str,
+        rules: str,
+        max_tokens: int = 4096,
+    ):
+        self.complete = complete
+        self.schema = schema
+        self.preamble = preamble
+        self.rules = rules
+        self.max_tokens = max_tokens
+
+    def parse(self, raw_text: str) -> Optional[dict]:
+        """
+        Returns the merged document, or None when too few headings were found
+        for splitting to help (the caller should fall back to a single request).
+        Raises json.JSONDecodeError if any group returns invalid JSON.
+        """
+        groups = group_sections(split_sections(raw_text))
+        if len(groups) < 2:
+            return None
+
+        with ThreadPoolExecutor(max_workers=len(groups), thread_name_prefix="resume-section") as pool:
+            futures = [
+                (keys, pool.submit(self._parse_group, keys, text))
+                for keys, text in groups
+            ]
+            results = [(keys, future.result()) for keys, future in futures]
+
+        return self.merge(results)
+
+    def merge(self, results: List[Tuple[Tuple[str, ...], dict]]) -> dict:
+        merged = {
+            key: [] if isinstance(example, list) else {}
+            for key, example in self.schema.items()
+        }
+        for keys, result in results:
+            for key in keys:
+                if key in result and result[key] is not None:
+                    merged[key] = result[key]
+
+        meta = merged.get("meta") or {}
+        merged["meta"] = {
+            "years_experience": compute_years_experience(merged.get("work_experience")),
+            "core_archetype": meta.get("core_archetype") or "Individual Contributor",
+            "primary_domain": meta.get("primary_domain"),
+        }
+        return merged
+
+    def _parse_group(self, keys: Tuple[str, ...], text: str) -> dict:
+        group_schema = {key: self.schema[key] for key in keys if key in self.schema}
+
+        system_prompt = (
+            self.preamble
+            + json.dumps(group_schema, indent=2)
+            + self.rules
+            + SECTION_PROMPT_SCOPE
+        )
+        user_prompt = SECTION_USER_PROMPT_TEMPLATE.format(raw_text=text)
+        return self.complete(system_prompt, user_prompt, self.max_tokens)
@@ -0,0 +1,206 @@
+"""Skill lookups over jobs.normalized_skills, in the database and in an in-memory index."""
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.skill_names import normalize_skills
+
+# Answer skill lookups from the in-memory index (0: query jobs.normalized_skills each time)
+SKILL_INDEX_CACHE = os.getenv("SKILL_INDEX_CACHE", "1") == "1"
+SKILL_INDEX_TTL_SECONDS = float(os.getenv("SKILL_INDEX_TTL_SECONDS", "300"))
+
+
+def profile_skills(content: Optional[dict]) -> set:
+    """
+    Canonical skills from a profile: its `skills` section (categorized or a
+    flat list) plus the tags on work experience accomplishments.
+    """
+    content = content or {}
+    skills = content.get("skills") or {}
+    groups = list(skills.values()) if isinstance(skills, dict) else [skills]
+    for job in content.get("work_experience") or []:
+        for accomplishment in (job.get("accomplishments") or []) if isinstance(job, dict) else []:
+            if isinstance(accomplishment, dict):
+                groups.append(accomplishment.get("tags"))
+    found = set()
+    for group in groups:
+        found.update(normalize_skills(group))
+    return found
+
+
+class SkillIndex:
+    """
+    In-memory inverted index: canonical skill -> sorted array of job rows.
+    Near-duplicate postings are left out; their canonical job stands in.
+
+    Rows index `job_ids`. "all" intersects posting lists shortest first;
+    "any" merges them; `rank` orders jobs by how many of the skills they
+    require. Rebuilt from the database when older than the TTL or after
+    `invalidate()`.
+    """
+
+    def __init__(self, ttl_seconds: float = SKILL_INDEX_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        # (job_ids, postings), swapped as one so readers never mix two builds
+        self._snapshot = ([], {})
+        self.built_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def job_ids(self) -> List:
+        return self._snapshot[0]
+
+    @property
+    def postings(self) -> Dict[str, np.ndarray]:
+        return self._snapshot[1]
+
+    def build(self, jobs: Iterable):
+        """Index (job_id, skills) pairs; the skills are normalized here."""
+        job_ids, rows_by_skill = [], {}
+        for job_id, skills in jobs:
+            row = len(job_ids)
+            job_ids.append(job_id)
+            for skill in normalize_skills(skills):
+                rows_by_skill.setdefault(skill, []).append(row)
+        self._snapshot = (job_ids, {skill: np.array(rows, dtype=np.int32) for skill, rows in rows_by_skill.items()})
+        self.built_at = time.monotonic()
+
+    def load(self, db):
+        from app.models import Job
+
+        rows = db.query(Job.job_id, Job.normalized_skills, Job.required_skills).filter(
+            Job.duplicate_of.is_(None)  # One job per near-duplicate cluster
+        ).execution_options(yield_per=5000)
+        self.build(
+            (row.job_id, row.normalized_skills if row.normalized_skills is not None else row.required_skills)
+            for row in rows
+        )
+
+    def is_stale(self) -> bool:
+        return self.built_at is None or time.monotonic() - self.built_at > self.ttl_seconds
+
+    def refresh(self, db):
+        """Rebuild from `db` if stale (one caller rebuilds, the rest wait for it)."""
+        if self.is_stale():
+            with self._lock:
+                if self.is_stale():
+                    self.load(db)
+
+    def invalidate(self):
+        self.built_at = None
+
+    @staticmethod
+    def _posting_lists(postings: Dict[str, np.ndarray], skills: Iterable[str]) -> List[np.ndarray]:
+        empty = np.zeros(0, dtype=np.int32)
+        return [postings.get(skill, empty) for skill in normalize_skills(list(skills))]
+
+    def match(self, skills: Iterable[str], match: str = "any") -> List:
+        """Ids of jobs requiring any (or all) of `skills`, in index order."""
+        job_ids, postings = self._snapshot
+        lists = self._posting_lists(postings, skills)
+        if not lists:
+            return []
+        if match == "all":
+            lists.sort(key=len)
+            rows = lists[0]
+            for posting in lists[1:]:
+                if not len(rows):
+                    break
+                rows = np.intersect1d(rows, posting, assume_unique=True)
+        else:
+            rows = np.unique(np.concatenate(lists))
+        return [job_ids[row] for row in rows]
+
+    def rank(self, skills: Iterable[str], limit: Optional[int] = None) -> List[tuple]:
+        """(job_id, matched skill count) for jobs requiring any of `skills`, best first."""
+        job_ids, postings = self._snapshot
+        lists = self._posting_lists(postings, skills)
+        if not lists:
+            return []
+        counts = np.bincount(np.concatenate(lists), minlength=len(job_ids))
+        rows = np.flatnonzero(counts)
+        order = rows[np.argsort(-counts[rows], kind="stable")]
+        if limit is not None:
+            order = order[:limit]
+        return [(job_ids[row], int(counts[row])) for row in order]
+
+    def stats(self) -> dict:
+        job_ids, postings = self._snapshot
+        return {
+            "jobs": len(job_ids),
+            "skills": len(postings),
+            "postings": int(sum(len(rows) for rows in postings.values())),
+            "age_seconds": round(time.monotonic() - self.built_at, 1) if self.built_at else None,
+        }
+
+
+def jobs_with_skills_clause(skills: Iterable[str], match: str = "any"):
+    """
+    WHERE clause over jobs.normalized_skills for Postgres: `?|` (any) or
+    `?&` (all) against a text[] of canonical skills, served by the GIN index.
+    """
+    from sqlalchemy import Text, literal
+    from sqlalchemy.dialects.postgresql import ARRAY
+    from app.models import Job
+
+    operator = "?&" if match == "all" else "?|"
+    return Job.normalized_skills.op(operator)(literal(normalize_skills(list(skills)), ARRAY(Text)))
+
+
+def find_jobs(db, skills: Iterable[str], match: str = "any") -> List:
+    """
+    Ids of jobs requiring any (or all) of `skills`: from the in-memory index,
+    or with SKILL_INDEX_CACHE=0 from a GIN-indexed query on Postgres.
+    """
+    if SKILL_INDEX_CACHE or db.get_bind().dialect.name != "postgresql":
+        index = get_skill_index() if SKILL_INDEX_CACHE else SkillIndex()
+        index.refresh(db)
+        return index.match(skills, match)
+
+    from app.models import Job
+    if not normalize_skills(list(skills)):
+        return []
+    query = db.query(Job.job_id).filter(jobs_with_skills_clause(skills, match), Job.duplicate_of.is_(None))
+    return [row.job_id for row in query]
+
+
+def backfill_normalized_skills(db, batch_size: int = 1000) -> int:
+    """Recompute jobs.normalized_skills (e.g. after the aliases change). Returns rows changed."""
+    from sqlalchemy import bindparam, update
+    from app.models import Job
+
+    table = Job.__table__
+    statement = update(table).where(table.c.job_id == bindparam("job")).values(
+        normalized_skills=bindparam("skills")
+    )
+    changed, last_id = 0, None
+    while True:
+        query = db.query(Job.job_id, Job.required_skills, Job.normalized_skills).order_by(Job.job_id)
+        if last_id is not None:
+            query = query.filter(Job.job_id > last_id)
+        rows = query.limit(batch_size).all()
+        if not rows:
+            return changed
+        updates = [
+            {"job": row.job_id, "skills": normalize_skills(row.required_skills)}
+            for row in rows if row.normalized_skills != normalize_skills(row.required_skills)
+        ]
+        if updates:
+            db.execute(statement, updates)
+            db.commit()
+            changed += len(updates)
+        last_id = rows[-1].job_id
+
+
+# Singleton
+_index_instance: Optional[SkillIndex] = None
+
+def get_skill_index() -> SkillIndex:
+    """Get or create the shared skill index (built on first refresh)."""
+    global _index_instance
+    if _index_instance is None:
+        _index_instance = SkillIndex()
+    return _index_instance
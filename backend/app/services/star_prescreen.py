@@ -0,0 +1,167 @@
+import re
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+STAR_COMPONENTS = ("Situation", "Task", "Action", "Result")
+
+# Strong openers, matched on a bullet's first word (lower-cased, stripped of punctuation)
+ACTION_VERBS = frozenset("""
+accelerated achieved architected automated built championed consolidated created cut decreased
+delivered deployed designed developed directed doubled drove eliminated engineered established
+expanded founded generated grew halved implemented improved increased initiated introduced
+launched led managed mentored migrated modernized negotiated optimized orchestrated overhauled
+pioneered planned produced rebuilt reduced redesigned refactored replaced resolved restructured
+revamped saved scaled secured shipped simplified spearheaded standardized streamlined tripled
+unified upgraded wrote
+""".split())
+
+_WEAK_OPENER = re.compile(
+    r"^\s*(responsible for|helped|assisted|worked on|involved in|participated in|duties included|tasked with)\b",
+    re.IGNORECASE,
+)
+_QUANTITY = re.compile(
+    r"(\d+(\.\d+)?\s*(%|x\b|k\b|m\b|mm\b|bn\b|b\b)|[$€£]\s*\d|\b\d{2,}\b|\b\d+\s*(percent|hours|days|weeks|ms)\b)",
+    re.IGNORECASE,
+)
+_RESULT_PHRASE = re.compile(
+    r"\b(result(ing|ed)? in|leading to|which (cut|reduced|increased|improved|saved)|saving|reducing|"
+    r"increasing|improving|cutting|boosting|by \d+|from .{1,20} to )\b",
+    re.IGNORECASE,
+)
+_SCOPE = re.compile(
+    r"\b(team of \d+|\d+\s*(engineers|people|reports|users|customers|clients|services|countries|regions)|"
+    r"company-wide|org-wide|across (the )?(company|org|teams?)|million|billion|enterprise|global)\b",
+    re.IGNORECASE,
+)
+_CONTEXT = re.compile(
+    r"\b(when|during|after|amid|following|in response to|to address|to support|to enable|to reduce|to improve|"
+    r"facing|despite)\b",
+    re.IGNORECASE,
+)
+_VAGUE = re.compile(r"\b(various|etc|many|several|things|stuff|numerous|multiple|some|different)\b", re.IGNORECASE)
+
+FEATURES = ("action_verb", "weak_opener", "quantified", "result_phrase", "scope", "context", "vague", "short", "long")
+
+# Per-component weights over FEATURES (plus bias); a component's evidence score is
+# features @ weights + bias. Scores above DECIDE_PRESENT mean present, below
+# DECIDE_MISSING mean missing, anything in between is left to the LLM.
+_WEIGHTS = np.array([
+    # action weak   quant  result scope  context vague  short  long
+    [0.2,   0.0,   0.0,   0.0,   0.6,   1.6,   -0.4,  -0.6,  0.3],   # Situation
+    [0.3,   0.2,   0.0,   0.0,   0.8,   1.0,   -0.4,  -0.6,  0.3],   # Task
+    [1.8,   -1.6,  0.1,   0.1,   0.1,   0.0,   -0.6,  -0.4,  0.2],   # Action
+    [0.0,   -0.3,  1.5,   1.1,   0.2,   0.0,   -0.6,  -0.4,  0.1],   # Result
+])
+_BIAS = np.array([-0.9, -0.8, -0.2, -0.5])
+DECIDE_PRESENT = 0.8
+DECIDE_MISSING = -0.3
+
+FOLLOW_UP_QUESTIONS = {
+    "Result": "What measurable outcome did this have (time saved, revenue, latency, error rate, users)?",
+    "Action": "What exactly did you do yourself here - which decisions, tools or changes were yours?",
+    "Situation": "What was the context or problem that made this work necessary?",
+    "Task": "What were you specifically asked or responsible to achieve, and at what scale?",
+}
+
+
+def _first_word(text: str) -> str:
+    words = text.split()
+    return words[0].strip(".,;:-•*").lower() if words else ""
+
+
+def _opens_with_action(text: str) -> bool:
+    """Leads with a strong verb, directly or after an opening clause ("To cut churn, led ...")."""
+    if _first_word(text) in ACTION_VERBS:
+        return True
+    _, comma, rest = text.partition(",")
+    return bool(comma) and _first_word(rest) in ACTION_VERBS
+
+
+def featurize(texts: List[str]) -> np.ndarray:
+    """Binary feature matrix (len(texts) x len(FEATURES)) for a batch of bullets."""
+    matrix = np.zeros((len(texts), len(FEATURES)), dtype=np.float32)
+    for row, text in enumerate(texts):
+        words = text.split()
+        matrix[row] = (
+            _opens_with_action(text),
+            bool(_WEAK_OPENER.search(text)),
+            bool(_QUANTITY.search(text)),
+            bool(_RESULT_PHRASE.search(text)),
+            bool(_SCOPE.search(text)),
+            bool(_CONTEXT.search(text)),
+            bool(_VAGUE.search(text)),
+            len(words) < 6,
+            len(words) > 18,
+        )
+    return matrix
+
+
+class StarPrescreen:
+    """
+    Rule-based STAR screen run before the LLM.
+
+    Scores all bullets at once (one matrix product over regex features) and
+    decides the ones whose every component is clearly present or clearly
+    missing; only the rest are escalated to the model.
+    """
+
+    def __init__(self):
+        self.screened = 0
+        self.decided = 0
+        self._lock = threading.Lock()
+
+    def screen(self, texts: List[str]) -> List[Optional[dict]]:
+        """
+        Returns, per bullet, a critique dict (same shape as the LLM's) when
+        confident, else None to escalate.
+        """
+        if not texts:
+            return []
+        scores = featurize(texts) @ _WEIGHTS.T + _BIAS
+        present = scores >= DECIDE_PRESENT
+        missing = scores <= DECIDE_MISSING
+        confident = (present | missing).all(axis=1)
+
+        results: List[Optional[dict]] = []
+        for row in range(len(texts)):
+            if not confident[row]:
+                results.append(None)
+                continue
+            gaps = [c for c, is_missing in zip(STAR_COMPONENTS, missing[row]) if is_missing]
+            results.append(self._critique(gaps))
+
+        with self._lock:
+            self.screened += len(texts)
+            self.decided += int(confident.sum())
+        return results
+
+    @staticmethod
+    def _critique(gaps: List[str]) -> dict:
+        if not gaps:
+            return {
+                "missing_components": [],
+                "critique": "Strong bullet: it names the context, your action and a measurable result.",
+                "question": "Is there a larger business outcome this contributed to?",
+                "source": "prescreen",
+            }
+        # Ask about the most valuable gap first
+        priority = sorted(gaps, key=("Result", "Action", "Situation", "Task").index)
+        return {
+            "missing_components": gaps,
+            "critique": f"This bullet does not state the {', '.join(g.lower() for g in priority)}.",
+            "question": FOLLOW_UP_QUESTIONS[priority[0]],
+            "source": "prescreen",
+        }
+
+    def stats(self) -> dict:
+        with self._lock:
+            screened, decided = self.screened, self.decided
+        escalated = screened - decided
+        return {
+            "screened": screened,
+            "decided_locally": decided,
+            "escalated": escalated,
+            "escalation_rate": round(escalated / screened, 4) if screened else 0.0,
+        }
@@ -0,0 +1,73 @@
+import json
+import os
+import re
+from functools import lru_cache
+from typing import List
+
+SKILL_ALIASES = {
+    "k8s": "kubernetes",
+    "kube": "kubernetes",
+    "golang": "go",
+    "py": "python",
+    "python3": "python",
+    "js": "javascript",
+    "ecmascript": "javascript",
+    "ts": "typescript",
+    "postgres": "postgresql",
+    "psql": "postgresql",
+    "pg": "postgresql",
+    "mongo": "mongodb",
+    "react.js": "react",
+    "reactjs": "react",
+    "vue.js": "vue",
+    "vuejs": "vue",
+    "next.js": "nextjs",
+    "node": "node.js",
+    "nodejs": "node.js",
+    "amazon web services": "aws",
+    "google cloud": "gcp",
+    "google cloud platform": "gcp",
+    "microsoft azure": "azure",
+    "c sharp": "c#",
+    "csharp": "c#",
+    "cpp": "c++",
+    "ml": "machine learning",
+    "dl": "deep learning",
+    "nlp": "natural language processing",
+    "llms": "llm",
+    "large language models": "llm",
+    "sklearn": "scikit-learn",
+    "scikit learn": "scikit-learn",
+    "tf": "tensorflow",
+    "gh actions": "github actions",
+    "cicd": "ci/cd",
+    "rest": "rest apis",
+    "restful apis": "rest apis",
+    "restful": "rest apis",
+    "elastic search": "elasticsearch",
+    "dynamo": "dynamodb",
+    "gql": "graphql",
+}
+
+_aliases_path = os.getenv("SKILL_ALIASES_PATH")
+if _aliases_path:
+    with open(_aliases_path) as f:
+        SKILL_ALIASES.update({key.lower(): value.lower() for key, value in json.load(f).items()})
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=65536)
+def normalize_skill(name) -> str:
+    """The canonical spelling of a skill ("K8s " -> "kubernetes")."""
+    key = _WHITESPACE.sub(" ", str(name)).strip().strip(",;").lower()
+    return SKILL_ALIASES.get(key, key)
+
+
+def normalize_skills(skills) -> List[str]:
+    """Canonical, de-duplicated skills from a JSON list (anything else gives [])."""
+    if not isinstance(skills, list):
+        return []
+    return sorted({
+        normalize_skill(skill) for skill in skills if isinstance(skill, str) and skill.strip()
+    })
@@ -0,0 +1,153 @@
+"""Application lifespan: optional schema creation, then timed warm-up behind /ready."""
+import asyncio
+import os
+import time
+from contextlib import AsyncExitStack, ExitStack, asynccontextmanager
+from typing import Callable, Dict, Optional
+
+import anyio
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool
+
+from app import database
+
+# Run create_all at startup (normally the schema is managed with database/schema.sql and the CLI)
+DB_CREATE_SCHEMA = os.getenv("DB_CREATE_SCHEMA", "0") == "1"
+
+# Build the PDF parser and guide service (LLM client, DSPy, extraction workers) before serving
+PRELOAD_SERVICES = os.getenv("PRELOAD_SERVICES", "0") == "1"
+
+# Connections opened in each pool at startup (capped at DB_POOL_SIZE)
+DB_WARM_CONNECTIONS = int(os.getenv("DB_WARM_CONNECTIONS", "1"))
+
+# Seconds before retrying failed warm-up phases, doubling up to the max (0 = don't retry)
+STARTUP_RETRY_SECONDS = float(os.getenv("STARTUP_RETRY_SECONDS", "5"))
+STARTUP_RETRY_MAX_SECONDS = float(os.getenv("STARTUP_RETRY_MAX_SECONDS", "300"))
+
+
+class StartupState:
+    """Per-phase timings and errors, and whether warm-up is done."""
+
+    def __init__(self):
+        self.phases: Dict[str, dict] = {}
+        self._calls: Dict[str, tuple] = {}
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.finished is not None and not any("error" in phase for phase in self.phases.values())
+
+    async def run_phase(self, name: str, fn: Callable, *args, raise_errors: bool = False):
+        """Time `fn` (a coroutine function or a blocking one, run in a thread)."""
+        self._calls[name] = (fn, args)
+        attempts = self.phases.get(name, {}).get("attempts", 0) + 1
+        start = time.perf_counter()
+        try:
+            if asyncio.iscoroutinefunction(fn):
+                await fn(*args)
+            else:
+                await anyio.to_thread.run_sync(fn, *args)
+        except Exception as e:
+            self.phases[name] = {"ms": _elapsed_ms(start), "error": f"{type(e).__name__}: {e}", "attempts": attempts}
+            if raise_errors:
+                raise
+        else:
+            self.phases[name] = {"ms": _elapsed_ms(start), "attempts": attempts}
+
+    def failed(self) -> list:
+        return [name for name, phase in self.phases.items() if "error" in phase]
+
+    async def retry_failed(self):
+        """Run every failed phase again, concurrently."""
+        runs = []
+        for name in self.failed():
+            fn, args = self._calls[name]
+            runs.append(self.run_phase(name, fn, *args))
+        await asyncio.gather(*runs)
+
+    def status(self) -> dict:
+        return {
+            "status": "ready" if self.ready else ("failed" if self.finished else "warming"),
+            "phases": dict(self.phases),
+            "total_ms": round(((self.finished or time.monotonic()) - self.started) * 1000, 1),
+        }
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+def _warm_count(pool) -> int:
+    size = pool.size() if isinstance(pool, QueuePool) else 1
+    return max(1, min(DB_WARM_CONNECTIONS, size))
+
+
+def create_schema():
+    from app import models  # noqa: F401  (registers the tables)
+    database.Base.metadata.create_all(bind=database.engine)
+
+
+def warm_sync_pool():
+    """Open (and pre-ping) pooled connections so requests find them idle."""
+    with ExitStack() as stack:  # Hold them all at once so each is a distinct connection
+        for _ in range(_warm_count(database.engine.pool)):
+            stack.enter_context(database.engine.connect()).execute(text("SELECT 1"))
+
+
+async def warm_async_pool():
+    async with AsyncExitStack() as stack:
+        for _ in range(_warm_count(database.async_engine.pool)):
+            connection = await stack.enter_async_context(database.async_engine.connect())
+            await connection.execute(text("SELECT 1"))
+
+
+def preload_pdf_parser():
+    from app.services.pdf_parser import get_pdf_parser, warm_extract_pool
+    get_pdf_parser()
+    warm_extract_pool()
+
+
+def preload_guide_service():
+    from app.services.guide_service import get_guide_service
+    get_guide_service()
+
+
+async def warm_up(state: StartupState, retry_seconds: float = 0):
+    """
+    Run the warm-up phases; then, with `retry_seconds`, keep retrying any
+    that failed (waiting twice as long each time) until all have passed.
+    """
+    phases = [state.run_phase("database", warm_sync_pool)]
+    if database.async_engine is not None:
+        phases.append(state.run_phase("database_async", warm_async_pool))
+    if PRELOAD_SERVICES:
+        phases.append(state.run_phase("pdf_parser", preload_pdf_parser))
+        phases.append(state.run_phase("guide_service", preload_guide_service))
+    await asyncio.gather(*phases)
+    state.finished = time.monotonic()
+
+    delay = retry_seconds
+    while delay > 0 and state.failed():
+        await asyncio.sleep(delay)
+        await state.retry_failed()
+        delay = min(delay * 2, max(STARTUP_RETRY_MAX_SECONDS, retry_seconds))
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """
+    Create the schema if asked (failures stop startup), then warm up in the
+    background: the app serves /health at once and /ready when warm.
+    """
+    state = app.state.startup = StartupState()
+    if DB_CREATE_SCHEMA:
+        await state.run_phase("schema", create_schema, raise_errors=True)
+    warming = asyncio.create_task(warm_up(state, STARTUP_RETRY_SECONDS))
+    try:
+        yield
+    finally:
+        warming.cancel()
+        database.engine.dispose()
+        if database.async_engine is not None:
+            await database.async_engine.dispose()
@@ -0,0 +1,156 @@
+import json
+import mmap
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Union
+
+# Upload limits (bytes)
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+MAX_BULK_UPLOAD_BYTES = int(os.getenv("MAX_BULK_UPLOAD_BYTES", str(512 * 1024 * 1024)))
+SPOOL_MEMORY_BYTES = int(os.getenv("UPLOAD_SPOOL_MEMORY_BYTES", str(1024 * 1024)))
+COPY_CHUNK_BYTES = 64 * 1024
+
+PDFSource = Union[bytes, BinaryIO]
+
+
+class UploadTooLarge(Exception):
+    """Raised when a request body goes over MAX_UPLOAD_BYTES."""
+
+
+class UploadSizeLimitMiddleware:
+    """
+    ASGI middleware that rejects oversized upload bodies with 413.
+
+    A declared Content-Length over the limit is refused before any of the body
+    is read; chunked or under-declared bodies are cut off as soon as the
+    running byte count passes the limit, instead of after the multipart parser
+    has spooled the whole thing.
+
+    `path_limits` maps path prefixes to their own limits (e.g. bulk zip
+    uploads); the longest matching prefix wins.
+    """
+
+    def __init__(self, app, max_bytes: int = None, path_prefixes=("/api/",), path_limits=None):
+        self.app = app
+        self.max_bytes = max_bytes or MAX_UPLOAD_BYTES
+        self.path_prefixes = tuple(path_prefixes)
+        self.path_limits = sorted((path_limits or {}).items(), key=lambda item: -len(item[0]))
+
+    def _limit_for(self, path: str) -> int:
+        for prefix, limit in self.path_limits:
+            if path.startswith(prefix):
+                return limit
+        return self.max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in ("POST", "PUT", "PATCH")
+            or not scope["path"].startswith(self.path_prefixes)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        max_bytes = self._limit_for(scope["path"])
+        for name, value in scope.get("headers", []):
+            if name == b"content-length" and value.isdigit() and int(value) > max_bytes:
+                await self._reject(send, max_bytes)
+                return
+
+        received = 0
+        exceeded = False
+        rejected = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    exceeded = True
+                    raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+            return message
+
+        async def guarded_send(message):
+            nonlocal rejected
+            if exceeded:
+                # Replace whatever error the framework made of UploadTooLarge
+                if not rejected and message["type"] == "http.response.start":
+                    rejected = True
+                    await self._reject(send, max_bytes)
+                return
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except UploadTooLarge:
+            if not rejected:
+                rejected = True
+                await self._reject(send, max_bytes)
+
+    async def _reject(self, send, max_bytes: int):
+        body = json.dumps({
+            "detail": f"Upload too large; the limit is {max_bytes} bytes"
+        }).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("ascii")),
+                (b"connection", b"close"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def spool_copy(source: BinaryIO, max_bytes: int = None) -> tempfile.SpooledTemporaryFile:
+    """
+    Copy an upload into a spool the caller owns (e.g. to outlive the request),
+    chunk by chunk so memory stays bounded. Raises UploadTooLarge.
+    """
+    max_bytes = max_bytes or MAX_UPLOAD_BYTES
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES)
+    source.seek(0)
+    copied = 0
+    while True:
+        chunk = source.read(COPY_CHUNK_BYTES)
+        if not chunk:
+            break
+        copied += len(chunk)
+        if copied > max_bytes:
+            spool.close()
+            raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+
+@contextmanager
+def pdf_buffer(source: PDFSource) -> Iterator[Union[bytes, mmap.mmap]]:
+    """
+    Zero-copy, read-only view of a PDF for hashing and pypdf.
+
+    Bytes pass through unchanged. File objects (including spooled uploads,
+    which are rolled over to disk first) are memory-mapped, so the PDF is
+    never materialized as a Python bytes object.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        yield source
+        return
+
+    if isinstance(source, tempfile.SpooledTemporaryFile):
+        source.rollover()
+    source.flush()
+
+    if os.fstat(source.fileno()).st_size == 0:
+        yield b""  # mmap refuses empty files
+        return
+
+    mapped = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        yield mapped
+    finally:
+        mapped.close()
+
@@ -0,0 +1,94 @@
+"""
+Wall time and peak memory of PDF text extraction vs. page count.
+
+Compares the original list-based extraction against the streaming serial
+path and the process-pool path. Run from backend/:
+
+    python -m benchmarks.bench_pdf_extraction [--pages 1 5 10 20 40 80] [--repeat 3]
+
+Peak memory is measured with tracemalloc in the calling process only, so the
+parallel column excludes what the pool workers allocate.
+"""
+import argparse
+import time
+import tracemalloc
+from io import BytesIO
+
+from pypdf import PdfReader
+
+from app.services import pdf_parser
+from benchmarks.pdf_fixtures import academic_cv_pages, build_text_pdf
+
+
+def legacy_extract(pdf_bytes: bytes) -> str:
+    reader = PdfReader(BytesIO(pdf_bytes))
+    text_parts = []
+    for i, page in enumerate(reader.pages):
+        text = page.extract_text()
+        if text:
+            text = text.strip()
+            if i > 0:
+                text_parts.append(f"\n--- Page {i + 1} ---\n")
+            text_parts.append(text)
+    cleaned_lines = []
+    for line in "\n".join(text_parts).split('\n'):
+        stripped = line.strip()
+        if stripped:
+            cleaned_lines.append(stripped)
+        elif cleaned_lines and cleaned_lines[-1]:
+            cleaned_lines.append('')
+    return '\n'.join(cleaned_lines)
+
+
+def measure(fn, pdf_bytes: bytes, repeat: int):
+    # Timed runs are untraced; tracemalloc slows pure-Python code several-fold
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(pdf_bytes)
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    result = fn(pdf_bytes)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 5, 10, 20, 40, 80])
+    parser.add_argument("--lines-per-page", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    variants = [
+        ("legacy", legacy_extract),
+        ("serial", lambda b: pdf_parser.extract_text(b, parallel=False)),
+        ("parallel", lambda b: pdf_parser.extract_text(b, parallel=True)),
+    ]
+
+    # Start the pool outside the timings; it lives for the whole server process
+    pdf_parser.extract_text(build_text_pdf(academic_cv_pages(2, 1)), parallel=True)
+
+    print(f"workers={pdf_parser.EXTRACT_WORKERS} lines/page={args.lines_per_page} repeat={args.repeat}")
+    header = f"{'pages':>5}  " + "  ".join(f"{name + ' ms':>12}  {name + ' KiB':>13}" for name, _ in variants)
+    print(header)
+    print("-" * len(header))
+
+    for page_count in args.pages:
+        pdf_bytes = build_text_pdf(academic_cv_pages(page_count, args.lines_per_page))
+        row = []
+        reference = None
+        for name, fn in variants:
+            seconds, peak, text = measure(fn, pdf_bytes, args.repeat)
+            if reference is None:
+                reference = text
+            elif text != reference:
+                raise SystemExit(f"{name} output differs from legacy at {page_count} pages")
+            row.append(f"{seconds * 1000:>12.1f}  {peak / 1024:>13.0f}")
+        print(f"{page_count:>5}  " + "  ".join(row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Closed-loop load generator for the resume and guide endpoints.
+
+Keeps --concurrency requests in flight for --duration seconds, picking
+endpoints by weight, and reports RPS, p50/p95/p99 latency and error rate
+per endpoint. Pair it with benchmarks.mock_openai to test without spending
+real quota. Run from backend/:
+
+    python -m benchmarks.loadgen --base-url http://127.0.0.1:8000 --concurrency 32 --duration 60 \\
+        --mix upload=1 critique=4 critique-batch=1 refine=1
+
+Inputs are made unique per request by default so the parse/guide caches and
+the STAR pre-screen don't hide the LLM path; pass --cacheable to repeat them.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.pdf_fixtures import build_text_pdf
+
+# Bullets the STAR pre-screen can't settle on its own, so they reach the model
+AMBIGUOUS_BULLETS = [
+    "Owned the billing service and its on-call rotation",
+    "Partnered with design to improve onboarding",
+    "Took over the search backend during the reorg",
+    "Ran the weekly incident review for the platform group",
+    "Handled vendor integrations to support the sales team",
+]
+
+
+def _pdf(sequence: int, unique: bool) -> bytes:
+    marker = f" (run {sequence})" if unique else ""
+    return build_text_pdf([[
+        f"Alex Loadtest{marker}",
+        "Senior Backend Engineer",
+        "Experience",
+        "Loadtest Labs - Senior Backend Engineer - 2021 - Present",
+        "- Reduced p99 latency by 42% by redesigning the caching layer",
+        "- Worked on various internal tools",
+        "Education",
+        "State University - BS Computer Science - 2017",
+        "Skills: Python, Go, PostgreSQL, Kubernetes",
+    ]])
+
+
+def _tag(sequence: int) -> str:
+    """Letters-only tag; digits would read as a metric to the pre-screen."""
+    letters = ""
+    while True:
+        sequence, digit = divmod(sequence, 26)
+        letters += chr(ord("a") + digit)
+        if not sequence:
+            return letters
+
+
+def _bullet(sequence: int, unique: bool) -> str:
+    bullet = AMBIGUOUS_BULLETS[sequence % len(AMBIGUOUS_BULLETS)]
+    return f"{bullet} (squad {_tag(sequence)})" if unique else bullet
+
+
+def _sse_ok(response: httpx.Response) -> bool:
+    """Streaming endpoints answer 200 and report failures as an `error` event."""
+    return "event: error" not in response.text
+
+
+def build_request(endpoint: str, sequence: int, unique: bool) -> dict:
+    if endpoint in ("upload", "upload-stream"):
+        path = "/api/resume/upload" if endpoint == "upload" else "/api/resume/upload/stream"
+        files = {"file": (f"resume-{sequence}.pdf", _pdf(sequence, unique), "application/pdf")}
+        return {"method": "POST", "url": path, "files": files}
+    if endpoint == "critique":
+        return {"method": "POST", "url": "/api/guide/critique",
+                "json": {"bullet_text": _bullet(sequence, unique), "domain": "Backend", "years_experience": 6}}
+    if endpoint == "critique-batch":
+        bullets = [_bullet(sequence * 8 + i, unique) for i in range(8)]
+        return {"method": "POST", "url": "/api/guide/critique/batch",
+                "json": {"bullets": bullets, "domain": "Backend", "years_experience": 6}}
+    if endpoint == "refine":
+        return {"method": "POST", "url": "/api/guide/refine",
+                "json": {"original_text": _bullet(sequence, unique),
+                         "context_answer": "Cut release time by 35% for 40 engineers",
+                         "domain": "Backend"}}
+    raise ValueError(f"Unknown endpoint {endpoint!r}")
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def run(base_url: str, mix: Dict[str, float], concurrency: int, duration: float,
+              unique: bool, timeout: float, seed: int) -> dict:
+    rng = random.Random(seed)
+    endpoints, weights = zip(*mix.items())
+    latencies = defaultdict(list)
+    statuses = defaultdict(lambda: defaultdict(int))
+    errors = defaultdict(int)
+    sequence = 0
+    deadline = time.monotonic() + duration
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        async def worker():
+            nonlocal sequence
+            while time.monotonic() < deadline:
+                endpoint = rng.choices(endpoints, weights)[0]
+                sequence += 1
+                request = build_request(endpoint, sequence, unique)
+                start = time.perf_counter()
+                try:
+                    response = await client.request(**request)
+                    status = response.status_code
+                    failed = status >= 400 or (endpoint == "upload-stream" and not _sse_ok(response))
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                    failed = True
+                latencies[endpoint].append((time.perf_counter() - start) * 1000)
+                statuses[endpoint][str(status)] += 1
+                if failed:
+                    errors[endpoint] += 1
+
+        started = time.monotonic()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.monotonic() - started
+
+    report = {"duration_seconds": round(elapsed, 2), "concurrency": concurrency, "endpoints": {}}
+    for endpoint in endpoints:
+        samples = latencies[endpoint]
+        if not samples:
+            continue
+        report["endpoints"][endpoint] = {
+            "requests": len(samples),
+            "rps": round(len(samples) / elapsed, 2),
+            "p50_ms": round(percentile(samples, 0.50), 1),
+            "p95_ms": round(percentile(samples, 0.95), 1),
+            "p99_ms": round(percentile(samples, 0.99), 1),
+            "error_rate": round(errors[endpoint] / len(samples), 4),
+            "statuses": dict(statuses[endpoint]),
+        }
+    return report
+
+
+def print_table(report: dict):
+    print(f"{report['duration_seconds']}s at concurrency {report['concurrency']}")
+    print(f"{'endpoint':<16}{'requests':>9}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>9}")
+    for endpoint, row in report["endpoints"].items():
+        print(
+            f"{endpoint:<16}{row['requests']:>9}{row['rps']:>9.2f}{row['p50_ms']:>10.1f}"
+            f"{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}{row['error_rate']:>8.1%}"
+        )
+
+
+def parse_mix(items: List[str]) -> Dict[str, float]:
+    mix = {}
+    for item in items:
+        name, _, weight = item.partition("=")
+        build_request(name, 0, False)  # Validate the name
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--mix", nargs="+", default=["upload=1", "critique=4", "critique-batch=1", "refine=1"],
+                        help="endpoint=weight; endpoints: upload upload-stream critique critique-batch refine")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--cacheable", action="store_true", help="Repeat identical inputs")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(
+        args.base_url, parse_mix(args.mix), args.concurrency, args.duration,
+        unique=not args.cacheable, timeout=args.timeout, seed=args.seed,
+    ))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_table(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+Deterministic OpenAI-compatible stand-in for load testing.
+
+Serves POST /v1/chat/completions (plain and streamed) with canned answers:
+a full resume JSON for parser requests and DSPy-formatted critiques/rewrites
+for guide requests. Latency, token throughput and injected failures are
+configurable. Run from backend/:
+
+    python -m benchmarks.mock_openai --port 8100 --latency-ms 800 --tokens-per-second 80 \\
+        --error-rate 0.01 --rate-limit-rate 0.02
+
+and point the backend at it:
+
+    LLM_BASE_URL=http://127.0.0.1:8100/v1 OPENAI_API_KEY=mock uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+CANNED_RESUME = {
+    "basics": {
+        "name": "Alex Mock",
+        "email": "alex.mock@example.com",
+        "phone": None,
+        "location": "Remote",
+        "linkedin": None,
+        "github": "https://github.com/alexmock",
+        "website": None,
+        "summary": "Backend engineer with eight years building high-throughput data services.",
+    },
+    "work_experience": [
+        {
+            "company": "Loadtest Labs",
+            "role": "Senior Backend Engineer",
+            "dates": "Jan 2021 - Present",
+            "location": "Remote",
+            "accomplishments": [
+                {
+                    "raw_text": "Reduced p99 API latency by 42% by redesigning the caching layer",
+                    "refined_components": {"action": "Redesigned caching layer", "impact": "42% lower p99 latency"},
+                    "tags": ["caching", "latency", "python"],
+                },
+                {
+                    "raw_text": "Worked on various internal tools",
+                    "refined_components": {"action": "Worked on internal tools", "impact": None},
+                    "tags": ["tooling"],
+                },
+            ],
+        },
+        {
+            "company": "Fixture Corp",
+            "role": "Software Engineer",
+            "dates": "Jun 2017 - Dec 2020",
+            "location": "Austin, TX",
+            "accomplishments": [
+                {
+                    "raw_text": "Led migration of 30 services to Kubernetes, cutting deploy time from 2 hours to 10 minutes",
+                    "refined_components": {"action": "Led Kubernetes migration", "impact": "Deploys 12x faster"},
+                    "tags": ["kubernetes", "devops"],
+                },
+            ],
+        },
+    ],
+    "education": [
+        {
+            "institution": "State University",
+            "degree": "BS",
+            "field": "Computer Science",
+            "dates": "2017",
+            "gpa": None,
+            "highlights": [],
+        }
+    ],
+    "skills": {
+        "languages": ["Python", "Go", "SQL"],
+        "frameworks": ["FastAPI", "SQLAlchemy"],
+        "tools": ["PostgreSQL", "Redis", "Kafka"],
+        "cloud": ["AWS", "Kubernetes"],
+        "other": ["System design"],
+    },
+    "certifications": [],
+    "publications": [],
+    "awards": [],
+    "patents": [],
+    "languages": [{"language": "English", "proficiency": "Native"}],
+    "volunteer": [],
+    "projects": [],
+    "meta": {"years_experience": 8, "core_archetype": "Individual Contributor", "primary_domain": "Backend"},
+}
+
+CRITIQUE_FIELDS = {
+    "reasoning": "The bullet names an action but no measurable outcome.",
+    "missing_star_components": "['Result']",
+    "weakness_explanation": "It does not say what changed as a result of the work.",
+    "follow_up_question": "What measurable improvement did this deliver?",
+}
+REWRITE_FIELDS = {
+    "reasoning": "Lead with the action and quantify the outcome from the user's answer.",
+    "refined_bullet": "Rebuilt the internal deploy tooling, cutting release time by 35% for 40 engineers",
+    "improvement_reason": "Strong verb, concrete scope and a quantified result.",
+}
+
+_DSPY_FIELD = re.compile(r"\[\[ ## (\w+) ## \]\]")
+
+
+@dataclass
+class MockConfig:
+    latency_ms: float = 800.0  # Median time to first token
+    latency_sigma: float = 0.4  # Log-normal spread of the above
+    tokens_per_second: float = 80.0  # Streaming / completion throughput (0 = instant)
+    error_rate: float = 0.0  # Fraction of requests answered with 500
+    rate_limit_rate: float = 0.0  # Fraction answered with 429
+    retry_after_seconds: float = 1.0
+    seed: int = 7
+
+
+class MockBehaviour:
+    """Seeded draws for latency and injected failures, safe across requests."""
+
+    def __init__(self, config: MockConfig):
+        self.config = config
+        self._random = random.Random(config.seed)
+        self._lock = threading.Lock()
+        self.counts = {"requests": 0, "errors": 0, "rate_limited": 0}
+
+    def draw(self):
+        """Returns (first_token_delay_seconds, injected_status or None)."""
+        with self._lock:
+            self.counts["requests"] += 1
+            roll = self._random.random()
+            delay = self.config.latency_ms / 1000 * math.exp(self._random.gauss(0, self.config.latency_sigma))
+            if roll < self.config.rate_limit_rate:
+                self.counts["rate_limited"] += 1
+                return delay * 0.1, 429
+            if roll < self.config.rate_limit_rate + self.config.error_rate:
+                self.counts["errors"] += 1
+                return delay, 500
+            return delay, None
+
+    def generation_seconds(self, completion_tokens: int) -> float:
+        if self.config.tokens_per_second <= 0:
+            return 0.0
+        return completion_tokens / self.config.tokens_per_second
+
+
+def _approx_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def answer_for(body: dict) -> str:
+    """Pick the canned answer that fits the request."""
+    messages = body.get("messages") or []
+    system = " ".join(str(m.get("content") or "") for m in messages if m.get("role") == "system")
+
+    if (body.get("response_format") or {}).get("type") == "json_object":
+        return json.dumps(CANNED_RESUME, indent=2)
+
+    # DSPy ChatAdapter: answer each output field named in the system prompt
+    fields = set(_DSPY_FIELD.findall(system))
+    canned = REWRITE_FIELDS if "refined_bullet" in fields else CRITIQUE_FIELDS
+    parts = [f"[[ ## {name} ## ]]\n{value}" for name, value in canned.items() if name in fields]
+    if not parts:
+        parts = [f"[[ ## {name} ## ]]\n{value}" for name, value in canned.items() if name != "reasoning"]
+    return "\n\n".join(parts) + "\n\n[[ ## completed ## ]]"
+
+
+def create_app(config: MockConfig = None) -> FastAPI:
+    behaviour = MockBehaviour(config or MockConfig())
+    app = FastAPI(title="Mock OpenAI")
+
+    @app.get("/stats")
+    def stats():
+        return behaviour.counts
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        delay, injected = behaviour.draw()
+        await asyncio.sleep(delay)
+
+        if injected == 429:
+            return JSONResponse(
+                status_code=429,
+                headers={"retry-after": f"{behaviour.config.retry_after_seconds:g}"},
+                content={"error": {"message": "Rate limit reached (mock)", "type": "rate_limit_exceeded"}},
+            )
+        if injected == 500:
+            return JSONResponse(status_code=500, content={"error": {"message": "Mock server error", "type": "server_error"}})
+
+        content = answer_for(body)
+        prompt_tokens = sum(_approx_tokens(str(m.get("content") or "")) for m in body.get("messages") or [])
+        completion_tokens = _approx_tokens(content)
+        model = body.get("model", "gpt-4o")
+        completion_id = f"chatcmpl-mock-{uuid.uuid4().hex[:12]}"
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+        if body.get("stream"):
+            async def chunks():
+                # ~16-character deltas paced at the configured token rate
+                step = 16
+                pause = behaviour.generation_seconds(_approx_tokens("x" * step))
+                for start in range(0, len(content), step):
+                    chunk = {
+                        "id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                        "model": model,
+                        "choices": [{"index": 0, "delta": {"content": content[start:start + step]}, "finish_reason": None}],
+                    }
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                    if pause:
+                        await asyncio.sleep(pause)
+                final = {
+                    "id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                    "model": model, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                }
+                yield f"data: {json.dumps(final)}\n\n"
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(chunks(), media_type="text/event-stream")
+
+        await asyncio.sleep(behaviour.generation_seconds(completion_tokens))
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": usage,
+        }
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    defaults = MockConfig()
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms)
+    parser.add_argument("--latency-sigma", type=float, default=defaults.latency_sigma)
+    parser.add_argument("--tokens-per-second", type=float, default=defaults.tokens_per_second)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--rate-limit-rate", type=float, default=defaults.rate_limit_rate)
+    parser.add_argument("--retry-after-seconds", type=float, default=defaults.retry_after_seconds)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    args = parser.parse_args()
+
+    import uvicorn
+    config = MockConfig(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after_seconds=args.retry_after_seconds,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
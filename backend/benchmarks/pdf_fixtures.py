@@ -0,0 +1,63 @@
+"""Builds small text-only PDFs for benchmarks and the extraction tests."""
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def build_text_pdf(pages: list) -> bytes:
+    """
+    Build a PDF with one page per entry in `pages`.
+    Each entry is a list of text lines; an empty list gives a blank page.
+    """
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Pages, filled in once the kids are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for lines in pages:
+        ops = ["BT", "/F1 10 Tf", "12 TL", "50 780 Td"]
+        for line in lines:
+            ops.append(f"({_escape(line)}) Tj T*")
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1")
+
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_ref = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_ref
+        )
+        kids.append(len(objects))
+
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % k for k in kids), len(kids)
+    )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+
+    xref_at = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, xref_at
+    )
+    return bytes(out)
+
+
+def academic_cv_pages(page_count: int, lines_per_page: int = 50) -> list:
+    """Synthetic long-CV content: a header page followed by publication lists."""
+    pages = [["Dr. Jane Doe", "   Professor of Computer Science   ", "", "", "Experience"]]
+    for p in range(1, page_count):
+        pages.append([
+            f"  [{p}.{n}] Doe, J. et al. Scalable systems paper number {n}.   Proc. VLDB {2000 + n % 25}."
+            if n % 7 else ""
+            for n in range(lines_per_page)
+        ])
+    return pages
@@ -0,0 +1,120 @@
+import zipfile
+
+import pytest
+
+from app.services.bulk_import import BulkImporter, iter_pdf_sources
+from app.services.rate_limit import TokenBucket
+
+
+class RecordingImporter(BulkImporter):
+    """BulkImporter with the database replaced by in-memory checkpoints."""
+
+    def __init__(self, parser, stored=(), **kwargs):
+        super().__init__(parser, session_factory=None, **kwargs)
+        self.stored = set(stored)
+        self.batches = []
+
+    def _stored_keys(self, import_id):
+        return set(self.stored)
+
+    def _write_batch(self, import_id, batch, report):
+        self.batches.append([result["filename"] for result in batch])
+        for result in batch:
+            status = "stored" if result["content"] is not None else "failed"
+            report[status] += 1
+            if status == "stored":
+                self.stored.add(result["file_key"])
+
+
+class FakeParser:
+    def __init__(self):
+        self.budget_calls = 0
+
+    def parse_pdf(self, source, before_llm=None):
+        data = source if isinstance(source, bytes) else source.read()
+        if b"broken" in data:
+            raise ValueError("Could not extract text")
+        before_llm("resume text")
+        self.budget_calls += 1
+        return {"basics": {"name": data.decode()}}
+
+
+@pytest.fixture
+def resume_dir(tmp_path):
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "a.pdf").write_bytes(b"alice")
+    (tmp_path / "nested" / "b.PDF").write_bytes(b"bob")
+    (tmp_path / "copy-of-a.pdf").write_bytes(b"alice")
+    (tmp_path / "bad.pdf").write_bytes(b"broken")
+    (tmp_path / "notes.txt").write_bytes(b"ignored")
+    return tmp_path
+
+
+def test_iter_pdf_sources_reads_directories_and_zips(resume_dir, tmp_path_factory):
+    from_dir = {name: load() for name, _, load in iter_pdf_sources(str(resume_dir))}
+    assert sorted(from_dir) == ["a.pdf", "bad.pdf", "copy-of-a.pdf", "nested/b.PDF"]
+    for f in from_dir.values():
+        f.close()
+
+    archive = tmp_path_factory.mktemp("zips") / "resumes.zip"
+    with zipfile.ZipFile(archive, "w") as z:
+        z.writestr("x/a.pdf", b"alice")
+        z.writestr("__MACOSX/x/._a.pdf", b"junk")
+        z.writestr("readme.md", b"ignored")
+    assert [(name, load()) for name, _, load in iter_pdf_sources(str(archive))] == [("x/a.pdf", b"alice")]
+
+
+def test_run_dedupes_batches_and_resumes(resume_dir):
+    importer = RecordingImporter(FakeParser(), concurrency=2, batch_size=2)
+    report = importer.run(str(resume_dir), import_id="test")
+
+    assert (report["stored"], report["failed"], report["duplicates"]) == (2, 1, 1)
+    assert [len(batch) for batch in importer.batches] == [2, 1]
+
+    # A second run only retries the failure
+    parser = FakeParser()
+    rerun = RecordingImporter(parser, stored=importer.stored, concurrency=2)
+    report = rerun.run(str(resume_dir), import_id="test")
+    assert (report["skipped"], report["failed"], parser.budget_calls) == (3, 1, 0)
+
+
+def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(rate_per_minute=60, capacity=10)
+
+    assert bucket.try_acquire(10) == 0
+    assert bucket.try_acquire(3) == pytest.approx(3, abs=0.1)
+    assert bucket.acquire(1, timeout=0.01) is False
+
+    bucket.refund(5)
+    assert bucket.try_acquire(5) == 0
+    # Requests above capacity are clamped rather than waiting forever
+    assert bucket.try_acquire(100) <= 10
+
+
+@pytest.mark.parametrize("as_zip", [False, True])
+def test_oversize_files_fail_without_being_parsed(tmp_path, monkeypatch, as_zip):
+    monkeypatch.setattr("app.services.bulk_import.MAX_UPLOAD_BYTES", 6)
+    name = "a-very-long-directory-name/" * 5 + "huge.pdf"
+    source = tmp_path / "resumes"
+    (source / name).parent.mkdir(parents=True)
+    (source / name).write_bytes(b"far too large")
+    (source / "ok.pdf").write_bytes(b"alice")
+    if as_zip:
+        archive = tmp_path / "resumes.zip"
+        with zipfile.ZipFile(archive, "w") as z:
+            z.writestr(name, b"far too large")
+            z.writestr("ok.pdf", b"alice")
+        source = archive
+
+    keys = {name: file_key for name, file_key, _ in iter_pdf_sources(str(source))}
+    assert len(keys[name]) == 64  # Fits import_checkpoints.file_key
+
+    parser = FakeParser()
+    importer = RecordingImporter(parser)
+    results = []
+    importer._write_batch = lambda import_id, batch, report: results.extend(batch)
+    importer.run(str(source), import_id="test")
+
+    errors = {result["filename"]: result["error"] for result in results}
+    assert errors == {name: "File exceeds 6 bytes", "ok.pdf": None}
+    assert parser.budget_calls == 1
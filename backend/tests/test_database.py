@@ -0,0 +1,89 @@
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from app import database
+from app.database import (
+    PoolWaitStats, SessionRunner, TimedAsyncQueuePool, TimedQueuePool, SessionLocal,
+    async_database_url, engine_options,
+)
+
+
+@pytest.fixture
+def timed_engine(tmp_path):
+    TimedQueuePool.wait_stats = PoolWaitStats()
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", poolclass=TimedQueuePool, pool_size=1, max_overflow=0,
+        pool_timeout=0.2, connect_args={"check_same_thread": False}
+    )
+    yield engine
+    engine.dispose()
+
+
+def test_pool_records_checkout_waits(timed_engine):
+    held = timed_engine.connect()
+    releaser = threading.Timer(0.05, held.close)
+    releaser.start()
+    with timed_engine.connect() as connection:  # Waits for the held connection
+        connection.execute(text("SELECT 1"))
+    releaser.join()
+
+    stats = TimedQueuePool.wait_stats.stats()
+    assert stats["checkouts"] == 2
+    assert stats["timeouts"] == 0
+    assert stats["wait_ms_max"] >= 40
+    assert stats["wait_ms_p99"] == stats["wait_ms_max"]
+
+
+def test_pool_counts_timeouts(timed_engine):
+    with timed_engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            timed_engine.connect()
+    assert TimedQueuePool.wait_stats.stats()["timeouts"] == 1
+
+
+def test_engine_options_for_postgres(monkeypatch):
+    monkeypatch.setattr(database, "DB_POOL_SIZE", 20)
+    monkeypatch.setattr(database, "DB_STATEMENT_TIMEOUT_MS", 5000)
+
+    sync = engine_options("postgresql://localhost/job_agent")
+    assert sync["poolclass"] is TimedQueuePool
+    assert sync["pool_size"] == 20
+    assert sync["connect_args"] == {"options": "-c statement_timeout=5000"}
+
+    pooled = create_engine("postgresql://localhost/job_agent", **sync)  # Doesn't connect
+    assert isinstance(pooled.pool, TimedQueuePool) and pooled.pool.size() == 20
+
+    async_options = engine_options("postgresql+asyncpg://localhost/job_agent", is_async=True)
+    assert async_options["poolclass"] is TimedAsyncQueuePool
+    assert async_options["connect_args"] == {"server_settings": {"statement_timeout": "5000"}}
+
+
+def test_engine_options_leave_sqlite_pooling_alone():
+    assert engine_options("sqlite://") == {"pool_pre_ping": database.DB_POOL_PRE_PING}
+
+
+def test_async_database_url(monkeypatch):
+    monkeypatch.delenv("ASYNC_DATABASE_URL", raising=False)
+    assert async_database_url("postgresql://me:pw@db/job_agent") == "postgresql+asyncpg://me:pw@db/job_agent"
+    assert async_database_url("postgresql+psycopg2://db/job_agent") == "postgresql+asyncpg://db/job_agent"
+    with pytest.raises(ValueError):
+        async_database_url("sqlite://")
+    monkeypatch.setenv("ASYNC_DATABASE_URL", "postgresql+asyncpg://elsewhere/job_agent")
+    assert async_database_url("sqlite://") == "postgresql+asyncpg://elsewhere/job_agent"
+
+
+def test_session_runner_runs_sync_code_off_the_event_loop():
+    session = SessionLocal(bind=create_engine("sqlite://", connect_args={"check_same_thread": False}))
+    runner = SessionRunner(session)
+    loop_thread = threading.get_ident()
+
+    def query(session, value):
+        return session.execute(text("SELECT :value"), {"value": value}).scalar(), threading.get_ident()
+
+    value, thread = asyncio.run(runner.run(query, 7))
+    session.close()
+    assert value == 7
+    assert thread != loop_thread
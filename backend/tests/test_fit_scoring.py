@@ -0,0 +1,121 @@
+import random
+import uuid
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import Job, ResumeProfile, UserPreference
+from app.services import fit_scoring
+from app.services.fit_scoring import (
+    Candidate, JobBatch, load_candidate, profile_skills, remote_code, score_all_jobs, score_jobs,
+)
+
+
+def reference_score(job: dict, candidate: Candidate) -> int:
+    """Per-job restatement of the scoring formula."""
+    def coverage(skills):
+        listed = {fit_scoring.normalize_skill(s) for s in skills or []}
+        return len(listed & candidate.skills) / len(listed) if listed else fit_scoring.NEUTRAL
+
+    salary = fit_scoring._salary_top(job["salary_range"])
+    if not candidate.min_salary:
+        salary_fit = 1.0
+    elif np.isnan(salary):
+        salary_fit = fit_scoring.NEUTRAL
+    else:
+        salary_fit = min(1.0, max(0.0, (salary / candidate.min_salary - 0.8) / 0.2))
+    table = fit_scoring._REMOTE_FIT.get(candidate.remote_preference, fit_scoring._NO_PREFERENCE)
+    remote_fit = table[remote_code(job["remote_policy"])]
+    fit = (
+        0.55 * coverage(job["required_skills"]) + 0.15 * coverage(job["nice_to_have_skills"])
+        + 0.15 * salary_fit + 0.15 * remote_fit
+    )
+    return int(np.rint(fit * 100))
+
+
+class Row:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+def random_jobs(count, seed=3):
+    rng = random.Random(seed)
+    skills = ["Python", "python ", "Go", "PostgreSQL", "Kubernetes", "React", "AWS", "Terraform", "Rust", "SQL"]
+    jobs = []
+    for i in range(count):
+        jobs.append({
+            "job_id": uuid.uuid4(),
+            "title": rng.choice(["Backend Engineer", "Platform Engineer", "Data Engineer"]),
+            "required_skills": rng.sample(skills, rng.randint(0, 5)),
+            "nice_to_have_skills": rng.sample(skills, rng.randint(0, 3)),
+            "salary_range": rng.choice([None, {"min": 90000}, {"min": 100000, "max": rng.randint(90, 220) * 1000}]),
+            "remote_policy": rng.choice(["Remote", "hybrid", "On-site", None]),
+        })
+    return jobs
+
+
+@pytest.mark.parametrize("preference", [None, "remote_only", "hybrid"])
+def test_vectorized_scores_match_the_formula(preference):
+    jobs = random_jobs(300)
+    candidate = Candidate(["python", "PostgreSQL", "aws"], min_salary=150000, remote_preference=preference)
+
+    scores = score_jobs(JobBatch.from_jobs(Row(**job) for job in jobs), candidate)
+
+    # Within one point: the two summation orders can round a .5 differently
+    np.testing.assert_allclose(scores, [reference_score(job, candidate) for job in jobs], atol=1)
+    assert scores.min() >= 0 and scores.max() <= 100
+
+
+def test_deal_breakers_zero_the_score():
+    jobs = [
+        Row(job_id=1, title="Backend Engineer", required_skills=["Python"], nice_to_have_skills=None,
+            salary_range=None, remote_policy="onsite"),
+        Row(job_id=2, title="Backend Engineer (Contract)", required_skills=["Python"], nice_to_have_skills=None,
+            salary_range=None, remote_policy="remote"),
+        Row(job_id=3, title="Backend Engineer", required_skills=["Python"], nice_to_have_skills=None,
+            salary_range=None, remote_policy="remote"),
+    ]
+    candidate = Candidate(["Python"], deal_breakers=["no_onsite", "No Contract"])
+    assert score_jobs(JobBatch.from_jobs(jobs), candidate).tolist() == [0, 0, 92]
+
+
+def test_profile_skills_flattens_categories():
+    content = {"skills": {"languages": ["Python", " Go "], "tools": ["PostgreSQL"], "other": None}}
+    assert profile_skills(content) == {"python", "go", "postgresql"}
+    assert profile_skills({"skills": ["SQL"]}) == {"sql"}
+    assert profile_skills({}) == set()
+
+
+def test_score_all_jobs_writes_scores_back():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Job.__table__, ResumeProfile.__table__, UserPreference.__table__])
+    db = sessionmaker(bind=engine)()
+
+    owner = uuid.uuid4()
+    profile = ResumeProfile(content={"skills": {"languages": ["Python"], "tools": ["PostgreSQL"]}}, owner_id=owner)
+    db.add(profile)
+    db.add(UserPreference(user_id=owner, core_skills=["AWS"], min_salary=150000, remote_preference="remote_only"))
+    jobs = random_jobs(50, seed=11)
+    for job in jobs:
+        db.add(Job(company="Acme", status="discovered", **job))
+    db.add(Job(title="Old", company="Acme", status="passed", required_skills=["Python"]))
+    db.commit()
+
+    candidate = load_candidate(db, profile.profile_id)
+    assert candidate.skills == {"python", "postgresql", "aws"}
+    assert candidate.min_salary == 150000
+
+    report = score_all_jobs(db, candidate, status="discovered")
+    assert report["scored"] == report["updated"] == 50
+
+    stored = dict(db.query(Job.job_id, Job.fit_score).filter(Job.status == "discovered").all())
+    expected = score_jobs(JobBatch.from_jobs(Row(**job) for job in jobs), candidate)
+    assert stored == {job["job_id"]: int(score) for job, score in zip(jobs, expected)}
+    assert db.query(Job.fit_score).filter(Job.status == "passed").scalar() is None
+
+    with pytest.raises(ValueError):
+        load_candidate(db, uuid.uuid4())
+    db.close()
@@ -0,0 +1,62 @@
+import threading
+import time
+
+from app.services.guide_service import GuideService, normalize_bullet, profile_bullets
+from app.services.star_prescreen import StarPrescreen
+
+
+class FakeGuide(GuideService):
+    def __init__(self, fail_on=(), prescreen=None):
+        self.cache = None
+        self.prescreen = prescreen
+        self.fail_on = set(fail_on)
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def _analyze_bullet(self, text, domain, experience):
+        with self.lock:
+            self.calls.append(text)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.02)
+        with self.lock:
+            self.active -= 1
+        if text in self.fail_on:
+            raise RuntimeError("model error")
+        return {"missing_components": ["Result"], "critique": f"{domain}: {text}", "question": "How much?"}
+
+
+def test_profile_bullets_lists_accomplishments_with_paths():
+    content = {"work_experience": [
+        {"company": "Acme", "accomplishments": [{"raw_text": "Built X"}, {"raw_text": "  "}, {"raw_text": "Led Y"}]},
+        {"company": "Initech"},
+    ]}
+    assert [(b["text"], b["path"]) for b in profile_bullets(content)] == [
+        ("Built X", "work_experience[0].accomplishments[0]"),
+        ("Led Y", "work_experience[0].accomplishments[2]"),
+    ]
+
+
+def test_critique_many_dedupes_and_runs_concurrently():
+    guide = FakeGuide(fail_on={"Broke prod"})
+    texts = ["Built X", "Built  X\n", "Led Y", "Broke prod", "Shipped Z", "Cut costs"]
+
+    results = {text: (result, error) for text, result, error in guide.critique_many(texts, domain="Backend")}
+
+    assert sorted(guide.calls) == sorted({normalize_bullet(t) for t in texts})
+    assert guide.peak > 1
+    assert results["Built X"][0]["critique"] == "Backend: Built X"
+    assert results["Broke prod"] == (None, "model error")
+
+
+def test_critique_many_only_escalates_ambiguous_bullets():
+    guide = FakeGuide(prescreen=StarPrescreen())
+    texts = ["Responsible for various things", "Managed relationships with multiple stakeholders"]
+
+    results = {text: result for text, result, _ in guide.critique_many(texts)}
+
+    assert guide.calls == ["Managed relationships with multiple stakeholders"]
+    assert results["Responsible for various things"]["source"] == "prescreen"
+    assert guide.prescreen.stats()["escalation_rate"] == 0.5
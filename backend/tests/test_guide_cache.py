@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+
+import dspy
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import GuideCacheEntry
+from app.services.guide_cache import GuideCache, experience_bucket, program_fingerprint
+from app.services.guide_service import CritiqueBulletPoint, RewriteBulletPoint
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[GuideCacheEntry.__table__])
+    return sessionmaker(bind=engine)
+
+
+def test_keys_ignore_formatting_noise_but_not_meaning():
+    cache = GuideCache("fp", session_factory=None)
+
+    key = cache.critique_key("Led  a team of 5\n", "Backend", 6)
+    assert key == cache.critique_key("Led a team of 5", " backend ", 8)
+    assert key != cache.critique_key("Led a team of 5", "Backend", 12)
+    assert key != GuideCache("other", session_factory=None).critique_key("Led a team of 5", "Backend", 6)
+    assert [experience_bucket(y) for y in (0, 3, 7, 20, None)] == ["0-1", "2-4", "5-9", "15+", "unknown"]
+
+
+def test_database_tier_survives_restart_until_ttl(session_factory):
+    first = GuideCache("fp", session_factory=session_factory)
+    key = first.critique_key("Built X", "General", 5)
+    first.put(key, "critique", {"critique": "vague"})
+
+    second = GuideCache("fp", session_factory=session_factory)
+    assert second.get(key) == {"critique": "vague"}
+    assert second.stats()["db"]["hits"] == 1
+
+    db = session_factory()
+    db.query(GuideCacheEntry).update({"expires_at": datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+    assert GuideCache("fp", session_factory=session_factory).get(key) is None
+
+
+def test_purge_removes_other_fingerprints(session_factory):
+    old = GuideCache("old", session_factory=session_factory)
+    old.put(old.critique_key("Built X", "General", 5), "critique", {"critique": "vague"})
+    current = GuideCache("new", session_factory=session_factory)
+    current.put(current.critique_key("Built X", "General", 5), "critique", {"critique": "better"})
+
+    assert current.purge_stale() == 1
+    assert session_factory().query(GuideCacheEntry).count() == 1
+
+
+def test_fingerprint_tracks_signatures_and_model():
+    signatures = (CritiqueBulletPoint, RewriteBulletPoint)
+    base = program_fingerprint(signatures, "gpt-4o")
+
+    assert base == program_fingerprint(signatures, "gpt-4o")
+    assert base != program_fingerprint(signatures, "gpt-4o-mini")
+
+    changed = CritiqueBulletPoint.with_instructions("Be harsher.")
+    assert base != program_fingerprint((changed, RewriteBulletPoint), "gpt-4o")
@@ -0,0 +1,65 @@
+import json
+
+import dspy
+import pytest
+from dspy.utils import DummyLM
+
+from app.services.guide_program import compare_programs, compile_program, load_examples, load_program, save_program
+from app.services.guide_service import GuideAgent
+
+ANSWER = {
+    "reasoning": "No numbers.",
+    "missing_star_components": "['Result']",
+    "weakness_explanation": "No measurable outcome.",
+    "follow_up_question": "What changed?",
+}
+
+
+@pytest.fixture
+def trainset(tmp_path):
+    path = tmp_path / "train.jsonl"
+    path.write_text("\n".join(
+        json.dumps({"raw_text": f"Built service {i}", "domain": "Backend", "missing_components": ["Result"]})
+        for i in range(5)
+    ))
+    return load_examples(str(path))
+
+
+@pytest.fixture(autouse=True)
+def dummy_lm():
+    with dspy.context(lm=DummyLM([ANSWER] * 100)):
+        yield
+
+
+def test_compiled_program_round_trips_with_version_pin(trainset, tmp_path):
+    program, manifest = compile_program(trainset, version="v1", max_demos=2)
+    path = str(tmp_path / "guide.json")
+    save_program(program, manifest, path)
+
+    loaded, loaded_manifest = load_program(path, pinned_version="v1")
+    assert loaded_manifest["demos"] == 2
+    assert len(loaded.critique_prog.demos) == 2
+    assert not hasattr(loaded.critique_prog, "predict")  # No chain-of-thought step
+    assert loaded.critique_prog.signature.instructions == program.critique_prog.signature.instructions
+
+    with pytest.raises(ValueError, match="pinned"):
+        load_program(path, pinned_version="v2")
+
+
+def test_artifact_for_other_signatures_is_refused(trainset, tmp_path):
+    program, manifest = compile_program(trainset, version="v1", max_demos=1)
+    manifest["signature_fingerprint"] = "stale"
+    path = str(tmp_path / "guide.json")
+    save_program(program, manifest, path)
+
+    with pytest.raises(ValueError, match="different signatures"):
+        load_program(path)
+
+
+def test_compare_reports_both_programs(trainset):
+    compiled, _ = compile_program(trainset, version="v1", max_demos=1)
+    report = compare_programs(GuideAgent(), compiled, trainset[:2])
+
+    assert report["raw"]["calls"] == report["compiled"]["calls"] == 2
+    assert report["raw"]["avg_score"] == 1.0
+    assert report["compiled"]["avg_prompt_chars"] > 0
@@ -0,0 +1,78 @@
+import threading
+import uuid
+
+import pytest
+
+from app.services.ingestion_service import (
+    IngestionQueue, IngestionQueueFull, STORED, FAILED
+)
+
+
+class FakeSession:
+    def __init__(self):
+        self.added = []
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    def commit(self):
+        pass
+
+    def refresh(self, obj):
+        obj.profile_id = uuid.uuid4()
+
+    def close(self):
+        pass
+
+
+class FakeParser:
+    def __init__(self, gate=None, error=None):
+        self.gate = gate
+        self.error = error
+        self.stages = []
+
+    def parse_pdf(self, pdf_bytes, on_stage=None):
+        for stage in ("extracting", "parsing"):
+            self.stages.append(stage)
+            on_stage(stage)
+        if self.gate:
+            self.gate.wait(timeout=5)
+        if self.error:
+            raise self.error
+        return {"basics": {"name": "Queued User"}}
+
+
+def test_submit_runs_in_background_and_stores_profile():
+    parser = FakeParser()
+    queue = IngestionQueue(lambda: parser, FakeSession, max_workers=2)
+
+    job = queue.submit(b"%PDF-1.4", "resume.pdf")
+    queue.shutdown(wait=True)
+
+    assert job.status == STORED
+    assert job.profile_id is not None
+    assert parser.stages == ["extracting", "parsing"]
+
+
+def test_parse_failure_is_reported():
+    queue = IngestionQueue(lambda: FakeParser(error=ValueError("image-only PDF")), FakeSession)
+
+    job = queue.submit(b"%PDF-1.4", "scan.pdf")
+    queue.shutdown(wait=True)
+
+    assert queue.get(job.ingestion_id).status == FAILED
+    assert "image-only" in job.error
+
+
+def test_queue_rejects_when_full():
+    gate = threading.Event()
+    queue = IngestionQueue(lambda: FakeParser(gate=gate), FakeSession, max_workers=1, max_pending=2)
+
+    queue.submit(b"a", "a.pdf")
+    queue.submit(b"b", "b.pdf")
+    with pytest.raises(IngestionQueueFull):
+        queue.submit(b"c", "c.pdf")
+
+    gate.set()
+    queue.shutdown(wait=True)
+    assert queue.stats()["jobs"][STORED] == 2
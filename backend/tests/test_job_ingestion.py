@@ -0,0 +1,129 @@
+import json
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import Job
+from app.services import near_duplicates as near_duplicates_module
+from app.services import skills as skills_module
+from app.services.job_ingestion import (
+    JobIngester, backfill_url_hashes, canonical_url, posting_key, posting_row, upsert_statement,
+)
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    monkeypatch.setattr(skills_module, "_index_instance", None)
+    monkeypatch.setattr(near_duplicates_module, "_index_instance", None)
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Job.__table__])
+    return sessionmaker(bind=engine)
+
+
+def jsonl(*postings) -> list:
+    return [json.dumps(posting) + "\n" for posting in postings]
+
+
+def test_canonical_url_ignores_tracking_and_cosmetic_differences():
+    canonical = "https://jobs.acme.com/role/123?a=1&b=2"
+    assert canonical_url("http://WWW.Jobs.Acme.com:80/role/123/?b=2&a=1&utm_source=x#apply") == canonical
+    assert canonical_url("jobs.acme.com//role/123?a=1&gclid=abc&b=2") == canonical
+    assert canonical_url("https://jobs.acme.com:8443/role") == "https://jobs.acme.com:8443/role"
+    assert canonical_url("https://jobs.acme.com/Role") != canonical_url("https://jobs.acme.com/role")
+    assert canonical_url("") is None
+    assert canonical_url("https:///nohost") is None
+
+    assert posting_key("SRE", "Acme", "https://acme.com/1?utm_medium=x") == posting_key("Other", "Co", "acme.com/1")
+    assert posting_key("SRE", "Acme", None, "Berlin") == posting_key(" sre ", "ACME", "", "berlin")
+    assert posting_key("SRE", "Acme", None, "Berlin") != posting_key("SRE", "Acme", None, "Paris")
+
+
+def test_posting_row_validates_and_normalizes():
+    row = posting_row({
+        "title": " SRE ", "company": "Acme", "url": "https://acme.com/1",
+        "required_skills": "K8s, Go", "description": "Run things", "application_deadline": "2026-11-01T00:00:00",
+    })
+    assert row["title"] == "SRE"
+    assert row["required_skills"] == ["K8s", "Go"]
+    assert row["normalized_skills"] == ["go", "kubernetes"]
+    assert row["raw_description"] == "Run things"
+    assert str(row["application_deadline"]) == "2026-11-01"
+    assert row["status"] == "discovered"
+    assert posting_row({"title": "SRE", "company": "Acme", "status": "applied"})["content_hash"] == \
+        posting_row({"title": "SRE", "company": "Acme"})["content_hash"]
+
+    for bad in ([], {"company": "Acme"}, {"title": "SRE", "company": 3}, {"title": "SRE", "company": "Acme",
+                "salary_range": "lots"}, {"title": "SRE", "company": "Acme", "status": "hired"}):
+        with pytest.raises(ValueError):
+            posting_row(bad)
+
+
+def test_ingest_counts_and_upserts(session_factory):
+    lines = jsonl(
+        {"title": "SRE", "company": "Acme", "url": "https://acme.com/jobs/1", "required_skills": ["K8s"]},
+        {"title": "SRE", "company": "Acme", "url": "https://www.acme.com/jobs/1/?utm_source=feed",
+         "required_skills": ["K8s", "Go"]},
+        {"title": "Data", "company": "Acme", "url": "https://acme.com/jobs/2"},
+        {"title": "ML", "company": "Beta", "location": "Berlin"},
+    ) + ["not json\n", "\n", json.dumps({"company": "NoTitle"}) + "\n"]
+    progress = []
+
+    report = JobIngester(session_factory, batch_size=2).run(lines, progress=lambda r: progress.append(dict(r)))
+    assert {key: report[key] for key in ("received", "inserted", "updated", "unchanged", "duplicates", "invalid")} == {
+        "received": 6, "inserted": 3, "updated": 0, "unchanged": 0, "duplicates": 1, "invalid": 2,
+    }
+    assert report["errors"][0].startswith("line 5:")
+    assert report["rows_per_second"] > 0
+    assert progress and progress[0]["inserted"] == 2
+
+    db = session_factory()
+    sre = db.query(Job).filter(Job.title == "SRE").one()
+    assert sre.normalized_skills == ["go", "kubernetes"]  # The later duplicate won
+    assert sre.status == "discovered"
+    sre.status, sre.fit_score = "applied", 80
+    db.commit()
+    db.close()
+
+    report = JobIngester(session_factory).run(jsonl(
+        {"title": "SRE", "company": "Acme", "url": "http://acme.com/jobs/1", "required_skills": ["K8s", "Rust"]},
+        {"title": "Data", "company": "Acme", "url": "https://acme.com/jobs/2"},
+        {"title": "New", "company": "Acme", "url": "https://acme.com/jobs/3"},
+    ))
+    assert (report["inserted"], report["updated"], report["unchanged"]) == (1, 1, 1)
+
+    db = session_factory()
+    sre = db.query(Job).filter(Job.title == "SRE").one()
+    assert sre.required_skills == ["K8s", "Rust"]
+    assert sre.status == "applied"  # Kept across the update
+    assert sre.fit_score is None  # Cleared for rescoring
+    assert db.query(Job).count() == 4
+    db.close()
+
+
+def test_backfill_url_hashes_skips_duplicate_old_rows(session_factory):
+    db = session_factory()
+    db.add_all([
+        Job(title="SRE", company="Acme", url="https://acme.com/jobs/1"),
+        Job(title="SRE", company="Acme", url="https://acme.com/jobs/1?utm_source=x"),
+        Job(title="Data", company="Acme"),
+    ])
+    db.commit()
+    assert backfill_url_hashes(db, batch_size=2) == 2
+    assert backfill_url_hashes(db) == 0
+    assert db.query(Job).filter(Job.url_hash.is_(None)).count() == 1
+    db.close()
+
+    report = JobIngester(session_factory).run(jsonl({"title": "SRE", "company": "Acme", "url": "acme.com/jobs/1"}))
+    assert (report["inserted"], report["updated"]) == (0, 1)  # Old rows have no content_hash yet
+
+
+def test_postgres_upsert_statement():
+    rows = [posting_row({"title": "SRE", "company": "Acme", "url": "https://acme.com/1"})]
+    sql = str(upsert_statement(rows, "postgresql").compile(dialect=postgresql.psycopg2.dialect()))
+    assert "ON CONFLICT (url_hash) DO UPDATE" in sql
+    assert "WHERE jobs.content_hash IS DISTINCT FROM excluded.content_hash" in sql
+    assert "status" not in sql.split("DO UPDATE")[1]
+    assert sql.endswith("RETURNING jobs.url_hash, jobs.job_id")
@@ -0,0 +1,114 @@
+import copy
+import uuid
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import ResumeProfile, ResumeRawText, ResumeVersion
+from app.services.json_patch import InvalidPatch, apply_json_patch, apply_merge_patch
+from app.services.resume_service import ProfileVersionConflict, ResumeService
+
+
+@pytest.fixture
+def service():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[ResumeProfile.__table__, ResumeRawText.__table__, ResumeVersion.__table__])
+    session = sessionmaker(bind=engine)()
+    yield ResumeService(session)
+    session.close()
+
+
+def test_json_patch_follows_rfc_6902():
+    doc = {"foo": ["bar", "baz"], "a": {"b": 1}}
+    patched = apply_json_patch(doc, [
+        {"op": "add", "path": "/foo/1", "value": "qux"},
+        {"op": "add", "path": "/foo/-", "value": "end"},
+        {"op": "test", "path": "/a/b", "value": 1},
+        {"op": "move", "from": "/a/b", "path": "/c"},
+        {"op": "copy", "from": "/foo/0", "path": "/d"},
+        {"op": "replace", "path": "/foo/0", "value": "BAR"},
+        {"op": "remove", "path": "/a"},
+    ])
+
+    assert patched == {"foo": ["BAR", "qux", "baz", "end"], "c": 1, "d": "bar"}
+    assert doc == {"foo": ["bar", "baz"], "a": {"b": 1}}  # Input untouched
+    assert apply_json_patch({"a~b": {"c/d": 1}}, [{"op": "remove", "path": "/a~0b/c~1d"}]) == {"a~b": {}}
+
+
+@pytest.mark.parametrize("operations", [
+    [{"op": "test", "path": "/a", "value": 2}],
+    [{"op": "replace", "path": "/missing", "value": 1}],
+    [{"op": "remove", "path": "/list/5"}],
+    [{"op": "add", "path": "/list/3", "value": 1}],
+    [{"op": "move", "from": "/a", "path": "/a/b"}],
+    [{"op": "frobnicate", "path": "/a"}],
+    {"op": "add", "path": "/a", "value": 1},
+])
+def test_json_patch_rejects_failing_operations(operations):
+    with pytest.raises(InvalidPatch):
+        apply_json_patch({"a": 1, "list": [1]}, operations)
+
+
+def test_merge_patch_follows_rfc_7386():
+    doc = {"basics": {"name": "Jane", "email": "j@x.io"}, "skills": ["Go"], "meta": 1}
+    patch = {"basics": {"email": None, "phone": "555"}, "skills": ["Rust"], "meta": {"years": 3}}
+
+    assert apply_merge_patch(doc, patch) == {
+        "basics": {"name": "Jane", "phone": "555"}, "skills": ["Rust"], "meta": {"years": 3},
+    }
+
+
+def test_postgres_patch_is_one_guarded_update():
+    statement = ResumeService(None)._patch_statement(
+        uuid.uuid4(), [{"op": "replace", "path": "/basics/name", "value": "Jane"}], None, expected_version=4
+    )
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+
+    assert sql.startswith("WITH patch_0 AS")
+    assert "UPDATE resume_profiles SET content=patch_1.doc, version=(resume_profiles.version +" in sql
+    assert "resume_profiles.version = patch_1.version AND patch_1.doc IS NOT NULL" in sql
+    assert "jsonb_set(patch_0.doc" in sql
+    assert sql.rstrip().endswith("RETURNING resume_profiles.profile_name, resume_profiles.version, resume_profiles.content")
+
+
+def test_patches_bump_the_version_and_detect_conflicts(service):
+    profile = service.create_parsed_profile({
+        "basics": {"name": "Jane"},
+        "work_experience": [{"company": "Acme", "accomplishments": [{"raw_text": "Built the API"}]}],
+    })
+    profile_id = profile.profile_id
+    assert profile.version == 1
+
+    patched = service.patch_profile_content(profile_id, merge={"basics": {"email": "j@x.io"}}, expected_version=1)
+    assert patched["version"] == 2
+    assert patched["content"]["basics"] == {"name": "Jane", "email": "j@x.io"}
+
+    with pytest.raises(ProfileVersionConflict) as conflict:
+        service.patch_profile_content(profile_id, merge={"basics": {"name": "Tab 2"}}, expected_version=1)
+    assert conflict.value.current_version == 2
+
+    with pytest.raises(InvalidPatch):
+        service.patch_profile_content(profile_id, operations=[{"op": "remove", "path": "/nope"}])
+
+    with pytest.raises(ProfileVersionConflict):
+        service.update_profile_content(profile_id, {"skills": {}}, expected_version=1)
+
+
+def test_patching_a_bullet_marks_its_critique_stale(service):
+    profile = service.create_parsed_profile({
+        "basics": {"name": "Jane"},
+        "work_experience": [{"company": "Acme", "accomplishments": [{"raw_text": "Built the API"}]}],
+    })
+    content = copy.deepcopy(profile.content)
+    content["work_experience"][0]["accomplishments"][0]["critique"] = {"critique": "ok"}
+    service.update_profile_content(profile.profile_id, {"work_experience": content["work_experience"]})
+
+    patched = service.patch_profile_content(profile.profile_id, operations=[
+        {"op": "replace", "path": "/work_experience/0/accomplishments/0/raw_text", "value": "Rebuilt the API"},
+    ])
+    accomplishment = patched["content"]["work_experience"][0]["accomplishments"][0]
+    assert accomplishment["raw_text"] == "Rebuilt the API"
+    assert accomplishment["critique"] is None
@@ -0,0 +1,46 @@
+import json
+import random
+
+import pytest
+
+from app.services.json_stream import IncrementalSectionParser, section_events
+
+DOCUMENT = {
+    "basics": {"name": "Jane \"JD\" Doe", "summary": "Braces { } and brackets [ ] in text"},
+    "work_experience": [
+        {"company": "Acme", "accomplishments": [{"raw_text": "Cut costs 30%, saved $1M"}]},
+        {"company": "Initech", "accomplishments": []},
+    ],
+    "skills": {"languages": ["Python", "Go"]},
+    "certifications": [],
+    "languages": ["English", "Hindi \\ Urdu"],
+    "meta": {"years_experience": 7},
+    "note": None,
+}
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_events_match_document_for_any_chunking(seed):
+    rng = random.Random(seed)
+    text = json.dumps(DOCUMENT, indent=2)
+    parser = IncrementalSectionParser()
+
+    events = []
+    position = 0
+    while position < len(text):
+        size = rng.randint(1, 9)
+        events.extend(parser.feed(text[position:position + size]))
+        position += size
+
+    assert events == section_events(DOCUMENT)
+    assert parser.finish() == DOCUMENT
+
+
+def test_sections_are_emitted_as_soon_as_they_close():
+    parser = IncrementalSectionParser()
+
+    assert parser.feed('{"basics": {"name": "Jane"}, "work_experience": [{"company": "A"}') == [
+        ("section", "basics", {"name": "Jane"}),
+        ("item", "work_experience", 0, {"company": "A"}),
+    ]
+    assert parser.feed(', {"company": "B"}') == [("item", "work_experience", 1, {"company": "B"})]
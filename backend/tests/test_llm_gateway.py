@@ -0,0 +1,97 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+from app.services import llm_gateway
+from app.services.llm_gateway import LLMGateway
+
+
+def rate_limit_error(retry_after="0"):
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(429, headers={"retry-after": retry_after}, request=request)
+    return openai.RateLimitError("Rate limit reached", response=response, body=None)
+
+
+class FakeCompletions:
+    def __init__(self, failures=(), delay=0.0):
+        self.failures = list(failures)
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    async def create(self, stream=False, **kwargs):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.failures:
+                raise self.failures.pop(0)
+            if stream:
+                return self._stream()
+            return SimpleNamespace(content="ok", usage=SimpleNamespace(total_tokens=10))
+        finally:
+            with self.lock:
+                self.active -= 1
+
+    async def _stream(self):
+        for text in ("a", "b", "c"):
+            yield text
+
+
+def gateway(completions, **kwargs):
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return LLMGateway(client=client, **kwargs)
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(llm_gateway, "RETRY_BASE_SECONDS", 0.001)
+
+
+def test_retries_rate_limits_then_succeeds():
+    completions = FakeCompletions(failures=[rate_limit_error(), rate_limit_error()])
+    llm = gateway(completions)
+
+    assert llm.complete(model="m", messages=[]).content == "ok"
+    stats = llm.stats()
+    assert (stats["requests"], stats["retries"], stats["rate_limited"]) == (3, 2, 2)
+
+
+def test_gives_up_after_max_retries_and_does_not_retry_client_errors():
+    llm = gateway(FakeCompletions(failures=[rate_limit_error()] * 3), max_retries=2)
+    with pytest.raises(openai.RateLimitError):
+        llm.complete(model="m", messages=[])
+
+    bad_request = openai.BadRequestError(
+        "bad", response=httpx.Response(400, request=httpx.Request("POST", "http://x")), body=None
+    )
+    completions = FakeCompletions(failures=[bad_request])
+    with pytest.raises(openai.BadRequestError):
+        gateway(completions).complete(model="m", messages=[])
+    assert completions.failures == []
+
+
+def test_concurrency_is_capped():
+    completions = FakeCompletions(delay=0.02)
+    llm = gateway(completions, max_concurrency=3)
+
+    threads = [threading.Thread(target=llm.complete, kwargs={"model": "m", "messages": []}) for _ in range(12)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert completions.peak == 3
+    assert llm.stats()["requests"] == 12
+
+
+def test_stream_yields_chunks_in_order():
+    llm = gateway(FakeCompletions(failures=[rate_limit_error()]))
+    assert list(llm.stream(model="m", messages=[])) == ["a", "b", "c"]
+    assert llm.stats()["in_flight"] == 0
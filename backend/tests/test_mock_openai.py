@@ -0,0 +1,81 @@
+import json
+import os
+import sys
+
+import httpx
+import openai
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from benchmarks.loadgen import _bullet, build_request  # noqa: E402
+from benchmarks.mock_openai import CANNED_RESUME, MockConfig, create_app  # noqa: E402
+from app.services.llm_gateway import LLMGateway  # noqa: E402
+from app.services.star_prescreen import StarPrescreen  # noqa: E402
+
+INSTANT = dict(latency_ms=0, latency_sigma=0, tokens_per_second=0)
+
+
+def chat(client, **body):
+    body.setdefault("model", "gpt-4o")
+    return client.post("/v1/chat/completions", json=body)
+
+
+def test_json_requests_get_the_canned_resume():
+    client = TestClient(create_app(MockConfig(**INSTANT)))
+    response = chat(client, messages=[{"role": "user", "content": "resume"}], response_format={"type": "json_object"})
+
+    assert response.status_code == 200
+    content = response.json()["choices"][0]["message"]["content"]
+    assert json.loads(content) == CANNED_RESUME
+    assert response.json()["usage"]["completion_tokens"] > 0
+
+
+def test_dspy_requests_get_the_fields_they_ask_for():
+    client = TestClient(create_app(MockConfig(**INSTANT)))
+    system = "Your output fields are: [[ ## refined_bullet ## ]] [[ ## improvement_reason ## ]]"
+    response = chat(client, messages=[{"role": "system", "content": system}, {"role": "user", "content": "x"}])
+
+    content = response.json()["choices"][0]["message"]["content"]
+    assert "[[ ## refined_bullet ## ]]" in content
+    assert "[[ ## missing_star_components ## ]]" not in content
+    assert content.endswith("[[ ## completed ## ]]")
+
+
+def test_injected_rate_limits_carry_retry_after():
+    client = TestClient(create_app(MockConfig(rate_limit_rate=1.0, retry_after_seconds=2, **INSTANT)))
+    response = chat(client, messages=[{"role": "user", "content": "x"}])
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "2"
+    assert client.get("/stats").json()["rate_limited"] == 1
+
+
+def test_gateway_round_trip_through_the_mock():
+    transport = httpx.ASGITransport(app=create_app(MockConfig(**INSTANT)))
+    client = openai.AsyncOpenAI(
+        api_key="mock", base_url="http://mock/v1", max_retries=0,
+        http_client=httpx.AsyncClient(transport=transport),
+    )
+    gateway = LLMGateway(client=client)
+
+    completion = gateway.complete(
+        model="gpt-4o", messages=[{"role": "user", "content": "x"}], response_format={"type": "json_object"},
+    )
+    assert json.loads(completion.choices[0].message.content)["basics"]["name"] == "Alex Mock"
+
+    streamed = "".join(
+        chunk.choices[0].delta.content or ""
+        for chunk in gateway.stream(
+            model="gpt-4o", messages=[{"role": "user", "content": "x"}], response_format={"type": "json_object"},
+        )
+        if chunk.choices
+    )
+    assert json.loads(streamed) == CANNED_RESUME
+
+
+def test_loadgen_bullets_reach_the_model():
+    bullets = [_bullet(sequence, unique=True) for sequence in range(1, 200)]
+    assert len(set(bullets)) == len(bullets)
+    assert StarPrescreen().screen(bullets) == [None] * len(bullets)
+    assert build_request("upload", 3, unique=True)["files"]["file"][1].startswith(b"%PDF")
@@ -0,0 +1,110 @@
+import json
+import random
+from datetime import datetime
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import Job
+from app.services import near_duplicates as near_duplicates_module
+from app.services import skills as skills_module
+from app.services.job_ingestion import JobIngester
+from app.services.near_duplicates import (
+    NearDuplicateIndex, cluster_all_jobs, minhash, shingles, signature_bytes, signature_from_bytes, similarity,
+)
+
+VOCABULARY = (
+    "python kubernetes build scale team platform data pipelines services customers design review "
+    "deploy observe latency reliability on call mentor ship product roadmap cloud security api"
+).split()
+
+
+def description(seed: int, words: int = 120) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+
+def reworded(text: str, changes: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    words = text.split()
+    for position in rng.sample(range(len(words)), changes):
+        words[position] = "zzz"
+    return " ".join(words)
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    monkeypatch.setattr(skills_module, "_index_instance", None)
+    monkeypatch.setattr(near_duplicates_module, "_index_instance", None)
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Job.__table__])
+    return sessionmaker(bind=engine)
+
+
+def test_minhash_estimates_jaccard():
+    original = description(1)
+    for changes in (1, 5, 20):
+        copy = reworded(original, changes)
+        first, second = set(shingles(original)), set(shingles(copy))
+        exact = len(first & second) / len(first | second)
+        assert similarity(minhash(original), minhash(copy)) == pytest.approx(exact, abs=0.12)
+
+    assert minhash("Apply on our site") is None
+    signature = minhash(original)
+    assert signature.dtype == np.uint32
+    assert np.array_equal(signature_from_bytes(signature_bytes(signature)), signature)
+    assert signature_from_bytes(b"short") is None
+
+
+def test_index_finds_reposts_and_points_at_the_canonical_job():
+    index = NearDuplicateIndex(threshold=0.8)
+    original = description(1)
+    index.add("a", minhash(original))
+    index.add("b", minhash(reworded(original, 1)), canonical_id="a")
+    index.add("c", minhash(description(2)))
+
+    assert index.canonical_for(minhash(reworded(original, 2, seed=3))) == "a"
+    assert index.canonical_for(minhash(description(3))) is None
+    assert index.canonical_for(minhash(original), job_id="a") is None  # Not a duplicate of its own cluster
+    index.remove("a")
+    index.remove("b")
+    assert index.canonical_for(minhash(original)) is None
+    assert index.stats()["jobs"] == 1
+
+
+def test_ingestion_marks_near_duplicates(session_factory):
+    original = description(1)
+    postings = [
+        {"title": "SRE", "company": "Acme", "url": "https://boarda.com/1", "raw_description": original},
+        {"title": "Site Reliability Engineer", "company": "Acme", "url": "https://boardb.com/x",
+         "raw_description": reworded(original, 2)},
+        {"title": "Data", "company": "Acme", "url": "https://boarda.com/2", "raw_description": description(2)},
+        {"title": "Short", "company": "Acme", "url": "https://boarda.com/3", "raw_description": "Apply now"},
+    ]
+    report = JobIngester(session_factory, batch_size=2).run(json.dumps(posting) + "\n" for posting in postings)
+    assert report["inserted"] == 4
+    assert report["near_duplicates"] == 1
+
+    db = session_factory()
+    jobs = {job.title: job for job in db.query(Job)}
+    assert jobs["Site Reliability Engineer"].duplicate_of == jobs["SRE"].job_id
+    assert jobs["SRE"].duplicate_of is None and jobs["Data"].duplicate_of is None
+    assert jobs["Short"].minhash is None
+
+    # Downstream only sees the canonical job
+    skills_module.get_skill_index().refresh(db)
+    assert len(skills_module.get_skill_index().job_ids) == 3
+
+    # A full rebuild reaches the same clusters, led by the earliest posting
+    db.query(Job).update({Job.duplicate_of: None, Job.minhash: None})
+    db.query(Job).filter(Job.title == "SRE").update({Job.discovered_date: datetime(2026, 1, 1)})
+    db.commit()
+    result = cluster_all_jobs(db, batch_size=2)
+    assert (result["signed"], result["indexed"], result["duplicates"], result["changed"]) == (3, 3, 1, 1)
+    db.expire_all()
+    duplicate = db.get(Job, jobs["Site Reliability Engineer"].job_id)
+    assert duplicate.duplicate_of == jobs["SRE"].job_id
+    db.close()
@@ -0,0 +1,152 @@
+import math
+import random
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import Network
+from app.services import network_graph as network_graph_module
+from app.services.network_graph import NetworkGraph, normalize_company, strength_cost
+
+
+def person(name, strength=None, company=None, intros=(), works_at=None, updated_at=None, person_id=None):
+    return SimpleNamespace(
+        person_id=person_id or uuid.uuid4(), name=name, current_company=company,
+        relationship_strength=strength, can_introduce_to=list(intros), works_at_companies=works_at,
+        updated_at=updated_at,
+    )
+
+
+def small_network():
+    carol = person("Carol", company="Acme, Inc.")
+    alice = person("Alice", 90, intros=[{"person_id": str(carol.person_id), "strength": 80}])
+    bob = person("Bob", 40, works_at=["ACME"])
+    dave = person("Dave", company="Acme")  # Nobody can introduce Dave
+    return alice, bob, carol, dave
+
+
+def test_normalize_company():
+    assert normalize_company(" Acme,  Inc. ") == normalize_company("acme") == "acme"
+    assert normalize_company("Globex Corporation") == "globex"
+    assert strength_cost(100) == 0 and strength_cost(0) is None and strength_cost("x") is None
+
+
+def test_strongest_paths_end_at_different_insiders():
+    alice, bob, carol, dave = small_network()
+    graph = NetworkGraph()
+    graph.build([alice, bob, carol, dave])
+
+    paths = graph.intro_paths("ACME inc", k=3)
+    assert [path["strength"] for path in paths] == [72.0, 40.0]
+    assert [hop["name"] for hop in paths[0]["path"]] == ["Alice", "Carol"]
+    assert paths[0]["path"][1]["person_id"] == str(carol.person_id)
+    assert paths[1]["hops"] == 1
+    assert graph.intro_paths("acme", k=1) == paths[:1]
+    assert graph.intro_paths("Initech") == []
+
+
+def reference_paths(rows, company, k):
+    """Bellman-Ford over the same edges, then the best k insiders."""
+    edges = []
+    for row in rows:
+        if strength_cost(row.relationship_strength) is not None:
+            edges.append(("me", str(row.person_id), strength_cost(row.relationship_strength)))
+        for entry in row.can_introduce_to:
+            edges.append((str(row.person_id), entry["person_id"], strength_cost(entry["strength"])))
+    distance = {"me": 0.0}
+    for _ in range(len(rows) + 1):
+        for source, target, cost in edges:
+            if source in distance and distance[source] + cost < distance.get(target, math.inf):
+                distance[target] = distance[source] + cost
+    insiders = [
+        distance[str(row.person_id)] for row in rows
+        if str(row.person_id) in distance and normalize_company(row.current_company or "") == company
+    ]
+    return [round(100 * math.exp(-cost), 1) for cost in sorted(insiders)[:k]]
+
+
+def random_network(count, seed):
+    rng = random.Random(seed)
+    rows = [person(f"P{i}", company=rng.choice(["Acme", "Globex", "Initech", None])) for i in range(count)]
+    for row in rows:
+        row.relationship_strength = rng.choice([None, None, 0, rng.randint(1, 100)])
+        row.can_introduce_to = [
+            {"person_id": str(rng.choice(rows).person_id), "strength": rng.randint(1, 100)}
+            for _ in range(rng.randint(0, 4))
+        ]
+    return rows
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_paths_match_a_reference_search(seed):
+    rows = random_network(150, seed)
+    graph = NetworkGraph()
+    graph.build(rows)
+    for company in ("acme", "globex"):
+        assert [path["strength"] for path in graph.intro_paths(company, k=5)] == reference_paths(rows, company, 5)
+
+
+def test_incremental_updates_match_a_rebuild(monkeypatch):
+    monkeypatch.setattr(network_graph_module, "NETWORK_GRAPH_COMPACT_FRACTION", 10.0)  # Keep the overlay
+    rows = random_network(120, seed=7)
+    graph = NetworkGraph()
+    graph.build(rows)
+
+    rng = random.Random(8)
+    changed = rng.sample(rows, 10)
+    for row in changed:
+        row.relationship_strength = rng.randint(1, 100)
+        row.can_introduce_to.append({"person_id": str(rng.choice(rows).person_id), "strength": 95})
+    newcomer = person("New", 100, company="Acme")
+    graph.apply(changed + [newcomer])
+    removed = rows.pop(0)
+    graph.remove([removed.person_id])
+    touched = {row.person_id for row in changed} | {removed.person_id}
+    assert graph.stats()["overlay_nodes"] == len(touched) + 2  # Plus the newcomer and me
+
+    rebuilt = NetworkGraph()
+    rebuilt.build(rows + [newcomer])
+    # The removed person's node has no edges left but intros may still point at it
+    assert graph.intro_paths("acme", k=5) == rebuilt.intro_paths("acme", k=5)
+    assert graph.intro_paths("acme", k=1)[0]["path"][0]["name"] == "New"
+
+    edges = graph.stats()["edges"]
+    graph.compact()
+    assert graph.stats()["overlay_nodes"] == 0
+    assert graph.stats()["edges"] == edges
+    assert graph.intro_paths("globex", k=5) == rebuilt.intro_paths("globex", k=5)
+
+
+def test_refresh_pulls_changed_rows_and_reloads_after_deletes(monkeypatch):
+    monkeypatch.setattr(network_graph_module, "NETWORK_GRAPH_SYNC_SECONDS", 0)
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Network.__table__])
+    db = sessionmaker(bind=engine)()
+    start = datetime(2026, 1, 1)
+    alice, bob, carol, dave = small_network()
+    for index, row in enumerate((alice, bob, carol, dave)):
+        row.updated_at = start + timedelta(minutes=index)
+        db.add(Network(**vars(row)))
+    db.commit()
+
+    graph = NetworkGraph()
+    graph.refresh(db)
+    assert len(graph.intro_paths("acme")) == 2
+
+    erin = Network(name="Erin", relationship_strength=100, current_company="Acme", updated_at=start + timedelta(hours=1))
+    db.add(erin)
+    db.commit()
+    graph.refresh(db)
+    assert graph.intro_paths("acme", k=1)[0]["path"][0]["name"] == "Erin"
+
+    db.delete(erin)
+    db.commit()
+    graph.refresh(db)
+    assert [path["strength"] for path in graph.intro_paths("acme")] == [72.0, 40.0]
+    assert graph.stats()["people"] == 4
+    db.close()
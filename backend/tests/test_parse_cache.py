@@ -0,0 +1,63 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy.exc import OperationalError
+
+from app.services.cache import LRUCache
+from app.services.parse_cache import ParseCache, hash_text
+
+
+def unavailable_db():
+    raise OperationalError("SELECT 1", {}, Exception("database is down"))
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_respects_size_budget():
+    cache = LRUCache(max_entries=10, max_size=10, size_of=len)
+    cache.put("a", "12345")
+    cache.put("b", "123456")
+
+    assert "a" not in cache
+    assert cache.stats()["size"] == 6
+
+
+def test_text_hash_ignores_reexport_noise():
+    original = "Jane Doe\nSenior Engineer\n\n--- Page 2 ---\n\nPublications"
+    reexported = "Jane  Doe\nSenior Engineer\nPublications  "
+
+    assert hash_text(original) == hash_text(reexported)
+    assert hash_text(original) != hash_text("Jane Doe\nStaff Engineer\nPublications")
+
+
+def test_memory_tier_hits_without_database():
+    cache = ParseCache("gpt-4o", "v1", session_factory=unavailable_db)
+    content = {"basics": {"name": "Jane Doe"}}
+
+    cache.put("pdf-hash", "text-hash", content, "raw text")
+    hit = cache.get_by_pdf("pdf-hash")
+    hit["content"]["basics"]["name"] = "Mutated"
+
+    assert cache.get_by_text("text-hash")["content"] == content
+    assert cache.get_by_pdf("other-hash") is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["db"]["errors"] == 2
+
+
+def test_database_counters_are_exact_under_concurrency():
+    cache = ParseCache("gpt-4o", "v1", session_factory=unavailable_db)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(cache.get_by_text, [f"missing-{i}" for i in range(400)]))
+    assert cache.stats()["db"]["misses"] == cache.stats()["db"]["errors"] == 400
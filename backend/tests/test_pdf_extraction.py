@@ -0,0 +1,58 @@
+import os
+import sys
+from io import BytesIO
+
+import pytest
+from pypdf import PdfReader
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from app.services.pdf_parser import _iter_clean_lines, _iter_text_parts, extract_text  # noqa: E402
+from benchmarks.pdf_fixtures import academic_cv_pages, build_text_pdf  # noqa: E402
+
+
+def legacy_extract(pdf_bytes: bytes) -> str:
+    """The original list-based implementation, kept as the reference output."""
+    reader = PdfReader(BytesIO(pdf_bytes))
+    return legacy_clean([page.extract_text() for page in reader.pages])
+
+
+def legacy_clean(page_texts) -> str:
+    text_parts = []
+    for i, text in enumerate(page_texts):
+        if text:
+            text = text.strip()
+            if i > 0:
+                text_parts.append(f"\n--- Page {i + 1} ---\n")
+            text_parts.append(text)
+
+    cleaned_lines = []
+    for line in "\n".join(text_parts).split('\n'):
+        stripped = line.strip()
+        if stripped:
+            cleaned_lines.append(stripped)
+        elif cleaned_lines and cleaned_lines[-1]:
+            cleaned_lines.append('')
+    return '\n'.join(cleaned_lines)
+
+
+@pytest.mark.parametrize("page_texts", [
+    [],
+    [None, "", "  "],
+    ["Jane Doe\n\n\n  Engineer  \r\n\tSkills\n"],
+    ["", "starts on page two", None, "\n\nlast page\n\n"],
+    ["a\n \n\nb", "  c\x0cd  ", "e f"],
+])
+def test_streaming_cleanup_matches_legacy(page_texts):
+    streamed = "\n".join(_iter_clean_lines(_iter_text_parts(page_texts)))
+    assert streamed == legacy_clean(page_texts)
+
+
+def test_serial_extraction_is_byte_identical():
+    pdf_bytes = build_text_pdf(academic_cv_pages(6, lines_per_page=20) + [[]] + [["Awards"]])
+    assert extract_text(pdf_bytes, parallel=False) == legacy_extract(pdf_bytes)
+
+
+def test_parallel_extraction_is_byte_identical():
+    pdf_bytes = build_text_pdf(academic_cv_pages(9, lines_per_page=20))
+    assert extract_text(pdf_bytes, parallel=True) == legacy_extract(pdf_bytes)
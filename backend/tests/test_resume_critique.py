@@ -0,0 +1,82 @@
+import copy
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import ResumeProfile, ResumeRawText, ResumeVersion
+from app.services.resume_service import ResumeService, iter_accomplishments
+
+
+class FakeGuide:
+    def __init__(self):
+        self.calls = []
+
+    def critique_many(self, texts, domain="General", experience=5):
+        self.calls.append(list(texts))
+        for text in texts:
+            yield " ".join(text.split()), {"missing_components": ["Result"], "critique": f"weak: {text}", "question": "?"}, None
+
+
+def bullets(*texts):
+    return [{"raw_text": text, "tags": []} for text in texts]
+
+
+@pytest.fixture
+def service():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[ResumeProfile.__table__, ResumeRawText.__table__, ResumeVersion.__table__])
+    session = sessionmaker(bind=engine)()
+    yield ResumeService(session)
+    session.close()
+
+
+def test_only_edited_bullets_are_recritiqued(service):
+    profile = service.create_parsed_profile({
+        "basics": {"name": "Jane"},
+        "meta": {"primary_domain": "Backend", "years_experience": 7},
+        "work_experience": [{"company": "Acme", "accomplishments": bullets("Built the API", "Ran on-call", "Wrote docs")}],
+    })
+    guide = FakeGuide()
+
+    first = service.critique_stale_bullets(profile.profile_id, guide)
+    assert guide.calls == [["Built the API", "Ran on-call", "Wrote docs"]]
+    assert first["remaining_stale"] == 0
+
+    # Client edits one bullet, reorders, and drops the server's fields
+    work = copy.deepcopy(service.db.get(ResumeProfile, profile.profile_id).content["work_experience"])
+    work[0]["accomplishments"] = bullets("Wrote  docs", "Built the API", "Ran on-call for 40 services")
+    updated = service.update_profile_content(profile.profile_id, {"work_experience": work})
+
+    critiques = {a["raw_text"]: a["critique"] for _, a in iter_accomplishments(updated["content"])}
+    assert critiques["Wrote  docs"]["critique"] == "weak: Wrote docs"  # Whitespace-only edit
+    assert critiques["Built the API"] is not None
+    assert critiques["Ran on-call for 40 services"] is None
+
+    second = service.critique_stale_bullets(profile.profile_id, guide)
+    assert guide.calls[-1] == ["Ran on-call for 40 services"]
+    assert [r["path"] for r in second["results"]] == ["work_experience[0].accomplishments[2]"]
+    assert second["results"][0]["result"]["source"] == "llm"
+    assert second["remaining_stale"] == 0
+
+    service.critique_stale_bullets(profile.profile_id, guide)
+    assert guide.calls[-1] == []
+
+
+def test_results_skip_bullets_edited_during_the_critique(service):
+    profile = service.create_parsed_profile({
+        "basics": {"name": "Jane"},
+        "work_experience": [{"company": "Acme", "accomplishments": bullets("Built the API")}],
+    })
+
+    class EditingGuide(FakeGuide):
+        def critique_many(self, texts, domain="General", experience=5):
+            service.update_profile_content(profile.profile_id, {
+                "work_experience": [{"company": "Acme", "accomplishments": bullets("Rebuilt the API")}],
+            })
+            yield from super().critique_many(texts, domain, experience)
+
+    outcome = service.critique_stale_bullets(profile.profile_id, EditingGuide())
+    assert outcome["results"] == []
+    assert outcome["remaining_stale"] == 1
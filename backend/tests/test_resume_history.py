@@ -0,0 +1,82 @@
+import copy
+import random
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import ResumeProfile, ResumeRawText, ResumeVersion
+from app.services import resume_history
+from app.services.json_patch import apply_json_patch
+from app.services.resume_history import diff_documents
+from app.services.resume_service import ResumeService
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(resume_history, "RESUME_SNAPSHOT_INTERVAL", 5)
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[ResumeProfile.__table__, ResumeRawText.__table__, ResumeVersion.__table__])
+    session = sessionmaker(bind=engine)()
+    yield ResumeService(session)
+    session.close()
+
+
+def random_document(rng, depth=0):
+    if depth > 2 or rng.random() < 0.3:
+        return rng.choice([1, "a", "b", None, True, [1, 2], {"x": 1}])
+    if rng.random() < 0.5:
+        return [random_document(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+    return {rng.choice("abcde/~"): random_document(rng, depth + 1) for _ in range(rng.randint(0, 4))}
+
+
+def test_diff_round_trips():
+    rng = random.Random(3)
+    for _ in range(500):
+        old, new = random_document(rng), random_document(rng)
+        assert apply_json_patch(old, diff_documents(old, new)) == new
+
+
+def test_single_bullet_edit_is_a_single_operation():
+    old = {"work_experience": [{"accomplishments": [{"raw_text": t} for t in "abcdef"]}]}
+    new = copy.deepcopy(old)
+    new["work_experience"][0]["accomplishments"].insert(2, {"raw_text": "x"})
+
+    assert diff_documents(old, new) == [
+        {"op": "add", "path": "/work_experience/0/accomplishments/2", "value": {"raw_text": "x"}}
+    ]
+
+
+def test_any_version_is_rebuilt_from_a_nearby_snapshot(service):
+    profile = service.create_parsed_profile({"basics": {"name": "Jane"}, "skills": {"core": []}})
+    expected = {1: copy.deepcopy(profile.content)}
+    for step in range(2, 13):
+        if step % 3:
+            skills = expected[step - 1]["skills"]["core"] + [f"skill-{step}"]
+            updated = service.update_profile_content(profile.profile_id, {"skills": {"core": skills}})
+            assert updated["version"] == step
+            expected[step] = copy.deepcopy(updated["content"])
+        else:
+            patched = service.patch_profile_content(profile.profile_id, merge={"basics": {"headline": f"v{step}"}})
+            expected[step] = patched["content"]
+
+    history = service.list_versions(profile.profile_id)
+    assert [entry["version"] for entry in history] == list(range(12, 0, -1))
+    assert [entry["version"] for entry in history if entry["snapshot"]] == [11, 6, 1]
+    assert history[0]["sections_modified"] == ["basics"]
+    assert history[1]["sections_modified"] == ["skills"]
+
+    for version, content in expected.items():
+        assert service.get_version(profile.profile_id, version) == content
+    assert service.get_version(profile.profile_id, 99) is None
+
+
+def test_restore_is_a_new_version(service):
+    profile = service.create_parsed_profile({"basics": {"name": "Jane"}})
+    service.update_profile_content(profile.profile_id, {"basics": {"name": "Typo"}})
+
+    restored = service.restore_version(profile.profile_id, 1)
+    assert restored.version == 3
+    assert restored.content == {"basics": {"name": "Jane"}}
+    assert service.get_version(profile.profile_id, 2) == {"basics": {"name": "Typo"}}
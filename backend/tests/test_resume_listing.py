@@ -0,0 +1,80 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import ResumeProfile
+from app.services.resume_service import ResumeService
+
+
+@pytest.fixture
+def service():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[ResumeProfile.__table__])
+    session = sessionmaker(bind=engine)()
+    yield ResumeService(session)
+    session.close()
+
+
+def add_profiles(service, count, owner_id=None):
+    start = datetime(2026, 1, 1)
+    for i in range(count):
+        service.db.add(ResumeProfile(
+            profile_name=f"p{i}",
+            content={"basics": {}},
+            owner_id=owner_id,
+            created_at=start + timedelta(hours=i // 3),  # Ties exercise the profile_id tie-break
+            is_active=i % 7 != 0,
+        ))
+    service.db.commit()
+
+
+def collect(service, limit, owner_id=None):
+    names, cursor, pages = [], None, 0
+    while True:
+        rows, cursor = service.list_profiles(limit=limit, cursor=cursor, owner_id=owner_id)
+        names.extend(row.profile_name for row in rows)
+        pages += 1
+        if cursor is None:
+            return names, pages
+
+
+def test_pages_cover_active_profiles_once_newest_first(service):
+    add_profiles(service, 25)
+    expected = [
+        row.profile_name for row in service.db.query(ResumeProfile).filter(ResumeProfile.is_active.is_(True))
+        .order_by(ResumeProfile.created_at.desc(), ResumeProfile.profile_id.desc())
+    ]
+
+    names, pages = collect(service, limit=4)
+    assert names == expected
+    assert len(expected) == 21 and pages == 6
+
+
+def test_listing_filters_by_owner_and_rejects_bad_input(service):
+    owner = uuid.uuid4()
+    add_profiles(service, 6, owner_id=owner)
+    add_profiles(service, 5)
+
+    names, _ = collect(service, limit=50, owner_id=owner)
+    assert sorted(names) == ["p1", "p2", "p3", "p4", "p5"]
+
+    with pytest.raises(ValueError):
+        service.list_profiles(cursor="not-a-cursor")
+    with pytest.raises(ValueError):
+        service.list_profiles(limit=0)
+
+
+def test_listing_never_selects_content(service):
+    statements = []
+    from sqlalchemy import event
+    event.listen(service.db.get_bind(), "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    add_profiles(service, 3)
+    statements.clear()
+
+    service.list_profiles(limit=2)
+    assert len(statements) == 1 and "content" not in statements[0]
@@ -0,0 +1,58 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import ResumeProfile, ResumeRawText, ResumeVersion
+from app.services.resume_service import ResumeService, parse_fields
+
+
+@pytest.fixture
+def service():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[ResumeProfile.__table__, ResumeRawText.__table__, ResumeVersion.__table__])
+    session = sessionmaker(bind=engine)()
+    yield ResumeService(session)
+    session.close()
+
+
+def test_raw_text_is_stored_outside_the_document(service):
+    profile = service.create_parsed_profile({"basics": {"name": "Jane"}, "_raw_text": "Jane Doe\nEngineer"})
+
+    assert "_raw_text" not in profile.content
+    assert service.get_raw_text(profile.profile_id) == "Jane Doe\nEngineer"
+
+    service.update_profile_content(profile.profile_id, {"_raw_text": "overwrite", "skills": {"core": ["Go"]}})
+    assert "_raw_text" not in profile.content
+    assert service.get_raw_text(profile.profile_id) == "Jane Doe\nEngineer"
+
+
+def test_projection_returns_only_requested_paths(service):
+    profile = service.create_parsed_profile({
+        "basics": {"name": "Jane"},
+        "skills": {"core": ["Go"]},
+        "meta": {"years_experience": 7, "core_archetype": "Builder"},
+        "work_experience": [{"company": "Acme"}],
+    })
+
+    name, content, version = service.get_projected_content(
+        profile.profile_id, parse_fields("basics, meta.years_experience,missing")
+    )
+    assert (name, version) == ("Jane", 1)
+    assert content == {"basics": {"name": "Jane"}, "meta": {"years_experience": 7}}
+
+
+@pytest.mark.parametrize("fields", ["", "basics;drop", "meta..x", "1abc"])
+def test_parse_fields_rejects_malformed_names(fields):
+    with pytest.raises(ValueError):
+        parse_fields(fields)
+
+
+def test_move_raw_text_out_migrates_old_profiles(service):
+    legacy = ResumeProfile(profile_name="Legacy", content={"basics": {}, "_raw_text": "old text"})
+    service.db.add(legacy)
+    service.db.commit()
+
+    assert service.move_raw_text_out(batch_size=1) == 1
+    assert legacy.content == {"basics": {}}
+    assert service.get_raw_text(legacy.profile_id) == "old text"
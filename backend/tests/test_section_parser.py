@@ -0,0 +1,123 @@
+import json
+import threading
+from datetime import date
+
+from app.services.section_parser import (
+    SectionedResumeParser, compute_years_experience, detect_heading, parse_date_range, split_sections
+)
+
+RESUME_TEXT = """Jane Doe
+jane@example.com
+
+PROFESSIONAL EXPERIENCE
+Acme Corp — Staff Engineer
+Jan 2020 - Present
+Led migration to Kubernetes
+
+Education:
+MIT, BS Computer Science
+
+Skills & Tools
+Python, Go
+
+Selected Publications
+Doe, J. Scalable Systems. VLDB 2019."""
+
+SCHEMA = {
+    "basics": {"name": "Full Name"},
+    "work_experience": [{"company": "Company Name", "dates": "Start - End"}],
+    "education": [{"institution": "University"}],
+    "skills": {"languages": []},
+    "publications": [{"title": "Title"}],
+    "projects": [],
+    "meta": {"core_archetype": "IC", "primary_domain": "Backend"},
+}
+
+
+def test_detect_heading_variants():
+    assert detect_heading("PROFESSIONAL EXPERIENCE") == "work_experience"
+    assert detect_heading("  Education: ") == "education"
+    assert detect_heading("Skills & Tools") == "skills"
+    assert detect_heading("Led migration to Kubernetes") is None
+    assert detect_heading("Experience building distributed systems across three continents") is None
+
+
+def test_split_sections_keeps_header_in_basics():
+    sections = split_sections(RESUME_TEXT)
+
+    assert sections["basics"].startswith("Jane Doe")
+    assert "Acme Corp" in sections["work_experience"]
+    assert "VLDB" in sections["publications"]
+    assert set(sections) == {"basics", "work_experience", "education", "skills", "publications"}
+
+
+def test_years_experience_merges_overlapping_roles():
+    today = date(2024, 12, 15)
+    roles = [
+        {"dates": "Jan 2020 - Present"},
+        {"dates": "06/2021 – 12/2022"},   # Overlaps the first role
+        {"dates": "2015 - 2017"},
+        {"dates": "Summer internship"},
+    ]
+
+    assert parse_date_range("Jan 2020 - Present", today) == (2020 * 12, 2024 * 12 + 12)
+    assert compute_years_experience(roles, today) == 8
+
+
+def test_sectioned_parse_runs_groups_concurrently_and_merges():
+    calls = []
+    barrier = threading.Barrier(4, timeout=5)
+
+    def complete(system_prompt, user_prompt, max_tokens):
+        calls.append(system_prompt)
+        barrier.wait()  # Every group request is in flight at once
+        if "RESUME EXCERPT START---\nJane Doe" in user_prompt:
+            return {"basics": {"name": "Jane Doe"}, "skills": {"languages": ["Python", "Go"]}}
+        if "Acme" in user_prompt:
+            return {
+                "work_experience": [{"company": "Acme Corp", "dates": "Jan 2020 - Dec 2023"}],
+                "meta": {"core_archetype": "Technical Leader", "primary_domain": "Infrastructure"},
+            }
+        if "MIT" in user_prompt:
+            return {"education": [{"institution": "MIT"}]}
+        return {"publications": [{"title": "Scalable Systems"}], "projects": []}
+
+    parser = SectionedResumeParser(complete, SCHEMA, "PREAMBLE\n", "\n\nRULES")
+    result = parser.parse(RESUME_TEXT)
+
+    assert len(calls) == 4
+    assert all("years_experience" not in prompt for prompt in calls)
+    assert result["basics"]["name"] == "Jane Doe"
+    assert result["education"] == [{"institution": "MIT"}]
+    assert result["projects"] == []
+    assert result["meta"] == {
+        "years_experience": 4,
+        "core_archetype": "Technical Leader",
+        "primary_domain": "Infrastructure",
+    }
+    json.dumps(result)
+
+
+def test_sectioned_parse_declines_unstructured_text():
+    parser = SectionedResumeParser(lambda *a: {}, SCHEMA, "", "")
+    assert parser.parse("Jane Doe\nDid many things") is None
+
+
+def test_full_document_parse_computes_years_experience(monkeypatch):
+    from app.services import pdf_parser
+
+    monkeypatch.setattr(pdf_parser, "PARSE_MODE", "single")
+    parser = pdf_parser.PDFParserService(cache=False, llm=object())
+    prompts = []
+
+    def complete(system_prompt, user_prompt, max_tokens):
+        prompts.append(system_prompt)
+        return {
+            "work_experience": [{"dates": "2015 - 2017"}, {"dates": "2016 - 2019"}],
+            "meta": {"years_experience": 30, "core_archetype": "IC"},
+        }
+
+    monkeypatch.setattr(parser, "_complete_json", complete)
+    result = parser.parse_resume_to_json("Jane Doe")
+    assert result["meta"] == {"years_experience": 5, "core_archetype": "IC"}  # 2015 through 2019
+    assert "years_experience" not in prompts[0]
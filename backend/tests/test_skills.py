@@ -0,0 +1,125 @@
+import random
+import uuid
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import Job
+from app.services import skills as skills_module
+from app.services.skills import (
+    SkillIndex, backfill_normalized_skills, find_jobs, jobs_with_skills_clause, profile_skills,
+)
+from app.skill_names import normalize_skill, normalize_skills
+
+
+def test_aliases_map_to_one_spelling():
+    assert normalize_skill(" K8s ") == "kubernetes"
+    assert normalize_skill("Postgres") == normalize_skill("PostgreSQL") == "postgresql"
+    assert normalize_skill("React.js") == "react"
+    assert normalize_skill("Machine   Learning") == "machine learning"
+    assert normalize_skills(["Golang", "go", "", None, "Python3"]) == ["go", "python"]
+    assert normalize_skills("python") == []
+
+
+def test_profile_skills_include_accomplishment_tags():
+    content = {
+        "skills": {"languages": ["Python", "JS"], "cloud": ["Amazon Web Services"]},
+        "work_experience": [
+            {"accomplishments": [{"text": "Moved to k8s", "tags": ["K8s", "Helm"]}, "plain bullet"]},
+            "not a job",
+        ],
+    }
+    assert profile_skills(content) == {"python", "javascript", "aws", "kubernetes", "helm"}
+
+
+def test_job_keeps_normalized_skills_in_step():
+    job = Job(title="SRE", company="Acme", required_skills=["K8s", "Terraform"])
+    assert job.normalized_skills == ["kubernetes", "terraform"]
+    job.required_skills = ["Postgres"]
+    assert job.normalized_skills == ["postgresql"]
+
+
+def random_jobs(count, seed=5):
+    rng = random.Random(seed)
+    vocabulary = ["Python", "Go", "K8s", "Kubernetes", "Postgres", "AWS", "React", "Rust", "Kafka", "Spark"]
+    return [(uuid.uuid4(), rng.sample(vocabulary, rng.randint(0, 5))) for _ in range(count)]
+
+
+@pytest.mark.parametrize("query", [["kubernetes"], ["python", "go"], ["k8s", "postgres", "kafka"], ["cobol"], []])
+def test_index_matches_a_full_scan(query):
+    jobs = random_jobs(500)
+    index = SkillIndex()
+    index.build(jobs)
+    wanted = set(normalize_skills(query))
+
+    def scan(require_all):
+        found = []
+        for job_id, job_skills in jobs:
+            have = set(normalize_skills(job_skills))
+            if wanted and (wanted <= have if require_all else wanted & have):
+                found.append(job_id)
+        return found
+
+    assert index.match(query, "any") == scan(False)
+    assert index.match(query, "all") == scan(True)
+
+    ranked = index.rank(query)
+    expected = {job_id: len(wanted & set(normalize_skills(s))) for job_id, s in jobs}
+    assert [count for _, count in ranked] == sorted((count for count in expected.values() if count), reverse=True)
+    assert all(expected[job_id] == count for job_id, count in ranked)
+
+
+def test_index_refreshes_after_ttl_or_invalidation():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Job.__table__])
+    db = sessionmaker(bind=engine)()
+    db.add(Job(title="SRE", company="Acme", required_skills=["K8s"]))
+    db.commit()
+
+    index = SkillIndex(ttl_seconds=3600)
+    index.refresh(db)
+    assert len(index.match(["kubernetes"])) == 1
+
+    db.add(Job(title="Platform", company="Acme", required_skills=["Kubernetes", "Go"]))
+    db.commit()
+    index.refresh(db)
+    assert len(index.match(["kubernetes"])) == 1  # Still fresh
+    index.invalidate()
+    index.refresh(db)
+    assert len(index.match(["kubernetes"])) == 2
+    assert index.stats()["jobs"] == 2
+    db.close()
+
+
+def test_find_jobs_and_backfill(monkeypatch):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Job.__table__])
+    db = sessionmaker(bind=engine)()
+    sre = Job(title="SRE", company="Acme", required_skills=["K8s", "Go"])
+    data = Job(title="Data", company="Acme", required_skills=["Spark"])
+    db.add_all([sre, data])
+    db.commit()
+    monkeypatch.setattr(skills_module, "_index_instance", None)
+
+    assert find_jobs(db, ["kubernetes", "golang"], "all") == [sre.job_id]
+    assert find_jobs(db, ["nothing"]) == []
+
+    # Rows written without the ORM validator (or before an alias was added)
+    db.query(Job).filter(Job.job_id == data.job_id).update({Job.normalized_skills: None})
+    db.commit()
+    assert backfill_normalized_skills(db, batch_size=1) == 1
+    assert backfill_normalized_skills(db) == 0
+    db.refresh(data)
+    assert data.normalized_skills == ["spark"]
+    db.close()
+
+
+def test_postgres_clause_uses_the_jsonb_operators():
+    dialect = postgresql.psycopg2.dialect()
+    any_clause = jobs_with_skills_clause(["K8s", "Go"]).compile(dialect=dialect)
+    assert str(any_clause) == "jobs.normalized_skills ?| %(param_1)s::TEXT[]"
+    assert any_clause.params["param_1"] == ["go", "kubernetes"]
+    assert "?&" in str(jobs_with_skills_clause(["Go"], "all").compile(dialect=dialect))
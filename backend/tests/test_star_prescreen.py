@@ -0,0 +1,39 @@
+import time
+
+from app.services.star_prescreen import StarPrescreen, featurize, FEATURES
+
+
+def test_clear_cut_bullets_are_decided_locally():
+    weak, strong, ambiguous = StarPrescreen().screen([
+        "Helped with testing",
+        "To address rising churn, led a team of 5 engineers to rebuild onboarding, increasing activation by 22%",
+        "Managed relationships with multiple stakeholders",
+    ])
+
+    assert weak["missing_components"] == ["Situation", "Task", "Action", "Result"]
+    assert weak["question"].startswith("What measurable outcome")
+    assert strong["missing_components"] == []
+    assert ambiguous is None
+
+
+def test_missing_result_is_flagged_for_unquantified_bullets():
+    (result,) = StarPrescreen().screen(["Implemented CI pipelines using GitHub Actions"])
+    assert "Result" in result["missing_components"]
+    assert "Action" not in result["missing_components"]
+
+
+def test_features_and_escalation_metrics():
+    row = dict(zip(FEATURES, featurize(["Reduced p99 latency by 35% by redesigning the caching layer"])[0]))
+    assert row["action_verb"] and row["quantified"] and row["result_phrase"]
+    assert not row["weak_opener"]
+
+    prescreen = StarPrescreen()
+    prescreen.screen(["Helped with testing", "Managed relationships with multiple stakeholders"])
+    assert prescreen.stats() == {"screened": 2, "decided_locally": 1, "escalated": 1, "escalation_rate": 0.5}
+
+
+def test_whole_profile_screens_in_milliseconds():
+    bullets = [f"Reduced build time by {i}% by caching artifacts across 12 services" for i in range(200)]
+    start = time.perf_counter()
+    StarPrescreen().screen(bullets)
+    assert time.perf_counter() - start < 0.5
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect
+
+from app import database, startup
+from app.startup import StartupState, lifespan, warm_up
+
+
+@pytest.fixture
+def file_engine(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'startup.db'}")
+    monkeypatch.setattr(database, "engine", engine)
+    monkeypatch.setattr(database, "async_engine", None)
+    return engine
+
+
+def test_warm_up_times_each_phase(file_engine, monkeypatch):
+    monkeypatch.setattr(startup, "PRELOAD_SERVICES", True)
+    loaded = []
+    monkeypatch.setattr(startup, "preload_pdf_parser", lambda: loaded.append("pdf"))
+    monkeypatch.setattr(startup, "preload_guide_service", lambda: loaded.append("guide"))
+
+    state = StartupState()
+    assert state.status()["status"] == "warming"
+    asyncio.run(warm_up(state))
+
+    assert state.ready
+    assert sorted(loaded) == ["guide", "pdf"]
+    assert set(state.phases) == {"database", "pdf_parser", "guide_service"}
+    assert all(phase["ms"] >= 0 for phase in state.phases.values())
+
+
+def test_failed_phase_keeps_the_app_unready(file_engine, monkeypatch):
+    monkeypatch.setattr(startup, "PRELOAD_SERVICES", True)
+    monkeypatch.setattr(startup, "preload_pdf_parser", lambda: None)
+
+    def broken():
+        raise ValueError("OPENAI_API_KEY environment variable must be set")
+
+    monkeypatch.setattr(startup, "preload_guide_service", broken)
+    state = StartupState()
+    asyncio.run(warm_up(state))
+
+    assert not state.ready
+    assert state.status()["status"] == "failed"
+    assert "OPENAI_API_KEY" in state.phases["guide_service"]["error"]
+
+
+def test_lifespan_creates_schema_only_when_asked(file_engine, monkeypatch):
+    monkeypatch.setattr(startup, "PRELOAD_SERVICES", False)
+
+    monkeypatch.setattr(startup, "DB_CREATE_SCHEMA", False)
+    with TestClient(FastAPI(lifespan=lifespan)):
+        pass
+    assert not inspect(file_engine).has_table("resume_profiles")
+
+    monkeypatch.setattr(startup, "DB_CREATE_SCHEMA", True)
+    app = FastAPI(lifespan=lifespan)
+    with TestClient(app):
+        pass
+    assert inspect(file_engine).has_table("resume_profiles")
+    assert "ms" in app.state.startup.phases["schema"]
+
+
+def test_failed_phases_are_retried_until_they_pass(file_engine, monkeypatch):
+    monkeypatch.setattr(startup, "PRELOAD_SERVICES", False)
+    attempts = []
+    warm_sync_pool = startup.warm_sync_pool
+
+    def database_comes_up_late():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("connection refused")
+        warm_sync_pool()
+
+    monkeypatch.setattr(startup, "warm_sync_pool", database_comes_up_late)
+    state = StartupState()
+    asyncio.run(warm_up(state, retry_seconds=0.01))
+
+    assert state.ready
+    assert state.phases["database"]["attempts"] == 3
+    assert "error" not in state.phases["database"]
@@ -0,0 +1,55 @@
+import mmap
+import tempfile
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.uploads import UploadSizeLimitMiddleware, UploadTooLarge, pdf_buffer, spool_copy
+
+
+def make_app(max_bytes):
+    app = FastAPI()
+    app.add_middleware(UploadSizeLimitMiddleware, max_bytes=max_bytes)
+
+    @app.post("/api/echo")
+    async def echo(request: Request):
+        return {"received": len(await request.body())}
+
+    return app
+
+
+def test_middleware_rejects_declared_oversize_body():
+    client = TestClient(make_app(max_bytes=100))
+
+    assert client.post("/api/echo", content=b"x" * 50).json() == {"received": 50}
+    assert client.post("/api/echo", content=b"x" * 101).status_code == 413
+
+
+def test_middleware_cuts_off_streamed_body():
+    client = TestClient(make_app(max_bytes=100))
+
+    def chunks():
+        for _ in range(5):
+            yield b"x" * 40
+
+    response = client.post("/api/echo", content=chunks())
+    assert response.status_code == 413
+
+
+def test_spooled_upload_is_memory_mapped():
+    upload = tempfile.SpooledTemporaryFile(max_size=1024)
+    upload.write(b"%PDF-1.4 small upload")
+
+    with pdf_buffer(upload) as data:
+        assert isinstance(data, mmap.mmap)
+        assert data[:8] == b"%PDF-1.4"
+
+
+def test_spool_copy_enforces_limit():
+    source = tempfile.SpooledTemporaryFile()
+    source.write(b"x" * 200)
+
+    assert spool_copy(source, max_bytes=200).read() == b"x" * 200
+    with pytest.raises(UploadTooLarge):
+        spool_copy(source, max_bytes=199)
@@ -6,22 +6,31 @@ CREATE TABLE jobs (
     title VARCHAR(255) NOT NULL,
     company VARCHAR(255) NOT NULL,
     url TEXT,
+    url_hash VARCHAR(64),
+    content_hash VARCHAR(64),
     discovered_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     fit_score INTEGER CHECK (fit_score >= 0 AND fit_score <= 100),
     status VARCHAR(50) CHECK (status IN ('discovered', 'analyzed', 'applied', 'responded', 'rejected', 'passed')),
     required_skills JSONB,
     nice_to_have_skills JSONB,
+    normalized_skills JSONB,
     salary_range JSONB,
     location VARCHAR(255),
     remote_policy VARCHAR(50),
     application_deadline DATE,
     raw_description TEXT,
+    minhash BYTEA,
+    duplicate_of UUID REFERENCES jobs(job_id) ON DELETE SET NULL,
     company_size VARCHAR(50),
     industry VARCHAR(100),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE INDEX ix_jobs_normalized_skills ON jobs USING gin (normalized_skills);
+CREATE UNIQUE INDEX ix_jobs_url_hash ON jobs (url_hash);
+CREATE INDEX ix_jobs_duplicate_of ON jobs (duplicate_of);
+
 CREATE TABLE network (
     person_id UUID PRIMARY KEY,
     name VARCHAR(255) NOT NULL,
@@ -42,12 +51,37 @@ CREATE TABLE network (
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE INDEX ix_network_updated_at ON network (updated_at);
+
+CREATE TABLE resume_profiles (
+    profile_id UUID PRIMARY KEY,
+    profile_name VARCHAR(255),
+    content JSONB,
+    owner_id UUID,
+    is_active BOOLEAN DEFAULT true,
+    -- Bumped on every content write; clients send it back to detect conflicting edits
+    version INTEGER NOT NULL DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Keyset pagination of the listing, newest first; deleted profiles aren't indexed
+CREATE INDEX ix_resume_profiles_active_listing ON resume_profiles (created_at, profile_id)
+    WHERE is_active IS true;
+CREATE INDEX ix_resume_profiles_owner_listing ON resume_profiles (owner_id, created_at, profile_id)
+    WHERE is_active IS true;
+
 CREATE TABLE resume_versions (
     version_id UUID PRIMARY KEY,
     version_name VARCHAR(255),
     created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     targeted_role_type VARCHAR(100),
+    -- Profile history: a full snapshot in content, or the delta from the previous version
+    profile_id UUID REFERENCES resume_profiles(profile_id) ON DELETE CASCADE,
+    version_number INTEGER,
+    is_snapshot BOOLEAN DEFAULT false,
     content JSONB,
+    delta JSONB,
     rendered_formats JSONB,
     performance_metrics JSONB,
     tailored_for_job_ids JSONB,
@@ -55,7 +89,8 @@ CREATE TABLE resume_versions (
     sections_modified JSONB,
     is_active BOOLEAN DEFAULT true,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_resume_version_number UNIQUE (profile_id, version_number)
 );
 
 CREATE TABLE decisions (
@@ -116,3 +151,55 @@ CREATE TABLE user_preferences (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
+
+CREATE TABLE parse_cache (
+    cache_id UUID PRIMARY KEY,
+    pdf_sha256 VARCHAR(64),
+    text_sha256 VARCHAR(64) NOT NULL,
+    model VARCHAR(100) NOT NULL,
+    prompt_version VARCHAR(64) NOT NULL,
+    content JSONB NOT NULL,
+    raw_text TEXT,
+    hit_count INTEGER DEFAULT 0,
+    last_hit_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX ix_parse_cache_pdf_sha256 ON parse_cache (pdf_sha256);
+CREATE INDEX ix_parse_cache_text_sha256 ON parse_cache (text_sha256);
+
+CREATE TABLE guide_cache (
+    cache_key VARCHAR(64) PRIMARY KEY,
+    kind VARCHAR(20) NOT NULL,
+    program_fingerprint VARCHAR(64) NOT NULL,
+    result JSONB NOT NULL,
+    hit_count INTEGER DEFAULT 0,
+    last_hit_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX ix_guide_cache_program_fingerprint ON guide_cache (program_fingerprint);
+CREATE INDEX ix_guide_cache_expires_at ON guide_cache (expires_at);
+
+CREATE TABLE import_checkpoints (
+    checkpoint_id UUID PRIMARY KEY,
+    import_id VARCHAR(64) NOT NULL,
+    file_key VARCHAR(64) NOT NULL,
+    filename TEXT,
+    status VARCHAR(20) NOT NULL CHECK (status IN ('stored', 'failed')),
+    profile_id UUID REFERENCES resume_profiles(profile_id),
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_import_checkpoint_file UNIQUE (import_id, file_key)
+);
+
+CREATE INDEX ix_import_checkpoints_import_id ON import_checkpoints (import_id);
+
+-- Extracted PDF text, kept out of resume_profiles.content so profile reads stay small
+CREATE TABLE resume_raw_texts (
+    profile_id UUID PRIMARY KEY REFERENCES resume_profiles(profile_id) ON DELETE CASCADE,
+    raw_text TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
@@ -199,6 +199,45 @@ function EditableField({ value, onSave, multiline = false, className = '' }: Edi
 
 const API_BASE = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
 
+// Events emitted by /api/resume/upload/stream as the parse progresses
+type ResumeStreamEvent =
+  | { event: 'section'; data: { key: keyof ResumeData; value: unknown } }
+  | { event: 'item'; data: { key: keyof ResumeData; index: number; value: unknown } }
+  | { event: 'done'; data: { profile_id: string; profile_name: string; content: ResumeData } }
+  | { event: 'error'; data: { detail: string } };
+
+// Read a Server-Sent Events body, calling onEvent for each complete event
+async function readEventStream(
+  body: ReadableStream<Uint8Array>,
+  onEvent: (event: ResumeStreamEvent) => void
+) {
+  const reader = body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const rawEvent = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      let event = 'message';
+      const dataLines: string[] = [];
+      for (const line of rawEvent.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) dataLines.push(line.slice(5).trimStart());
+      }
+      if (dataLines.length) {
+        onEvent({ event, data: JSON.parse(dataLines.join('\n')) } as ResumeStreamEvent);
+      }
+    }
+  }
+}
+
 export default function ResumeBuilder() {
   const [messages, setMessages] = useState<{ role: 'user' | 'agent'; content: string }[]>([
     { role: 'agent', content: "👋 Hello! I'm your Resume Coach powered by AI.\n\n**How to use:**\n1. 📄 Upload your resume PDF\n2. ✨ Click \"Critique\" on any bullet to get STAR analysis\n3. 💬 Answer my questions to improve your bullets\n4. ✏️ Click any text to edit directly\n\nLet's make your resume stand out!" }
@@ -474,17 +513,46 @@ What would you like to do?`
       const formData = new FormData();
       formData.append('file', file);
 
-      const response = await fetch(`${API_BASE}/api/resume/upload`, {
+      const response = await fetch(`${API_BASE}/api/resume/upload/stream`, {
         method: 'POST',
         body: formData,
       });
 
-      if (!response.ok) {
+      if (!response.ok || !response.body) {
         const error = await response.json().catch(() => ({ detail: 'Unknown error' }));
         throw new Error(error.detail || `Upload failed with status ${response.status}`);
       }
 
-      const data = await response.json();
+      // Render sections as the parser streams them in
+      setResumeData({ basics: { name: "", summary: "" }, work_experience: [] });
+      const result: {
+        data: Extract<ResumeStreamEvent, { event: 'done' }>['data'] | null;
+        error: string | null;
+      } = { data: null, error: null };
+
+      await readEventStream(response.body, (evt) => {
+        if (evt.event === 'section') {
+          const { key, value } = evt.data;
+          setResumeData(prev => ({ ...prev, [key]: value }));
+        } else if (evt.event === 'item') {
+          const { key, index, value } = evt.data;
+          setResumeData(prev => {
+            const current = prev[key];
+            const items: unknown[] = Array.isArray(current) ? [...current] : [];
+            items[index] = value;
+            return { ...prev, [key]: items };
+          });
+        } else if (evt.event === 'done') {
+          result.data = evt.data;
+        } else if (evt.event === 'error') {
+          result.error = evt.data.detail;
+        }
+      });
+
+      if (result.error) throw new Error(result.error);
+      if (!result.data) throw new Error('Upload stream ended before the resume was saved');
+
+      const data = result.data;
       setProfileId(data.profile_id);
 
       // Update resume state with all parsed data